@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmarks for ``framegrab.extract_frames``.
+
+Generates synthetic input videos with ffmpeg's ``testsrc`` and ``mandelbrot``
+sources (fixed resolution, GOP size and duration, so every machine decodes the
+same content), times extraction in several modes and writes a JSON report of
+frames/sec, wall time and peak RSS per case. A report can be stored as a
+baseline and later runs compared against it.
+
+Usage examples:
+  python benchmarks/bench_extract.py --output report.json
+  python benchmarks/bench_extract.py --quick --baseline benchmarks/baseline.json
+  python benchmarks/bench_extract.py --output benchmarks/baseline.json --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import framegrab  # noqa: E402
+
+
+class SyntheticVideo(NamedTuple):
+    """A generated benchmark input: lavfi ``source`` encoded with a fixed GOP."""
+
+    name: str
+    source: str
+    width: int
+    height: int
+    rate: int
+    duration: float
+    gop: int
+
+
+class Case(NamedTuple):
+    """One extraction mode, as :func:`framegrab.extract_frames` keyword arguments.
+
+    ``start``/``end`` are fractions of the video duration so the same case
+    applies to every input.
+    """
+
+    name: str
+    pattern: str = "frame_%06d.jpg"
+    fps: Optional[float] = None
+    start: Optional[float] = None
+    end: Optional[float] = None
+
+
+VIDEOS = [
+    SyntheticVideo("testsrc_360p_gop30", "testsrc", 640, 360, 30, 20.0, 30),
+    SyntheticVideo("testsrc_720p_gop250", "testsrc", 1280, 720, 30, 20.0, 250),
+    SyntheticVideo("mandelbrot_1080p_gop50", "mandelbrot", 1920, 1080, 25, 10.0, 50),
+]
+
+CASES = [
+    Case("full_jpeg"),
+    Case("full_png", pattern="frame_%06d.png"),
+    Case("fps_thin", fps=2.0),
+    Case("range", start=0.4, end=0.6),
+    Case("range_png", pattern="frame_%06d.png", start=0.4, end=0.6),
+]
+
+# --quick: the smallest input only
+QUICK_VIDEOS = VIDEOS[:1]
+
+
+def generate_video(video: SyntheticVideo, work_dir: Path, codec: str = "libx264") -> Path:
+    """Encode ``video`` into ``work_dir`` unless it is already there."""
+    path = work_dir / f"{video.name}.mp4"
+    if path.exists():
+        return path
+    src = f"{video.source}=size={video.width}x{video.height}:rate={video.rate}"
+    part = path.with_suffix(".part.mp4")
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        src,
+        "-t",
+        f"{video.duration:g}",
+        "-c:v",
+        codec,
+        "-g",
+        str(video.gop),
+        "-keyint_min",
+        str(video.gop),
+        "-pix_fmt",
+        "yuv420p",
+        str(part),
+    ]
+    subprocess.run(cmd, check=True)
+    os.replace(part, path)
+    return path
+
+
+def case_kwargs(case: Case, duration: float) -> dict:
+    """Map a :class:`Case` to ``extract_frames`` arguments for one input."""
+    kwargs = {"pattern": case.pattern, "overwrite": True}
+    if case.fps is not None:
+        kwargs["fps"] = case.fps
+    if case.start is not None:
+        kwargs["start"] = f"{case.start * duration:.3f}"
+    if case.end is not None:
+        kwargs["end"] = f"{case.end * duration:.3f}"
+    return kwargs
+
+
+def _peak_rss_kb(children: bool) -> Optional[int]:
+    """Peak RSS in KiB of this process or its largest child (``None`` without ``resource``)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_case(input_video: Path, output_dir: Path, kwargs: dict) -> dict:
+    """Run one extraction in this process and measure it.
+
+    Meant to run in a fresh child per case (see :func:`measure`), so the
+    ``RUSAGE_CHILDREN`` peak is that of this case's ffmpeg alone and no probe
+    result is cached from an earlier case.
+    """
+    # Keep the user's keyframe index out of the measurement
+    framegrab.INDEX_PATH = output_dir.parent / "index.sqlite3"
+    t0 = time.perf_counter()
+    rc, frames, _cmd = framegrab.extract_frames(input_video, output_dir, **kwargs)
+    wall = time.perf_counter() - t0
+    return {
+        "rc": rc,
+        "frames": frames,
+        "wall_s": wall,
+        "ffmpeg_peak_rss_kb": _peak_rss_kb(children=True),
+        "python_peak_rss_kb": _peak_rss_kb(children=False),
+    }
+
+
+def measure(input_video: Path, kwargs: dict, repeat: int) -> dict:
+    """Time a case ``repeat`` times, each in a fresh interpreter; report the median."""
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="framegrab-bench-") as tmp:
+            job = {
+                "input_video": str(input_video),
+                "output_dir": str(Path(tmp) / "frames"),
+                "kwargs": kwargs,
+            }
+            proc = subprocess.run(
+                [sys.executable, __file__, "--run-case", json.dumps(job)],
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            if proc.returncode != 0:
+                runs.append({"rc": proc.returncode})
+                continue
+            runs.append(json.loads(proc.stdout))
+    failed = [r for r in runs if r["rc"] != 0]
+    if failed:
+        return {"rc": failed[0]["rc"], "frames": 0, "wall_s": None, "fps": None}
+    wall = statistics.median(r["wall_s"] for r in runs)
+    frames = runs[0]["frames"]
+    peaks = [r["ffmpeg_peak_rss_kb"] for r in runs if r["ffmpeg_peak_rss_kb"] is not None]
+    py_peaks = [r["python_peak_rss_kb"] for r in runs if r["python_peak_rss_kb"] is not None]
+    return {
+        "rc": 0,
+        "frames": frames,
+        "wall_s": round(wall, 4),
+        "wall_s_runs": [round(r["wall_s"], 4) for r in runs],
+        "fps": round(frames / wall, 2) if wall > 0 else None,
+        "ffmpeg_peak_rss_kb": max(peaks) if peaks else None,
+        "python_peak_rss_kb": max(py_peaks) if py_peaks else None,
+    }
+
+
+def _ffmpeg_version() -> Optional[str]:
+    try:
+        out = subprocess.run(["ffmpeg", "-version"], stdout=subprocess.PIPE, text=True).stdout
+    except OSError:
+        return None
+    return out.splitlines()[0] if out else None
+
+
+def run_benchmarks(
+    videos: Sequence[SyntheticVideo],
+    cases: Sequence[Case],
+    work_dir: Path,
+    *,
+    repeat: int = 3,
+    codec: str = "libx264",
+) -> dict:
+    """Generate the inputs and measure every case on every video."""
+    work_dir.mkdir(parents=True, exist_ok=True)
+    results = []
+    for video in videos:
+        path = generate_video(video, work_dir, codec)
+        for case in cases:
+            print(f"{video.name} / {case.name}...", file=sys.stderr)
+            result = measure(path, case_kwargs(case, video.duration), repeat)
+            results.append({"video": video.name, "case": case.name, **result})
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": _ffmpeg_version(),
+        "repeat": repeat,
+        "videos": [v._asdict() for v in videos],
+        "results": results,
+    }
+
+
+def compare_reports(report: dict, baseline: dict, tolerance: float = 0.1) -> List[str]:
+    """List the cases whose frames/sec fell more than ``tolerance`` below the baseline.
+
+    Cases missing from either report, or failed in either, are reported too.
+    """
+    base = {(r["video"], r["case"]): r for r in baseline.get("results", [])}
+    problems = []
+    for r in report.get("results", []):
+        key = (r["video"], r["case"])
+        label = f"{r['video']} / {r['case']}"
+        old = base.pop(key, None)
+        if old is None:
+            continue
+        if r.get("rc") != 0:
+            problems.append(f"{label}: failed (exit code {r.get('rc')})")
+        elif old.get("fps") and r.get("fps") is not None:
+            change = r["fps"] / old["fps"] - 1
+            if change < -tolerance:
+                problems.append(
+                    f"{label}: {r['fps']:.1f} frames/s vs {old['fps']:.1f} baseline ({change:+.0%})"
+                )
+    for video, case in base:
+        problems.append(f"{video} / {case}: missing from this run")
+    return problems
+
+
+def format_report(report: dict, baseline: Optional[dict] = None) -> str:
+    """Plain-text table of a report, with the change against ``baseline``."""
+    base = {(r["video"], r["case"]): r for r in (baseline or {}).get("results", [])}
+    lines = [f"{'video':<26} {'case':<10} {'frames':>7} {'wall s':>8} {'fps':>9} {'peak MiB':>9} {'vs base':>8}"]
+    for r in report["results"]:
+        peak = r.get("ffmpeg_peak_rss_kb")
+        old = base.get((r["video"], r["case"]))
+        delta = ""
+        if old and old.get("fps") and r.get("fps"):
+            delta = f"{r['fps'] / old['fps'] - 1:+.0%}"
+        lines.append(
+            f"{r['video']:<26} {r['case']:<10} {r['frames']:>7} "
+            f"{r['wall_s'] if r['wall_s'] is not None else '-':>8} "
+            f"{r['fps'] if r['fps'] is not None else '-':>9} "
+            f"{peak / 1024 if peak else 0:>9.1f} {delta:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="bench_extract.py",
+        description="Benchmark extract_frames on synthetic videos and compare with a baseline.",
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="Compare frames/sec against this report")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Allowed frames/sec drop against the baseline, as a fraction (default: 0.1)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=framegrab.positive_int,
+        default=3,
+        help="Runs per case; the median wall time is reported (default: 3)",
+    )
+    parser.add_argument("--quick", action="store_true", help="Only the smallest input")
+    parser.add_argument(
+        "--cases",
+        help=f"Comma-separated subset of cases ({', '.join(c.name for c in CASES)})",
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "framegrab-bench",
+        help="Where generated inputs are kept between runs",
+    )
+    parser.add_argument("--codec", default="libx264", help="Encoder for the inputs (default: libx264)")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        job = json.loads(args.run_case)
+        result = run_case(Path(job["input_video"]), Path(job["output_dir"]), job["kwargs"])
+        print(json.dumps(result))
+        return 0
+
+    framegrab.check_ffmpeg_available()
+    cases = CASES
+    if args.cases:
+        wanted = args.cases.split(",")
+        unknown = sorted(set(wanted) - {c.name for c in CASES})
+        if unknown:
+            print(f"Unknown case(s): {', '.join(unknown)}", file=sys.stderr)
+            return 1
+        cases = [c for c in CASES if c.name in wanted]
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+
+    report = run_benchmarks(
+        QUICK_VIDEOS if args.quick else VIDEOS,
+        cases,
+        args.work_dir,
+        repeat=args.repeat,
+        codec=args.codec,
+    )
+    print(format_report(report, baseline))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {args.output}", file=sys.stderr)
+    failed = [r for r in report["results"] if r["rc"] != 0]
+    for r in failed:
+        print(f"{r['video']} / {r['case']}: failed (exit code {r['rc']})", file=sys.stderr)
+    if baseline is None:
+        return 1 if failed else 0
+    problems = compare_reports(report, baseline, args.tolerance)
+    for line in problems:
+        print(f"Regression: {line}", file=sys.stderr)
+    return 1 if problems or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
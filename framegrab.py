@@ -14,18 +14,104 @@ Usage examples:
 from __future__ import annotations
 
 import argparse
+import contextlib
+import math
 import os
 import glob
 import re
 import shlex
 import shutil
 import sys
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import (
+    AsyncIterator,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 
 TIME_RE = re.compile(r"^(\d{1,2}):(\d{2}):(\d{2})(?:\.(\d{1,3}))?$")
 
+# In-process probe memo keyed by (path, size, mtime_ns); see probe_video_info
+PROBE_CACHE_SIZE = 256
+_PROBE_CACHE: "OrderedDict[Tuple[str, int, int], dict]" = OrderedDict()
+# Same for keyframe lists (see probe_keyframes); shares the size and lock
+_KEYFRAME_CACHE: "OrderedDict[Tuple[str, int, int], List[float]]" = OrderedDict()
+_PROBE_CACHE_LOCK = threading.Lock()
+
+
+class _StageTimer:
+    """Lap timer behind ``extract_frames(stats=...)``.
+
+    :meth:`lap` charges the time since the previous lap to a stage; time spent
+    in ffprobe meanwhile (see :func:`_timed_probe`) goes to ``probe`` instead.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict = {}
+        self.marks: dict = {}
+        self.retries = 0
+        self._last = time.perf_counter()
+        self._probe_in_lap = 0.0
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + now - self._last - self._probe_in_lap
+        self.marks[name] = now
+        self._last = now
+        self._probe_in_lap = 0.0
+
+    def add_probe(self, seconds: float) -> None:
+        self.stages["probe"] = self.stages.get("probe", 0.0) + seconds
+        self._probe_in_lap += seconds
+
+
+# The timer of the extract_frames call running on this thread, if any
+_STAGE_TIMER = threading.local()
+# ffmpeg progress interval while a timer runs; its 0.5 s default would round
+# first_frame_s up to the next report
+STATS_PROGRESS_PERIOD = 0.05
+
+
+def _lap(name: str) -> None:
+    timer = getattr(_STAGE_TIMER, "timer", None)
+    if timer is not None:
+        timer.lap(name)
+
+
+def _note_retries(count: int) -> None:
+    timer = getattr(_STAGE_TIMER, "timer", None)
+    if timer is not None:
+        timer.retries += count
+
+
+def _timed_probe(func: Callable) -> Callable:
+    """Charge the wrapped ffprobe call to the ``probe`` stage of a stats run."""
+    import functools
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        timer = getattr(_STAGE_TIMER, "timer", None)
+        if timer is None:
+            return func(*args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timer.add_probe(time.perf_counter() - t0)
+
+    return wrapper
+
 
 def parse_time(value: str) -> str:
     """Validate and normalize time input.
@@ -97,26 +183,78 @@ def _parse_fraction(frac: str) -> Optional[float]:
         return None
 
 
-def probe_video_info(input_video: Path) -> dict:
+def probe_video_info(input_video: Path, *, keyframes: bool = False) -> dict:
     """Probe video metadata using ffprobe.
 
     Returns a dict with keys ``fps`` (float or None), ``duration`` (float or None),
-    ``width`` (int or None), ``height`` (int or None).
+    ``width`` (int or None), ``height`` (int or None). With ``keyframes`` it also
+    has ``keyframe_count`` and ``keyframe_interval`` (median seconds between
+    keyframes, or None), from :func:`probe_keyframes`.
+
+    Results are memoized by file identity (path, size, mtime): first in an
+    in-process LRU, then in the on-disk keyframe index (see :func:`build_index`).
+    Failed probes are not cached.
+    """
+    if not input_video:
+        raise ValueError("input_video is required")
+    if keyframes:
+        info = probe_video_info(input_video)
+        times = probe_keyframes(input_video)
+        return dict(info, keyframe_count=len(times), keyframe_interval=keyframe_interval(times))
+    ident = _file_identity(input_video)
+    if ident is None:
+        return _probe_video_info_uncached(input_video)
+    with _PROBE_CACHE_LOCK:
+        if ident in _PROBE_CACHE:
+            _PROBE_CACHE.move_to_end(ident)
+            return dict(_PROBE_CACHE[ident])
+    cached = index_lookup(input_video)
+    if cached and cached["info"] is not None:
+        info = cached["info"]
+    else:
+        info = _probe_video_info_uncached(input_video)
+        if not any(v is not None for v in info.values()):
+            return info
+        index_store(input_video, info=info)
+    with _PROBE_CACHE_LOCK:
+        _PROBE_CACHE[ident] = dict(info)
+        while len(_PROBE_CACHE) > PROBE_CACHE_SIZE:
+            _PROBE_CACHE.popitem(last=False)
+    return info
+
+
+def probe_many(paths: Sequence[Path], max_workers: Optional[int] = None) -> List[dict]:
+    """Probe several files concurrently; results are in input order.
+
+    Uses a thread pool (ffprobe runs as a child process) and the same caches
+    as :func:`probe_video_info`.
     """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers or min(32, len(paths))) as pool:
+        return list(pool.map(probe_video_info, paths))
+
+
+@_timed_probe
+def _probe_video_info_uncached(input_video: Path) -> dict:
+    """Run ffprobe for :func:`probe_video_info`, bypassing the index."""
     import json
     import subprocess
 
-    if not input_video:
-        raise ValueError("input_video is required")
-    # Try to run ffprobe; propagate FileNotFoundError with a clearer message
+    # Try to run ffprobe; propagate FileNotFoundError with a clearer message.
+    # Only the fields used below are requested to keep the probe cheap.
     cmd = [
         "ffprobe",
         "-v",
         "error",
         "-print_format",
         "json",
-        "-show_format",
-        "-show_streams",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "stream=codec_type,width,height,avg_frame_rate,r_frame_rate:format=duration",
         str(input_video),
     ]
     try:
@@ -152,6 +290,304 @@ def probe_video_info(input_video: Path) -> dict:
     return {"fps": fps, "duration": duration, "width": width, "height": height}
 
 
+@_timed_probe
+def probe_start_offset(input_video: Path) -> float:
+    """Seconds from the container's start to the first video timestamp.
+
+    ``-ss`` and user-given times count from the container's ``start_time``,
+    but the video stream may start later (or the container not at 0), so its
+    frame grid is ``offset + k / fps``. Returns 0.0 when it cannot be probed.
+    """
+    import json
+    import subprocess
+
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-print_format",
+        "json",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "stream=start_time:format=start_time",
+        str(input_video),
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        data = json.loads(proc.stdout or "{}") if proc.returncode == 0 else {}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return 0.0
+    streams = data.get("streams") or [{}]
+    try:
+        stream_start = float(streams[0].get("start_time") or 0.0)
+        format_start = float((data.get("format") or {}).get("start_time") or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+    return stream_start - format_start
+
+
+@_timed_probe
+def _probe_keyframe_packets(input_video: Path) -> List[Tuple[float, Optional[int]]]:
+    """Read ``(pts_time, byte_offset)`` of every keyframe packet via ffprobe.
+
+    Only packet headers are read, so no frames are decoded. Returns an empty
+    list when ffprobe fails or the stream has no usable timestamps.
+    """
+    import subprocess
+
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "packet=pts_time,pos,flags",
+        "-of",
+        "csv=p=0",
+        str(input_video),
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+    except FileNotFoundError as exc:
+        raise RuntimeError("ffprobe not found on PATH. Install ffmpeg tools and try again.") from exc
+    if proc.returncode != 0:
+        return []
+    packets: List[Tuple[float, Optional[int]]] = []
+    for line in (proc.stdout or "").splitlines():
+        parts = line.strip().split(",")
+        # ffprobe prints fields in its own order: pts_time, pos, flags
+        if len(parts) < 2 or "K" not in parts[-1]:
+            continue
+        try:
+            pts = float(parts[0])
+        except ValueError:
+            continue
+        try:
+            pos: Optional[int] = int(parts[-2]) if len(parts) >= 3 else None
+        except ValueError:
+            pos = None
+        packets.append((pts, pos))
+    packets.sort()
+    return packets
+
+
+def probe_keyframes(input_video: Path) -> List[float]:
+    """Return keyframe timestamps (seconds) of the first video stream.
+
+    Served from an in-process LRU or the keyframe index when the file is
+    recorded there; otherwise the packets are scanned with ffprobe and the
+    result is stored in the index for the next run.
+    """
+    if not input_video:
+        raise ValueError("input_video is required")
+    times = _known_keyframes(input_video)
+    if times is not None:
+        return times
+    packets = _probe_keyframe_packets(input_video)
+    if not packets:
+        return []
+    index_store(input_video, keyframes=packets)
+    times = [pts for pts, _pos in packets]
+    _remember_keyframes(input_video, times)
+    return times
+
+
+def _known_keyframes(input_video: Path) -> Optional[List[float]]:
+    """Keyframe timestamps from the in-process LRU or the index, never scanning.
+
+    Returns ``None`` when neither has the file.
+    """
+    ident = _file_identity(input_video)
+    if ident is not None:
+        with _PROBE_CACHE_LOCK:
+            if ident in _KEYFRAME_CACHE:
+                _KEYFRAME_CACHE.move_to_end(ident)
+                return list(_KEYFRAME_CACHE[ident])
+    cached = index_lookup(input_video)
+    if not cached or cached["keyframes"] is None:
+        return None
+    times = [pts for pts, _pos in cached["keyframes"]]
+    _remember_keyframes(input_video, times)
+    return times
+
+
+def _remember_keyframes(input_video: Path, times: List[float]) -> None:
+    ident = _file_identity(input_video)
+    if ident is None:
+        return
+    with _PROBE_CACHE_LOCK:
+        _KEYFRAME_CACHE[ident] = list(times)
+        while len(_KEYFRAME_CACHE) > PROBE_CACHE_SIZE:
+            _KEYFRAME_CACHE.popitem(last=False)
+
+
+def keyframe_interval(keyframes: Sequence[float]) -> Optional[float]:
+    """Median distance in seconds between keyframes (``None`` for fewer than two)."""
+    import statistics
+
+    gaps = [b - a for a, b in zip(keyframes, keyframes[1:])]
+    return statistics.median(gaps) if gaps else None
+
+
+# Keyframe index -------------------------------------------------------------
+
+# Created on the first probe; --index (or FRAMEGRAB_INDEX) moves it
+INDEX_ENV = "FRAMEGRAB_INDEX"
+INDEX_PATH = Path(os.environ.get(INDEX_ENV) or Path.home() / ".frameextractor-index.sqlite3")
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    has_info INTEGER NOT NULL DEFAULT 0,
+    fps REAL,
+    duration REAL,
+    width INTEGER,
+    height INTEGER,
+    has_keyframes INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (path, size, mtime_ns)
+);
+CREATE TABLE IF NOT EXISTS keyframes (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    pts REAL NOT NULL,
+    pos INTEGER
+);
+CREATE INDEX IF NOT EXISTS keyframes_by_file ON keyframes (file_id, pts);
+"""
+
+
+def _file_identity(input_video: Path) -> Optional[Tuple[str, int, int]]:
+    """Return ``(absolute_path, size, mtime_ns)`` or ``None`` if unreadable."""
+    try:
+        st = os.stat(input_video)
+        return str(Path(input_video).resolve()), st.st_size, st.st_mtime_ns
+    except OSError:
+        return None
+
+
+def _open_index(index_path: Optional[Path] = None, create: bool = False):
+    """Open the index database; ``None`` if it does not exist and ``create`` is off."""
+    import sqlite3
+
+    path = Path(index_path or INDEX_PATH)
+    if not create and not path.exists():
+        return None
+    conn = sqlite3.connect(str(path), timeout=30)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        if create:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(_INDEX_SCHEMA)
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+def index_lookup(input_video: Path, index_path: Optional[Path] = None) -> Optional[dict]:
+    """Look up a file in the keyframe index by path, size and mtime.
+
+    Returns ``None`` on a miss, else a dict with ``info`` (the
+    :func:`probe_video_info` dict or ``None``) and ``keyframes`` (a list of
+    ``(pts, byte_offset)`` or ``None``). Index errors are treated as misses.
+    """
+    import sqlite3
+
+    ident = _file_identity(input_video)
+    if ident is None:
+        return None
+    try:
+        conn = _open_index(index_path)
+        if conn is None:
+            return None
+        with contextlib.closing(conn), conn:
+            row = conn.execute(
+                "SELECT id, has_info, fps, duration, width, height, has_keyframes FROM files "
+                "WHERE path = ? AND size = ? AND mtime_ns = ?",
+                ident,
+            ).fetchone()
+            if row is None:
+                return None
+            file_id, has_info, fps, duration, width, height, has_keyframes = row
+            keyframes = None
+            if has_keyframes:
+                keyframes = conn.execute(
+                    "SELECT pts, pos FROM keyframes WHERE file_id = ? ORDER BY pts", (file_id,)
+                ).fetchall()
+    except sqlite3.Error:
+        return None
+    info = (
+        {"fps": fps, "duration": duration, "width": width, "height": height} if has_info else None
+    )
+    return {"info": info, "keyframes": keyframes}
+
+
+def index_store(
+    input_video: Path,
+    *,
+    info: Optional[dict] = None,
+    keyframes: Optional[Sequence[Tuple[float, Optional[int]]]] = None,
+    index_path: Optional[Path] = None,
+) -> bool:
+    """Record probe info and/or keyframes for a file; returns ``True`` on success.
+
+    Entries for the same path with a different size or mtime are dropped.
+    """
+    import sqlite3
+
+    ident = _file_identity(input_video)
+    if ident is None:
+        return False
+    try:
+        conn = _open_index(index_path, create=True)
+        with contextlib.closing(conn), conn:
+            conn.execute(
+                "DELETE FROM files WHERE path = ? AND NOT (size = ? AND mtime_ns = ?)", ident
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO files (path, size, mtime_ns) VALUES (?, ?, ?)", ident
+            )
+            (file_id,) = conn.execute(
+                "SELECT id FROM files WHERE path = ? AND size = ? AND mtime_ns = ?", ident
+            ).fetchone()
+            if info is not None:
+                conn.execute(
+                    "UPDATE files SET has_info = 1, fps = ?, duration = ?, width = ?, height = ? "
+                    "WHERE id = ?",
+                    (info.get("fps"), info.get("duration"), info.get("width"), info.get("height"), file_id),
+                )
+            if keyframes is not None:
+                conn.execute("DELETE FROM keyframes WHERE file_id = ?", (file_id,))
+                conn.executemany(
+                    "INSERT INTO keyframes (file_id, pts, pos) VALUES (?, ?, ?)",
+                    [(file_id, pts, pos) for pts, pos in keyframes],
+                )
+                conn.execute("UPDATE files SET has_keyframes = 1 WHERE id = ?", (file_id,))
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def build_index(input_video: Path, index_path: Optional[Path] = None) -> dict:
+    """Probe a file's metadata and keyframes and record them in the index.
+
+    Always goes back to the container (use it to refresh an entry). Returns
+    the probe info dict extended with ``keyframes`` (their count).
+    """
+    ident = _file_identity(input_video)
+    if ident is None:
+        raise ValueError(f"Input file not found: {input_video}")
+    # Bypass the index so a rebuild really re-reads the file
+    info = _probe_video_info_uncached(input_video)
+    packets = _probe_keyframe_packets(input_video)
+    index_store(input_video, info=info, keyframes=packets, index_path=index_path)
+    return dict(info, keyframes=len(packets))
+
+
 def positive_fps(value: str) -> float:
     """Ensure the ``--fps`` argument is a positive number.
 
@@ -170,6 +606,60 @@ def positive_fps(value: str) -> float:
     return fps
 
 
+def scene_threshold(value: str) -> float:
+    """Ensure ``--scene`` is a scene-change score strictly between 0 and 1.
+
+    Raises:
+        argparse.ArgumentTypeError: If ``value`` is non-numeric or out of range.
+    """
+    try:
+        threshold = float(value)
+    except (TypeError, ValueError) as exc:
+        raise argparse.ArgumentTypeError("--scene must be a number between 0 and 1") from exc
+    if not 0 < threshold < 1:
+        raise argparse.ArgumentTypeError("--scene must be between 0 and 1 (exclusive)")
+    return threshold
+
+
+def positive_int(value: str) -> int:
+    """Ensure an integer option (e.g. ``--jobs``) is a positive number.
+
+    Raises:
+        argparse.ArgumentTypeError: If ``value`` is not an integer or is <= 0.
+    """
+    try:
+        number = int(value)
+    except (TypeError, ValueError) as exc:
+        raise argparse.ArgumentTypeError("value must be an integer > 0") from exc
+    if number <= 0:
+        raise argparse.ArgumentTypeError("value must be an integer > 0")
+    return number
+
+
+def scale_size(value: str) -> Tuple[int, int]:
+    """Parse a ``WxH`` frame size such as ``320x180`` for ``--scale``."""
+    m = re.fullmatch(r"(\d+)[xX](\d+)", value.strip())
+    if not m or int(m.group(1)) <= 0 or int(m.group(2)) <= 0:
+        raise argparse.ArgumentTypeError("size must be WxH with positive integers (e.g., 320x180)")
+    return int(m.group(1)), int(m.group(2))
+
+
+def crop_box(value: str) -> Tuple[int, int, int, int]:
+    """Parse an ``x:y:w:h`` crop rectangle (pixels) for ``--crop``."""
+    parts = value.strip().split(":")
+    try:
+        x, y, w, h = (int(p) for p in parts)
+    except ValueError:
+        raise argparse.ArgumentTypeError("crop must be x:y:w:h integers (e.g., 0:60:1280:600)")
+    if x < 0 or y < 0 or w <= 0 or h <= 0:
+        raise argparse.ArgumentTypeError("crop needs x, y >= 0 and w, h > 0")
+    return x, y, w, h
+
+
+# swscale algorithms offered by --scaler, fastest first
+SCALERS = ("fast_bilinear", "neighbor", "area", "bilinear", "bicubic", "lanczos")
+
+
 def check_ffmpeg_available() -> None:
     """Abort if the ``ffmpeg`` executable is not on ``PATH``.
 
@@ -181,6 +671,40 @@ def check_ffmpeg_available() -> None:
         sys.exit(1)
 
 
+# First ffmpeg release with -fps_mode; older ones only know -vsync
+FPS_MODE_VERSION = (5, 1)
+# ffmpeg version per executable path; see ffmpeg_version
+_FFMPEG_VERSIONS: dict = {}
+
+
+def ffmpeg_version() -> Optional[Tuple[int, int]]:
+    """``(major, minor)`` release of the ``ffmpeg`` on ``PATH``, memoized.
+
+    Returns ``None`` when ffmpeg cannot be run or prints no release number
+    (git builds report ``N-<revision>``); callers treat that as current.
+    """
+    import subprocess
+
+    exe = shutil.which("ffmpeg")
+    if exe not in _FFMPEG_VERSIONS:
+        try:
+            proc = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True)
+            out = proc.stdout or ""
+        except OSError:
+            out = ""
+        m = re.match(r"ffmpeg version n?(\d+)\.(\d+)", out)
+        _FFMPEG_VERSIONS[exe] = (int(m.group(1)), int(m.group(2))) if m else None
+    return _FFMPEG_VERSIONS[exe]
+
+
+def _vfr_args() -> List[str]:
+    """Output options that pass frames through without duplicating them."""
+    version = ffmpeg_version()
+    if version is not None and version < FPS_MODE_VERSION:
+        return ["-vsync", "vfr"]
+    return ["-fps_mode", "vfr"]
+
+
 def validate_paths(input_video: Path, output_dir: Path) -> None:
     """Validate input video and output directory paths.
 
@@ -249,9 +773,41 @@ def validate_pattern(pattern: str) -> None:
         sys.exit(1)
 
 
+def _escape_filter_value(value: str) -> str:
+    """Escape a string for use as a filter option value inside ``-vf``.
+
+    Applies ffmpeg's option-level escaping and then filtergraph-level escaping.
+    """
+    value = re.sub(r"([\\':])", r"\\\1", value)
+    return re.sub(r"([\\'\[\],;])", r"\\\1", value)
+
+
+def _geometry_filters(
+    *,
+    size: Optional[Tuple[int, int]] = None,
+    max_side: Optional[int] = None,
+    crop: Optional[Tuple[int, int, int, int]] = None,
+    scaler: Optional[str] = None,
+) -> List[str]:
+    """``crop`` and ``scale`` filters for the given geometry options."""
+    filters: List[str] = []
+    if crop is not None:
+        x, y, w, h = crop
+        filters.append(f"crop={w}:{h}:{x}:{y}")
+    flags = f":flags={scaler}" if scaler else ""
+    if size is not None:
+        filters.append(f"scale={size[0]}:{size[1]}{flags}")
+    elif max_side is not None:
+        filters.append(
+            f"scale=w='min({max_side},iw)':h='min({max_side},ih)'"
+            f":force_original_aspect_ratio=decrease{flags}"
+        )
+    return filters
+
+
 def build_ffmpeg_cmd(
     input_video: Path,
-    output_dir: Path,
+    output_dir: Optional[Path],
     *,
     start: Optional[str] = None,
     end: Optional[str] = None,
@@ -259,42 +815,138 @@ def build_ffmpeg_cmd(
     pattern: str = "frame_%06d.jpg",
     overwrite: bool = False,
     verbose: bool = False,
+    start_number: Optional[int] = None,
+    frames: Optional[int] = None,
+    size: Optional[Tuple[int, int]] = None,
+    pipe_format: Optional[str] = None,
+    pix_fmt: Optional[str] = None,
+    select: Optional[str] = None,
+    scene: Optional[float] = None,
+    scene_log: Optional[Path] = None,
+    progress: bool = False,
+    progress_period: Optional[float] = None,
+    showinfo: bool = False,
+    keyframes_only: bool = False,
+    crop: Optional[Tuple[int, int, int, int]] = None,
+    max_side: Optional[int] = None,
+    scaler: Optional[str] = None,
 ) -> List[str]:
     """Assemble the ``ffmpeg`` command for extracting frames.
 
     Args:
         input_video: Source video path.
-        output_dir: Destination directory for frames.
+        output_dir: Destination directory for frames (unused with ``pipe_format``).
         start: Optional start time.
         end: Optional end time.
         fps: Optional frame rate to sample.
         pattern: Output filename template.
         overwrite: Whether to overwrite existing files.
         verbose: Whether to use ``info`` log level.
+        start_number: Number of the first output file (image2 ``-start_number``).
+        frames: Stop after writing this many frames.
+        size: Optional ``(width, height)`` to scale frames to.
+        pipe_format: Write to stdout in this muxer format (e.g. ``rawvideo``)
+            instead of image files. ``image2pipe`` encodes JPEG or PNG
+            according to ``pattern``.
+        pix_fmt: Optional output pixel format.
+        select: Optional ``select`` filter expression; only matching frames
+            are written (with variable frame rate, so nothing is duplicated).
+        scene: Keep only frames whose scene-change score exceeds this value.
+        scene_log: With ``scene``, file receiving each kept frame's PTS and
+            score (``metadata`` filter print format).
+        progress: Emit machine-readable progress (``-progress pipe:1``) on
+            stdout instead of the human-readable stats line.
+        progress_period: Seconds between progress reports (``-stats_period``;
+            ffmpeg's default is 0.5).
+        showinfo: Log every output frame (including its ``pts_time``) on
+            stderr via the ``showinfo`` filter; raises the log level to info.
+        keyframes_only: Have the decoder skip all but keyframes
+            (``-skip_frame nokey``) and keep their timing (``-fps_mode vfr``,
+            ``-vsync vfr`` before ffmpeg 5.1).
+        crop: Optional ``(x, y, width, height)`` rectangle cut out of the
+            source frame before scaling.
+        max_side: Shrink frames (keeping the aspect ratio, never enlarging)
+            so neither side exceeds this many pixels; alternative to ``size``.
+        scaler: swscale algorithm for the scale step (one of ``SCALERS``).
 
     Returns:
         List of command arguments to run with ``subprocess``.
     """
     cmd: List[str] = ["ffmpeg", "-hide_banner"]
     # Use more verbose output when requested
-    cmd += ["-loglevel", "info" if verbose else "error"]
+    cmd += ["-loglevel", "info" if verbose or showinfo else "error"]
+    if progress:
+        cmd += ["-progress", "pipe:1", "-nostats"]
+        if progress_period is not None:
+            cmd += ["-stats_period", f"{progress_period:g}"]
     if start is not None:
         cmd += ["-ss", str(start)]
-    cmd += ["-i", str(input_video)]
+    # Both bounds are input options so END is an absolute position in the
+    # source, independent of START.
     if end is not None:
         cmd += ["-to", str(end)]
+    if keyframes_only:
+        cmd += ["-skip_frame", "nokey"]
+    cmd += ["-i", str(input_video)]
+    filters: List[str] = []
     if fps is not None:
-        cmd += ["-vf", f"fps={fps}"]
+        filters.append(f"fps={fps}")
+    if scene is not None:
+        select = f"gt(scene,{scene})" if select is None else f"({select})*gt(scene,{scene})"
+    if select is not None:
+        filters.append(f"select='{select}'")
+    if scene is not None and scene_log is not None:
+        filters.append(
+            "metadata=print:key=lavfi.scene_score:file=" + _escape_filter_value(str(scene_log))
+        )
+    # Geometry runs after frame selection so dropped frames are never scaled
+    filters += _geometry_filters(size=size, max_side=max_side, crop=crop, scaler=scaler)
+    if showinfo:
+        filters.append("showinfo")
+    if filters:
+        cmd += ["-vf", ",".join(filters)]
+    if frames is not None:
+        cmd += ["-frames:v", str(frames)]
+    if pix_fmt is not None:
+        cmd += ["-pix_fmt", pix_fmt]
+    if select is not None or keyframes_only:
+        # select drops frames; keep ffmpeg from duplicating them back
+        cmd += _vfr_args()
+
+    jpeg = Path(pattern).suffix.lower() in {".jpg", ".jpeg"}
+    if pipe_format is not None:
+        if pipe_format == "image2pipe":
+            # Encoded images back to back; the codec follows the pattern
+            cmd += ["-c:v", "mjpeg", "-q:v", "2"] if jpeg else ["-c:v", "png"]
+        cmd += ["-f", pipe_format, "pipe:1"]
+        return cmd
 
     # JPEG quality tweak when writing JPEGs
-    if Path(pattern).suffix.lower() in {".jpg", ".jpeg"}:
+    if jpeg:
         cmd += ["-q:v", "2"]
 
+    if start_number is not None:
+        cmd += ["-start_number", str(start_number)]
     cmd += ["-y" if overwrite else "-n"]
     cmd += [str(output_dir / pattern)]
     return cmd
 
 
+def frame_filename(pattern: str, number: int) -> str:
+    """Fill the ``%d`` placeholder of a frame pattern.
+
+    Example: ``frame_filename('frame_%06d.jpg', 7) -> 'frame_000007.jpg'``
+    """
+    return re.sub(r"%0?\d*d", lambda m: m.group(0) % number, pattern, count=1)
+
+
+def written_frame_files(
+    output_dir: Path, pattern: str, count: int, start_number: int = 1
+) -> List[Path]:
+    """Paths of the ``count`` files an image run numbered from ``start_number`` wrote."""
+    return [output_dir / frame_filename(pattern, n) for n in range(start_number, start_number + count)]
+
+
 def pattern_to_glob(pattern: str) -> str:
     """Convert a printf-style frame pattern (e.g., %06d) to a glob string.
 
@@ -303,108 +955,3900 @@ def pattern_to_glob(pattern: str) -> str:
     return re.sub(r"%0?\d*d", "*", pattern)
 
 
-def extract_frames(
+def _frame_size(input_video: Path, size: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+    """Validated ``(width, height)``: ``size`` if given, else the probed source size."""
+    if size is None:
+        info = probe_video_info(input_video)
+        if not info.get("width") or not info.get("height"):
+            raise RuntimeError("Could not determine frame size; pass size=(width, height)")
+        return info["width"], info["height"]
+    width, height = int(size[0]), int(size[1])
+    if width <= 0 or height <= 0:
+        raise ValueError("size must be two integers > 0")
+    return width, height
+
+
+# Bytes per pixel of the raw formats iter_frames can deliver
+RAW_PIX_FMTS = {"rgb24": 3, "bgr24": 3, "rgba": 4, "gray": 1}
+
+
+def iter_frames(
     input_video: Path,
-    output_dir: Path,
     *,
     start: Optional[str] = None,
     end: Optional[str] = None,
     fps: Optional[float] = None,
-    pattern: str = "frame_%06d.jpg",
-    overwrite: bool = False,
-    verbose: bool = False,
-    dry_run: bool = False,
-) -> Tuple[int, int, List[str]]:
-    """Extract frames according to options and return status.
+    size: Optional[Tuple[int, int]] = None,
+    pix_fmt: str = "rgb24",
+    readahead: int = 8,
+) -> Iterator:
+    """Stream decoded frames from ``ffmpeg`` without writing files.
 
-    Returns a tuple of ``(return_code, frames_written, cmd)`` where ``cmd`` is the
-    argument list passed to ``ffmpeg``. In ``dry_run`` mode, no files are written
-    and ``frames_written`` is ``0``.
+    ``ffmpeg`` writes ``rawvideo`` to a pipe; a reader thread fills one
+    preallocated buffer per frame and hands it over through a queue of at most
+    ``readahead`` frames, so a slow consumer throttles the decoder. Each frame
+    is yielded as a NumPy ``uint8`` array of shape ``(height, width[, channels])``
+    when NumPy is installed, else as a ``memoryview`` of the same shape. The
+    buffer is not reused, so frames may be kept.
+
+    ``start``/``end``/``fps`` are validated like the CLI flags; invalid values
+    raise ``ValueError``. Without ``size`` the probed source size is used.
+    Closing the generator early stops ``ffmpeg``.
     """
+    import queue
+    import subprocess
+
+    try:
+        start = parse_time(str(start)) if start is not None else None
+        end = parse_time(str(end)) if end is not None else None
+        fps = positive_fps(str(fps)) if fps is not None else None
+    except argparse.ArgumentTypeError as exc:
+        raise ValueError(str(exc)) from exc
+    if pix_fmt not in RAW_PIX_FMTS:
+        raise ValueError(f"pix_fmt must be one of: {', '.join(sorted(RAW_PIX_FMTS))}")
+    if readahead < 1:
+        raise ValueError("readahead must be >= 1")
     check_ffmpeg_available()
-    validate_paths(input_video, output_dir)
-    validate_pattern(pattern)
+    if not Path(input_video).is_file():
+        raise FileNotFoundError(f"Input file not found: {input_video}")
+    width, height = _frame_size(input_video, size)
+
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
 
+    channels = RAW_PIX_FMTS[pix_fmt]
+    shape = (height, width, channels) if channels > 1 else (height, width)
+    frame_bytes = width * height * channels
     cmd = build_ffmpeg_cmd(
         input_video,
-        output_dir,
+        None,
         start=start,
         end=end,
         fps=fps,
-        pattern=pattern,
-        overwrite=overwrite,
-        verbose=verbose,
+        size=(width, height) if size is not None else None,
+        pipe_format="rawvideo",
+        pix_fmt=pix_fmt,
     )
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    frames_q: "queue.Queue" = queue.Queue(maxsize=readahead)
+    done = object()
 
-    if dry_run:
-        return 0, 0, cmd
+    def reader() -> None:
+        try:
+            while True:
+                buf = bytearray(frame_bytes)
+                view = memoryview(buf)
+                got = 0
+                while got < frame_bytes:
+                    n = proc.stdout.readinto(view[got:])
+                    if not n:
+                        break
+                    got += n
+                if got < frame_bytes:
+                    break
+                frames_q.put(buf)
+        except (OSError, ValueError):
+            pass
+        finally:
+            frames_q.put(done)
 
-    if not output_dir.exists():
-        output_dir.mkdir(parents=True, exist_ok=True)
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    finished = False
+    try:
+        while True:
+            buf = frames_q.get()
+            if buf is done:
+                finished = True
+                break
+            if np is not None:
+                yield np.frombuffer(buf, dtype=np.uint8).reshape(shape)
+            else:
+                yield memoryview(buf).cast("B", shape)
+    finally:
+        if not finished:
+            proc.kill()
+            # Unblock the reader and wait for it to notice the closed pipe
+            while frames_q.get() is not done:
+                pass
+        thread.join()
+        proc.stdout.close()
+        rc = proc.wait()
+    if rc != 0:
+        raise RuntimeError(f"ffmpeg exited with code {rc}")
 
-    import subprocess
 
-    proc = subprocess.run(cmd)
-    if proc.returncode != 0:
-        return proc.returncode, 0, cmd
+# Default byte budget of a FrameReader's decoded-frame cache
+FRAME_CACHE_BYTES = 256 * 1024 * 1024
+# Readers kept open by get_frame/get_frame_at
+READER_POOL_SIZE = 4
 
-    gpat = pattern_to_glob(pattern)
-    files = glob.glob(str(output_dir / gpat))
-    return 0, len(files), cmd
 
+class FrameReader:
+    """Random access to single frames of one video.
 
-def main(argv: Optional[List[str]] = None) -> int:
-    parser = argparse.ArgumentParser(
-        prog="framegrab.py",
-        description=(
-            "Extract frames from a video via ffmpeg. This scaffold prints the constructed "
-            "ffmpeg command in --dry-run mode."
-        ),
-    )
-    parser.add_argument("input_video", type=Path, help="Path to input video file")
-    parser.add_argument("output_dir", type=Path, help="Directory for extracted frames")
-    parser.add_argument("--start", type=parse_time, help="Start time (sec or HH:MM:SS[.ms])")
-    parser.add_argument("--end", type=parse_time, help="End time (sec or HH:MM:SS[.ms])")
-    parser.add_argument("--fps", type=positive_fps, help="Sample at fixed frames per second")
-    parser.add_argument(
-        "--pattern",
-        default="frame_%06d.jpg",
-        help="Output filename pattern (.jpg/.jpeg/.png), e.g., frame_%06d.jpg",
-    )
-    parser.add_argument(
-        "--overwrite",
-        action="store_true",
-        help="Overwrite existing output files (ffmpeg -y)",
-    )
-    parser.add_argument(
-        "--verbose",
-        action="store_true",
-        help="Print more details while preparing the command",
-    )
-    parser.add_argument(
-        "--dry-run",
-        dest="dry_run",
-        action="store_true",
-        default=False,
-        help="Do not execute ffmpeg; only print the constructed command",
-    )
+    ``get_frame(n)`` returns frame ``n`` (zero-based, on the source frame
+    grid) and ``get_frame_at(t)`` the first frame at or after ``t`` seconds.
+    A miss starts an :func:`iter_frames` decode at the nearest keyframe at or
+    before the frame and decodes forward only as far as needed; every frame
+    passed on the way is cached. The decode stays open, so a later request
+    further ahead continues it instead of seeking again unless a keyframe
+    closer to the target lies beyond the current position.
 
-    args = parser.parse_args(argv)
+    The cache is an LRU bounded by ``cache_bytes`` of frame data. Frames are
+    returned read-only (see :func:`iter_frames` for their type) and may be
+    shared between callers. Methods are thread-safe; ``close`` stops ffmpeg.
+    """
 
-    if args.verbose:
-        print("Assembling ffmpeg command...", file=sys.stderr)
+    def __init__(
+        self,
+        input_video: Path,
+        *,
+        size: Optional[Tuple[int, int]] = None,
+        pix_fmt: str = "rgb24",
+        cache_bytes: int = FRAME_CACHE_BYTES,
+        readahead: int = 8,
+    ) -> None:
+        if pix_fmt not in RAW_PIX_FMTS:
+            raise ValueError(f"pix_fmt must be one of: {', '.join(sorted(RAW_PIX_FMTS))}")
+        if cache_bytes < 0:
+            raise ValueError("cache_bytes must be >= 0")
+        self.input_video = Path(input_video)
+        if not self.input_video.is_file():
+            raise FileNotFoundError(f"Input file not found: {input_video}")
+        info = probe_video_info(self.input_video)
+        self.rate = info.get("fps")
+        if not self.rate:
+            raise RuntimeError("Could not determine the frame rate of the input")
+        width, height = _frame_size(self.input_video, size)
+        self.size = size
+        self.pix_fmt = pix_fmt
+        self.frame_bytes = width * height * RAW_PIX_FMTS[pix_fmt]
+        self.cache_bytes = cache_bytes
+        self.readahead = readahead
+        keyframes = {int(round(k * self.rate)) for k in probe_keyframes(self.input_video)}
+        self._keyframes = sorted(keyframes | {0})
+        self._cache: "OrderedDict[int, object]" = OrderedDict()
+        self._run: Optional[Iterator] = None
+        self._next = 0
+        self._lock = threading.Lock()
 
-    rc, count, cmd = extract_frames(
-        args.input_video,
-        args.output_dir,
-        start=args.start,
-        end=args.end,
-        fps=args.fps,
-        pattern=args.pattern,
-        overwrite=args.overwrite,
-        verbose=args.verbose,
-        dry_run=args.dry_run,
-    )
+    def frame_index(self, t: float) -> int:
+        """Index of the first frame at or after ``t`` seconds."""
+        return max(0, math.ceil(float(t) * self.rate - 1e-6))
+
+    def get_frame_at(self, t) -> object:
+        """Frame at time ``t`` (seconds or ``HH:MM:SS[.ms]``)."""
+        return self.get_frame(self.frame_index(time_to_seconds(str(t))))
+
+    def get_frame(self, n: int) -> object:
+        """Frame ``n`` of the source. Raises ``IndexError`` past the end."""
+        import bisect
+
+        if n < 0:
+            raise IndexError("frame index out of range")
+        with self._lock:
+            frame = self._cache.get(n)
+            if frame is not None:
+                self._cache.move_to_end(n)
+                return frame
+            keyframe = self._keyframes[bisect.bisect_right(self._keyframes, n) - 1]
+            if self._run is None or not keyframe <= self._next <= n:
+                self._start_run(keyframe)
+            while self._next <= n:
+                try:
+                    frame = next(self._run)
+                except StopIteration:
+                    self._stop_run()
+                    raise IndexError("frame index out of range") from None
+                frame = _read_only(frame)
+                self._remember(self._next, frame)
+                self._next += 1
+            return frame
+
+    def _start_run(self, index: int) -> None:
+        self._stop_run()
+        start = f"{grid_seek(0.0, index, self.rate):.6f}" if index else None
+        self._run = iter_frames(
+            self.input_video,
+            start=start,
+            size=self.size,
+            pix_fmt=self.pix_fmt,
+            readahead=self.readahead,
+        )
+        self._next = index
+
+    def _stop_run(self) -> None:
+        if self._run is not None:
+            self._run.close()
+            self._run = None
+
+    def _remember(self, index: int, frame: object) -> None:
+        if self.frame_bytes > self.cache_bytes:
+            return
+        self._cache[index] = frame
+        self._cache.move_to_end(index)
+        while len(self._cache) * self.frame_bytes > self.cache_bytes:
+            self._cache.popitem(last=False)
+
+    def close(self) -> None:
+        """Stop any running decode and drop the cache."""
+        with self._lock:
+            self._stop_run()
+            self._cache.clear()
+
+    def __enter__(self) -> "FrameReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _read_only(frame):
+    """Make a decoded frame read-only so cached frames can be shared."""
+    if isinstance(frame, memoryview):
+        return frame.toreadonly()
+    flags = getattr(frame, "flags", None)
+    if flags is not None:
+        flags.writeable = False
+    return frame
+
+
+_READERS: "OrderedDict[tuple, FrameReader]" = OrderedDict()
+_READERS_LOCK = threading.Lock()
+
+
+def _pooled_reader(input_video: Path, size, pix_fmt: str) -> FrameReader:
+    """Open reader for these options, reused across calls (LRU of READER_POOL_SIZE)."""
+    key = (str(Path(input_video).resolve()), tuple(size) if size else None, pix_fmt)
+    with _READERS_LOCK:
+        reader = _READERS.get(key)
+        if reader is not None:
+            _READERS.move_to_end(key)
+            return reader
+    reader = FrameReader(input_video, size=size, pix_fmt=pix_fmt)
+    with _READERS_LOCK:
+        _READERS[key] = reader
+        evicted = []
+        while len(_READERS) > READER_POOL_SIZE:
+            evicted.append(_READERS.popitem(last=False)[1])
+    for old in evicted:
+        old.close()
+    return reader
+
+
+def get_frame(
+    input_video: Path, n: int, *, size: Optional[Tuple[int, int]] = None, pix_fmt: str = "rgb24"
+):
+    """Return frame ``n`` of ``input_video`` from a pooled :class:`FrameReader`.
+
+    Repeated calls on the same video share the reader's cache and open
+    decode, so scrubbing through neighbouring frames does not restart ffmpeg.
+    """
+    return _pooled_reader(input_video, size, pix_fmt).get_frame(n)
+
+
+def get_frame_at(
+    input_video: Path, t, *, size: Optional[Tuple[int, int]] = None, pix_fmt: str = "rgb24"
+):
+    """Return the first frame at or after time ``t`` (see :func:`get_frame`)."""
+    return _pooled_reader(input_video, size, pix_fmt).get_frame_at(t)
+
+
+def close_readers() -> None:
+    """Close the readers opened by :func:`get_frame` and :func:`get_frame_at`."""
+    with _READERS_LOCK:
+        readers = list(_READERS.values())
+        _READERS.clear()
+    for reader in readers:
+        reader.close()
+
+
+class Segment(NamedTuple):
+    """One slice of a parallel extraction.
+
+    ``first_index`` is the zero-based index of the first output frame and
+    ``frames`` the number of frames to write (``None`` for the open tail).
+    """
+
+    start: float
+    first_index: int
+    frames: Optional[int]
+
+
+def plan_segments(
+    start_s: float,
+    end_s: float,
+    keyframes: Sequence[float],
+    rate: float,
+    jobs: int,
+    *,
+    resample: bool = False,
+    offset: float = 0.0,
+) -> List[Segment]:
+    """Split ``[start_s, end_s)`` into up to ``jobs`` keyframe-aligned segments.
+
+    Each cut is snapped to the output frame grid right after the keyframe
+    nearest to an even split, so that frame numbers stay continuous across
+    segments and the decoder of a segment starts at (or just before) a
+    keyframe. With ``resample`` the grid has ``rate`` frames per second from
+    ``start_s``; otherwise the output frames are the source frames, on the
+    stream's own grid ``offset + k / rate`` (see :func:`probe_start_offset`).
+    Seek positions come from :func:`grid_seek`.
+    """
+    span = end_s - start_s
+    if jobs <= 1 or span <= 0 or rate <= 0:
+        return [Segment(start_s, 0, None)]
+    origin = start_s if resample else offset
+    first = 0 if resample else grid_index(start_s, rate, offset)
+    inner = [k for k in keyframes if start_s < k < end_s]
+    cuts = set()
+    for k in range(1, jobs):
+        if not inner:
+            break
+        ideal = start_s + span * k / jobs
+        nearest = min(inner, key=lambda t: abs(t - ideal))
+        index = grid_index(nearest, rate, origin) - first
+        if index > 0:
+            cuts.add(index)
+    edges = [0] + sorted(cuts)
+    segments: List[Segment] = []
+    for i, first_index in enumerate(edges):
+        nxt = edges[i + 1] if i + 1 < len(edges) else None
+        seek = grid_seek(start_s, first_index, rate, resample=resample, offset=offset)
+        segments.append(Segment(seek, first_index, None if nxt is None else nxt - first_index))
+    return segments
+
+
+def grid_index(t: float, rate: float, offset: float = 0.0) -> int:
+    """Index of the first frame at or after ``t`` on the grid ``offset + k / rate``."""
+    return max(0, math.ceil((t - offset) * rate - 1e-6))
+
+
+def grid_seek(
+    start_s: float, index: int, rate: float, *, resample: bool = False, offset: float = 0.0
+) -> float:
+    """Seek position (seconds) at which output frame ``index`` (zero-based) starts.
+
+    With ``resample`` (an ``fps`` filter at ``rate``) output frames lie on a
+    grid anchored at ``start_s``, since the filter re-anchors at the seek
+    point, and the grid point itself is used. Otherwise the output frames are
+    the source frames from the first one at or after ``start_s``, on the
+    stream's grid ``offset + k / rate``; the seek lands half a frame before
+    the source frame of ``index`` so that frame is the first one kept.
+    """
+    if resample:
+        return start_s + index / rate
+    if not index:
+        return start_s
+    return offset + (grid_index(start_s, rate, offset) + index - 0.5) / rate
+
+
+def _progress_seconds(block: dict) -> Optional[float]:
+    """Output position in seconds from a progress block (``None`` if unknown)."""
+    # Despite its name ffmpeg reports out_time_ms in microseconds as well
+    for key in ("out_time_us", "out_time_ms"):
+        try:
+            return int(block[key]) / 1_000_000
+        except (KeyError, ValueError):
+            continue
+    try:
+        return time_to_seconds(block["out_time"].split(".")[0]) + float(
+            "0." + block["out_time"].split(".")[1]
+        )
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+def parse_progress(lines: Iterable[str]) -> Iterator[dict]:
+    """Parse ``ffmpeg -progress`` output into one event per report.
+
+    Each event has ``frame`` (int), ``out_time`` (seconds or ``None``),
+    ``speed`` (realtime factor or ``None``), ``fps`` (or ``None``) and ``done``
+    (``True`` for the final report).
+    """
+    block: dict = {}
+    for line in lines:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            continue
+        block[key] = value.strip()
+        if key != "progress":
+            continue
+        yield _progress_event(block)
+        block = {}
+
+
+def _progress_event(block: dict) -> dict:
+    """Turn one complete ``-progress`` block (key/value dict) into an event."""
+    try:
+        frame = int(block.get("frame", 0))
+    except ValueError:
+        frame = 0
+    speed = block.get("speed", "").rstrip("x")
+    fps_val = block.get("fps", "")
+    try:
+        speed_f: Optional[float] = float(speed)
+    except ValueError:
+        speed_f = None
+    try:
+        fps_f: Optional[float] = float(fps_val)
+    except ValueError:
+        fps_f = None
+    return {
+        "frame": frame,
+        "out_time": _progress_seconds(block),
+        "speed": speed_f,
+        "fps": fps_f,
+        "done": block["progress"] == "end",
+    }
+
+
+def _kill_on_cancel(proc, cancel: Optional[threading.Event]) -> None:
+    """Kill ``proc`` as soon as ``cancel`` is set, from a watcher thread.
+
+    The watcher exits on its own once the process has ended; without an
+    event this does nothing.
+    """
+    if cancel is None:
+        return
+
+    def watch() -> None:
+        while proc.poll() is None:
+            if cancel.wait(0.05):
+                proc.kill()
+                return
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def _run_ffmpeg(
+    cmd: List[str],
+    on_progress: Optional[Callable[[dict], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Tuple[int, Optional[int]]:
+    """Run one ``ffmpeg`` command that reports on ``-progress pipe:1``.
+
+    Feeds progress events to ``on_progress`` while running and returns
+    ``(return_code, frames_written)``, the frame count coming from ffmpeg's
+    final report (``None`` if it printed none). Setting ``cancel`` kills the
+    process; if it is already set the command is not started and the return
+    code is 1.
+    """
+    import subprocess
+
+    last = None
+    if on_progress is None and cancel is None:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, text=True)
+        for last in parse_progress((proc.stdout or "").splitlines()):
+            pass
+        return proc.returncode, last["frame"] if last else None
+    if cancel is not None and cancel.is_set():
+        return 1, None
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    _kill_on_cancel(proc, cancel)
+    try:
+        for last in parse_progress(proc.stdout):
+            if on_progress is not None:
+                on_progress(last)
+    finally:
+        proc.stdout.close()
+        rc = proc.wait()
+    return rc, last["frame"] if last else None
+
+
+def _run_each(
+    cmds: Sequence[List[str]],
+    jobs: int,
+    on_progress: Optional[Callable[[dict], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> List[Tuple[int, Optional[int]]]:
+    """Run ``ffmpeg`` commands on up to ``jobs`` threads.
+
+    Returns ``(return_code, frames_written)`` per command, in order; progress
+    is combined as described for :func:`_run_parallel`. ``cancel`` kills the
+    running commands and skips the queued ones (see :func:`_run_ffmpeg`).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    latest: dict = {}
+    lock = threading.Lock()
+
+    def report(i: int, event: dict) -> None:
+        with lock:
+            latest[i] = event
+            combined = {
+                "frame": sum(e["frame"] for e in latest.values()),
+                "out_time": sum(e["out_time"] or 0.0 for e in latest.values()),
+                "speed": sum(e["speed"] or 0.0 for e in latest.values()) or None,
+                "fps": sum(e["fps"] or 0.0 for e in latest.values()) or None,
+                "done": len(latest) == len(cmds) and all(e["done"] for e in latest.values()),
+            }
+            on_progress(combined)
+
+    def run(item) -> Tuple[int, Optional[int]]:
+        i, c = item
+        return _run_ffmpeg(c, (lambda e: report(i, e)) if on_progress else None, cancel)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        return list(pool.map(run, enumerate(cmds)))
+
+
+def _run_parallel(
+    cmds: Sequence[List[str]],
+    jobs: int,
+    on_progress: Optional[Callable[[dict], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Tuple[int, int]:
+    """Run ``ffmpeg`` commands on up to ``jobs`` threads.
+
+    Returns the first non-zero return code (or 0) and the total frames written.
+    Progress of the individual processes is combined into one event stream:
+    frames, output time and speed are summed over all commands.
+    """
+    results = _run_each(cmds, jobs, on_progress, cancel)
+    rc = next((rc for rc, _frames in results if rc != 0), 0)
+    return rc, sum(frames or 0 for _rc, frames in results)
+
+
+def _segment_cmds(
+    input_video: Path,
+    output_dir: Path,
+    *,
+    start: Optional[str],
+    end: Optional[str],
+    fps: Optional[float],
+    jobs: int,
+    **kwargs,
+) -> List[List[str]]:
+    """Plan a ``--jobs`` run; falls back to a single command when unsplittable."""
+    serial = [build_ffmpeg_cmd(input_video, output_dir, start=start, end=end, fps=fps, **kwargs)]
+    info = probe_video_info(input_video)
+    rate = fps or info.get("fps")
+    start_s = time_to_seconds(start) if start is not None else 0.0
+    end_s = time_to_seconds(end) if end is not None else info.get("duration")
+    if not rate or not end_s or end_s <= start_s:
+        return serial
+    segments = plan_segments(
+        start_s,
+        end_s,
+        probe_keyframes(input_video),
+        rate,
+        jobs,
+        resample=fps is not None,
+        offset=0.0 if fps is not None else probe_start_offset(input_video),
+    )
+    if len(segments) < 2:
+        return serial
+    cmds = []
+    for seg in segments:
+        cmds.append(
+            build_ffmpeg_cmd(
+                input_video,
+                output_dir,
+                # The first segment keeps the caller's start verbatim
+                start=start if seg.first_index == 0 else f"{seg.start:.6f}",
+                end=end,
+                fps=fps,
+                start_number=seg.first_index + 1 if seg.first_index else None,
+                frames=seg.frames,
+                **kwargs,
+            )
+        )
+    return cmds
+
+
+# Cost of one independent seek (process start, demuxer open, seek) expressed
+# in decoded frames, and the GOP assumed when the keyframes are unknown.
+SEEK_OVERHEAD_FRAMES = 30.0
+ASSUMED_GOP_SECONDS = 5.0
+# Upper bound on concurrent processes for per-sample seeks without --jobs
+SEEK_WORKERS = 8
+
+
+class SeekPlan(NamedTuple):
+    """Outcome of :func:`plan_seek_strategy`.
+
+    ``strategy`` is ``"continuous"`` (decode the whole range once and let the
+    ``fps`` filter pick frames) or ``"seek"`` (one keyframe seek per sample).
+    Costs are estimated decoded frames.
+    """
+
+    strategy: str
+    samples: int
+    continuous_cost: float
+    seek_cost: float
+
+
+def plan_seek_strategy(
+    span: float,
+    fps: float,
+    source_fps: float,
+    gop: Optional[float] = None,
+    *,
+    seek_overhead: float = SEEK_OVERHEAD_FRAMES,
+) -> SeekPlan:
+    """Choose between one continuous decode and per-sample seeks.
+
+    A continuous decode of ``span`` seconds decodes every source frame. A seek
+    lands on the keyframe before the sample and decodes forward to it, on
+    average half a GOP, plus a fixed ``seek_overhead``. The cheaper estimate
+    wins; ties go to the continuous decode.
+
+    ``samples`` is what the ``fps`` filter emits for ``span`` seconds: it
+    rounds timestamps to the nearest output tick, so ``round(span * fps)``.
+    """
+    samples = max(0, math.floor(span * fps + 0.5))
+    continuous = span * source_fps
+    gop = gop or ASSUMED_GOP_SECONDS
+    per_seek = seek_overhead + gop * source_fps / 2 + 1
+    seek = samples * per_seek
+    strategy = "seek" if seek < continuous else "continuous"
+    return SeekPlan(strategy, samples, continuous, seek)
+
+
+def _sample_seek_cmds(
+    input_video: Path,
+    output_dir: Path,
+    *,
+    start: Optional[str],
+    end: Optional[str],
+    fps: float,
+    **kwargs,
+) -> Optional[List[List[str]]]:
+    """Plan an ``--fps`` run; return per-sample commands if seeking is cheaper.
+
+    Returns ``None`` when the continuous decode wins or the source cannot be
+    probed. With ``verbose`` the decision is printed.
+
+    The planner never scans packets for keyframes: it uses the keyframe
+    spacing only when it is already indexed or memoized, and otherwise
+    assumes :data:`ASSUMED_GOP_SECONDS`.
+
+    Each seek lands on the frame the ``fps`` filter would have picked: output
+    tick ``n`` shows the last source frame before ``start + (n + 0.5) / fps``.
+    """
+    try:
+        info = probe_video_info(input_video)
+    except RuntimeError:
+        return None
+    source_fps = info.get("fps")
+    start_s = time_to_seconds(start) if start is not None else 0.0
+    end_s = time_to_seconds(end) if end is not None else info.get("duration")
+    if end_s and info.get("duration"):
+        # The filter stops at the end of the stream, not at a later --end
+        end_s = min(end_s, info["duration"])
+    if not source_fps or not end_s or end_s <= start_s or fps >= source_fps:
+        return None
+    span = end_s - start_s
+    # Even zero-length GOPs cannot make seeking pay off: skip the index lookup
+    if plan_seek_strategy(span, fps, source_fps, 1e-9).strategy != "seek":
+        gop = None
+    else:
+        known = _known_keyframes(input_video)
+        gop = keyframe_interval(known) if known else None
+    plan = plan_seek_strategy(span, fps, source_fps, gop)
+    if kwargs.get("verbose"):
+        how = "per-sample seeks" if plan.strategy == "seek" else "one continuous decode"
+        print(
+            f"Seek plan: {how} ({plan.samples} samples; est. {plan.seek_cost:,.0f} frames "
+            f"decoded with seeks vs {plan.continuous_cost:,.0f} continuous)",
+            file=sys.stderr,
+        )
+    if plan.strategy != "seek":
+        return None
+    offset = probe_start_offset(input_video)
+    first = grid_index(start_s, source_fps, offset)
+    cmds = []
+    for i in range(plan.samples):
+        tick = start_s + (i + 0.5) / fps
+        index = max(first, grid_index(tick, source_fps, offset) - 1)
+        seek = grid_seek(start_s, index - first, source_fps, offset=offset)
+        cmds.append(
+            build_ffmpeg_cmd(
+                input_video,
+                output_dir,
+                start=f"{seek:.6f}",
+                frames=1,
+                start_number=i + 1,
+                **kwargs,
+            )
+        )
+    return cmds
+
+
+# Extra attempts for a --count sample whose seek produced no frame; each one
+# moves a quarter slice earlier, so it stays inside the sample's own slice.
+COUNT_RETRIES = 2
+
+
+def plan_count_times(start_s: float, end_s: float, count: int) -> List[float]:
+    """Centres of ``count`` equal slices of ``[start_s, end_s)``."""
+    step = (end_s - start_s) / count
+    return [start_s + (i + 0.5) * step for i in range(count)]
+
+
+def _count_cmds(
+    input_video: Path,
+    output_dir: Path,
+    times: Sequence[float],
+    numbers: Optional[Sequence[int]] = None,
+    **kwargs,
+) -> List[List[str]]:
+    """One ``-ss T -frames:v 1`` command per time, numbered from 1 (or ``numbers``)."""
+    numbers = numbers or range(1, len(times) + 1)
+    return [
+        build_ffmpeg_cmd(
+            input_video, output_dir, start=f"{t:.6f}", frames=1, start_number=n, **kwargs
+        )
+        for t, n in zip(times, numbers)
+    ]
+
+
+def _extract_count(
+    input_video: Path,
+    output_dir: Path,
+    cmds: List[List[str]],
+    times: Sequence[float],
+    step: float,
+    jobs: int,
+    on_progress: Optional[Callable[[dict], None]],
+    cancel: Optional[threading.Event] = None,
+    **kwargs,
+) -> Tuple[int, int]:
+    """Run ``--count`` seeks and retry the ones that wrote no frame.
+
+    ``step`` is the slice width between samples. Returns ``(return_code,
+    frames_written)``; the return code is 1 if some sample still has no
+    frame after :data:`COUNT_RETRIES` attempts.
+    """
+    results = _run_each(cmds, jobs, on_progress, cancel)
+    rc = next((rc for rc, _frames in results if rc != 0), 0)
+    if rc != 0:
+        return rc, 0
+    missing = [i for i, (_rc, frames) in enumerate(results) if not frames]
+    for attempt in range(1, COUNT_RETRIES + 1):
+        if not missing:
+            break
+        retry = _count_cmds(
+            input_video,
+            output_dir,
+            [max(0.0, times[i] - attempt * step / 4) for i in missing],
+            [i + 1 for i in missing],
+            **kwargs,
+        )
+        _note_retries(len(retry))
+        results = _run_each(retry, jobs, on_progress, cancel)
+        missing = [i for i, (rc, frames) in zip(missing, results) if rc != 0 or not frames]
+    if missing:
+        print(
+            f"No frame found for {len(missing)} of {len(times)} samples "
+            f"(first at {times[missing[0]]:.3f}s)",
+            file=sys.stderr,
+        )
+        return 1, len(times) - len(missing)
+    return 0, len(times)
+
+
+# Targets further apart than this are extracted with their own seek instead
+# of decoding the gap between them.
+SEEK_GAP_SECONDS = 10.0
+
+
+def load_timestamps(path: Path) -> List[float]:
+    """Read target times (seconds) from a text file.
+
+    One time per line (seconds or ``HH:MM:SS[.ms]``, see :func:`time_to_seconds`);
+    only the first comma/space separated field is used, blank lines and ``#``
+    comments are skipped. Raises ``ValueError`` naming the offending line.
+    """
+    times: List[float] = []
+    for lineno, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        token = re.split(r"[,\s]+", line, maxsplit=1)[0]
+        try:
+            times.append(time_to_seconds(token))
+        except ValueError:
+            raise ValueError(f"{path}:{lineno}: invalid time {token!r}") from None
+    if not times:
+        raise ValueError(f"{path}: no timestamps found")
+    return times
+
+
+def timestamps_file(value: str) -> List[float]:
+    """``argparse`` type for ``--timestamps``: load times from a file."""
+    try:
+        return load_timestamps(Path(value))
+    except (OSError, ValueError) as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def plan_timestamp_groups(
+    times: Sequence[float],
+    rate: Optional[float] = None,
+    gap: float = SEEK_GAP_SECONDS,
+    offset: float = 0.0,
+) -> List[List[Tuple[float, float]]]:
+    """Sort and group target times for extraction.
+
+    Each target maps to the first frame at or after it. With a known source
+    ``rate`` that frame's PTS is computed on the grid ``offset + k / rate``
+    (see :func:`probe_start_offset`) and targets landing on the same frame
+    are merged, so every output file is a distinct frame. Targets more than
+    ``gap`` seconds apart start a new group, which gets its own seek.
+
+    Returns groups of ``(target, frame_pts)`` in time order.
+    """
+    groups: List[List[Tuple[float, float]]] = []
+    last_pts = None
+    for t in sorted(times):
+        if rate:
+            pts = offset + grid_index(t, rate, offset) / rate
+        else:
+            pts = t
+        if last_pts is not None and pts == last_pts:
+            continue
+        if not groups or t - groups[-1][-1][0] > gap:
+            groups.append([])
+        groups[-1].append((t, pts))
+        last_pts = pts
+    return groups
+
+
+def _select_times_expr(times: Sequence[float]) -> str:
+    """``select`` expression keeping the first frame at or after each time."""
+    # prev_pts is NAN for the first frame, which makes gte() false
+    return "+".join(f"gte(t,{t:.6f})*not(gte(prev_pts*TB,{t:.6f}))" for t in times)
+
+
+def _timestamp_cmds(
+    input_video: Path,
+    output_dir: Path,
+    times: Sequence[float],
+    **kwargs,
+) -> Tuple[List[List[str]], List[float]]:
+    """Build one command per timestamp group; also return each frame's PTS.
+
+    Exits when the source frame rate is unknown: targets on the same frame
+    could then not be merged, and ffmpeg would write fewer frames than
+    planned, shifting the numbering of later groups. Exits likewise when a
+    target lies past the end of the probed duration, as it has no frame.
+    """
+    try:
+        info = probe_video_info(input_video)
+    except RuntimeError:
+        info = {}
+    rate = info.get("fps")
+    if not rate:
+        print("Cannot use timestamps: source frame rate is unknown", file=sys.stderr)
+        sys.exit(1)
+    groups = plan_timestamp_groups(times, rate, offset=probe_start_offset(input_video))
+    duration = info.get("duration")
+    late = [t for group in groups for t, pts in group if duration and pts >= duration]
+    if late:
+        print(
+            f"{len(late)} timestamp(s) past the end of the video ({duration:.3f}s), "
+            f"first at {late[0]:.3f}s",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    cmds: List[List[str]] = []
+    frame_pts: List[float] = []
+    for group in groups:
+        seek = group[0][0]
+        # Input seeking restarts timestamps at the seek point
+        expr = _select_times_expr([t - seek for t, _pts in group])
+        cmds.append(
+            build_ffmpeg_cmd(
+                input_video,
+                output_dir,
+                start=f"{seek:.6f}",
+                select=expr,
+                frames=len(group),
+                start_number=len(frame_pts) + 1,
+                **kwargs,
+            )
+        )
+        frame_pts += [pts for _t, pts in group]
+    return cmds, frame_pts
+
+
+# Keyframes closer than the --fps interval by less than this still count as
+# far enough apart (PTS rounding).
+KEYFRAME_THIN_SLACK = 1e-3
+
+
+def thin_keyframes(
+    keyframes: Sequence[float],
+    start_s: float = 0.0,
+    end_s: Optional[float] = None,
+    fps: Optional[float] = None,
+) -> List[float]:
+    """Keyframes in ``[start_s, end_s)``, thinned to at most ``fps`` per second.
+
+    Thinning is greedy from the first keyframe: a keyframe is kept when it is
+    at least ``1 / fps`` after the previously kept one, which is what the
+    ``select`` filter of ``--keyframes-only --fps`` does inside ffmpeg.
+    """
+    kept: List[float] = []
+    for k in sorted(keyframes):
+        if k < start_s - 1e-6 or (end_s is not None and k >= end_s):
+            continue
+        if fps and kept and k - kept[-1] < 1 / fps - KEYFRAME_THIN_SLACK:
+            continue
+        kept.append(k)
+    return kept
+
+
+def _keyframe_thin_expr(fps: float) -> str:
+    """``select`` expression keeping frames at least ``1 / fps`` apart."""
+    return f"isnan(prev_selected_t)+gte(t-prev_selected_t,{1 / fps - KEYFRAME_THIN_SLACK:.6f})"
+
+
+def _keyframe_cmds(
+    input_video: Path,
+    output_dir: Path,
+    *,
+    start: Optional[str],
+    end: Optional[str],
+    fps: Optional[float],
+    **kwargs,
+) -> Tuple[List[List[str]], List[float]]:
+    """Build a ``--keyframes-only`` command; also return each output frame's PTS."""
+    start_s = time_to_seconds(start) if start is not None else 0.0
+    end_s = time_to_seconds(end) if end is not None else None
+    try:
+        keyframes = probe_keyframes(input_video)
+    except RuntimeError:
+        # Without ffprobe the PTS names are unknown; files keep 1..N
+        keyframes = []
+    frame_pts = thin_keyframes(keyframes, start_s, end_s, fps)
+    if kwargs.get("verbose"):
+        interval = keyframe_interval(keyframes)
+        gop = f"{interval:.2f}s" if interval else "unknown"
+        print(
+            f"Keyframe interval {gop}; extracting {len(frame_pts)} of {len(keyframes)} keyframes",
+            file=sys.stderr,
+        )
+    cmd = build_ffmpeg_cmd(
+        input_video,
+        output_dir,
+        start=start,
+        end=end,
+        select=_keyframe_thin_expr(fps) if fps else None,
+        keyframes_only=True,
+        **kwargs,
+    )
+    return [cmd], frame_pts
+
+
+def _rename_frames(output_dir: Path, pattern: str, numbers: Sequence[Tuple[int, int]]) -> None:
+    """Renumber frame files from ``old`` to ``new`` for each ``(old, new)`` pair.
+
+    Goes through temporary names first so overlapping numbers cannot clash.
+    """
+    staged = []
+    for old, new in numbers:
+        src = output_dir / frame_filename(pattern, old)
+        if not src.exists():
+            continue
+        tmp = output_dir / (".renumber-" + src.name)
+        os.replace(src, tmp)
+        staged.append((tmp, output_dir / frame_filename(pattern, new)))
+    for tmp, dst in staged:
+        os.replace(tmp, dst)
+
+
+def pattern_to_regex(pattern: str) -> "re.Pattern[str]":
+    """Regex matching a frame pattern's file names, capturing the number."""
+    m = re.search(r"%0?\d*d", pattern)
+    if not m:
+        raise ValueError("pattern has no %d placeholder")
+    return re.compile(
+        re.escape(pattern[: m.start()]) + r"(\d+)" + re.escape(pattern[m.end():]) + "$"
+    )
+
+
+def image_complete(path: Path) -> bool:
+    """Whether a JPEG/PNG file ends with its end marker (i.e. was fully written)."""
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            size = fh.tell()
+            fh.seek(max(0, size - 12))
+            tail = fh.read()
+    except OSError:
+        return False
+    if path.suffix.lower() == ".png":
+        return tail.endswith(b"IEND\xaeB`\x82")
+    return tail.endswith(b"\xff\xd9")
+
+
+def shard_name(number: int, shard_size: int) -> str:
+    """Subdirectory holding frame ``number`` when sharding by ``shard_size``.
+
+    Frames 1..N go to ``000000``, N+1..2N to ``000001`` and so on.
+    """
+    return f"{max(number - 1, 0) // shard_size:06d}"
+
+
+def frame_relpath(pattern: str, number: int, shard_size: Optional[int] = None) -> str:
+    """File name of frame ``number`` relative to the output directory."""
+    name = frame_filename(pattern, number)
+    return f"{shard_name(number, shard_size)}/{name}" if shard_size else name
+
+
+def shard_frames(
+    output_dir: Path, pattern: str, numbers: Iterable[int], shard_size: int
+) -> int:
+    """Move the given frame numbers from ``output_dir`` into their shard dirs.
+
+    Missing files are skipped. Returns the number of files moved.
+    """
+    moved = 0
+    made = set()
+    for number in numbers:
+        name = frame_filename(pattern, number)
+        shard = output_dir / shard_name(number, shard_size)
+        if shard not in made:
+            shard.mkdir(exist_ok=True)
+            made.add(shard)
+        try:
+            os.replace(output_dir / name, shard / name)
+        except FileNotFoundError:
+            continue
+        moved += 1
+    return moved
+
+
+def _shard_progress_hook(
+    output_dir: Path,
+    pattern: str,
+    shard_size: int,
+    first: int,
+    on_progress: Optional[Callable[[dict], None]],
+) -> Tuple[Callable[[dict], None], Callable[[int], None]]:
+    """Progress callback that shards frames while ffmpeg is still writing.
+
+    Returns ``(hook, flush)``: ``hook`` wraps ``on_progress`` and moves every
+    frame reported so far; ``flush(total)`` moves the rest after the run.
+    Files are renamed within one filesystem, which is safe even for a frame
+    ffmpeg still has open, so the flat directory never holds more than about
+    one progress interval of frames.
+    """
+    state = {"next": first}
+
+    def advance(last: int) -> None:
+        while state["next"] <= last:
+            name = frame_filename(pattern, state["next"])
+            if not (output_dir / name).exists():
+                break  # not written yet; retry on the next report
+            shard_frames(output_dir, pattern, [state["next"]], shard_size)
+            state["next"] += 1
+
+    def hook(event: dict) -> None:
+        advance(first + event["frame"] - 1)
+        if on_progress is not None:
+            on_progress(event)
+
+    def flush(total: int) -> None:
+        remaining = range(state["next"], first + total)
+        shard_frames(output_dir, pattern, remaining, shard_size)
+        state["next"] = first + total
+
+    return hook, flush
+
+
+def find_resume_point(output_dir: Path, pattern: str, shard_size: Optional[int] = None) -> int:
+    """Number of frames already completed for ``pattern`` in ``output_dir``.
+
+    Returns the highest frame number on disk after removing that file if it
+    was left truncated by an interrupted run. Lower numbers are assumed
+    complete, as ffmpeg writes frames in order. With ``shard_size`` only the
+    last shard directory is scanned.
+    """
+    if not output_dir.is_dir():
+        return 0
+    regex = pattern_to_regex(pattern)
+    scan_dir = output_dir
+    if shard_size:
+        shards = [d for d in output_dir.iterdir() if d.is_dir() and d.name.isdigit()]
+        if not shards:
+            return 0
+        scan_dir = max(shards, key=lambda d: int(d.name))
+    highest = 0
+    with os.scandir(scan_dir) as entries:
+        for entry in entries:
+            m = regex.match(entry.name)
+            if m:
+                highest = max(highest, int(m.group(1)))
+    if highest:
+        last = scan_dir / frame_filename(pattern, highest)
+        if not image_complete(last):
+            last.unlink()
+            highest -= 1
+    return highest
+
+
+SCENE_SIDECAR = "scenes.csv"
+
+
+def write_scene_sidecar(
+    log_path: Path,
+    sidecar: Path,
+    pattern: str,
+    start_number: int = 1,
+    shard_size: Optional[int] = None,
+    offset: float = 0.0,
+) -> int:
+    """Convert ffmpeg's scene ``metadata`` log into a CSV sidecar.
+
+    Writes ``filename,pts_time,score`` for each kept frame, numbered like the
+    image files from ``start_number`` (paths include the shard directory when
+    sharded). ``offset`` is added to each ``pts_time``: the log's times start
+    at 0 at the ``-ss`` seek point. Returns the number of rows.
+    """
+    import csv
+
+    rows = []
+    pts_time = None
+    for line in log_path.read_text(encoding="utf-8", errors="replace").splitlines():
+        m = re.search(r"pts_time:(\S+)", line)
+        if m:
+            try:
+                pts_time = str(round(float(m.group(1)) + offset, 6))
+            except ValueError:
+                pts_time = None
+            continue
+        m = re.match(r"lavfi\.scene_score=(\S+)", line.strip())
+        if m and pts_time is not None:
+            name = frame_relpath(pattern, start_number + len(rows), shard_size)
+            rows.append((name, pts_time, m.group(1)))
+            pts_time = None
+    with open(sidecar, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["filename", "pts_time", "score"])
+        writer.writerows(rows)
+    return len(rows)
+
+
+ARCHIVE_INDEX = "archive_index.csv"
+ARCHIVE_EXTS = (".tar", ".zip")
+
+
+def validate_archive_pattern(archive: str) -> None:
+    """Check an archive shard template such as ``out-%05d.tar``.
+
+    Raises:
+        SystemExit: If the extension is not ``.tar`` or ``.zip``, the ``%d``
+            placeholder is missing, or the template contains directories.
+    """
+    ext = Path(archive).suffix.lower()
+    if ext not in ARCHIVE_EXTS:
+        print(
+            f"Unsupported archive extension '{ext}'. Use one of: .tar, .zip",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    if not re.search(r"%0?\d*d", archive):
+        print(
+            "Archive name must include a %d placeholder (e.g., 'out-%05d.tar')",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    p = Path(archive)
+    if p.is_absolute() or p.name != archive or "/" in archive or "\\" in archive:
+        print(
+            "Archive name must be a filename only (no directories or absolute paths)",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def _jpeg_end(buf: bytearray) -> int:
+    """End offset of the JPEG at the start of ``buf``, or -1 if incomplete."""
+    if buf[:2] != b"\xff\xd8":
+        raise ValueError("image stream is not JPEG")
+    i, n = 2, len(buf)
+    while True:
+        if i + 2 > n:
+            return -1
+        if buf[i] != 0xFF:
+            raise ValueError(f"corrupt JPEG marker at byte {i}")
+        marker = buf[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0xD9:  # EOI
+            return i + 2
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            i += 2
+            continue
+        if i + 4 > n:
+            return -1
+        i += 2 + int.from_bytes(buf[i + 2 : i + 4], "big")
+        if marker != 0xDA:
+            continue
+        # Entropy-coded data after SOS runs until the next real marker;
+        # 0xFF is stuffed as FF00 and restart markers belong to the scan.
+        while True:
+            j = buf.find(b"\xff", i)
+            if j < 0 or j + 1 >= n:
+                return -1
+            nxt = buf[j + 1]
+            if nxt == 0x00 or 0xD0 <= nxt <= 0xD7:
+                i = j + 2
+            elif nxt == 0xFF:
+                i = j + 1
+            else:
+                i = j
+                break
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_end(buf: bytearray) -> int:
+    """End offset of the PNG at the start of ``buf``, or -1 if incomplete."""
+    if len(buf) < 8:
+        return -1
+    if buf[:8] != _PNG_SIGNATURE:
+        raise ValueError("image stream is not PNG")
+    i, n = 8, len(buf)
+    while True:
+        if i + 8 > n:
+            return -1
+        length = int.from_bytes(buf[i : i + 4], "big")
+        end = i + 12 + length
+        if buf[i + 4 : i + 8] == b"IEND":
+            return end if end <= n else -1
+        i = end
+
+
+def split_image_stream(stream, kind: str, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    """Split an ``image2pipe`` byte stream into individual encoded images.
+
+    ``kind`` is ``"jpeg"`` or ``"png"``. Images are found by walking JPEG
+    markers or PNG chunks, so they are never decoded. Raises ``ValueError`` if
+    the stream is not of that kind or ends inside an image.
+    """
+    end_of = {"jpeg": _jpeg_end, "png": _png_end}[kind]
+    read = getattr(stream, "read1", stream.read)
+    buf = bytearray()
+    while True:
+        if buf:
+            end = end_of(buf)
+            if end >= 0:
+                yield bytes(buf[:end])
+                del buf[:end]
+                continue
+        chunk = read(chunk_size)
+        if not chunk:
+            if buf:
+                raise ValueError("image stream ended inside an image")
+            return
+        buf += chunk
+
+
+def write_archive_shards(
+    images: Iterable[bytes],
+    output_dir: Path,
+    archive: str,
+    pattern: str,
+    *,
+    shard_frames: Optional[int] = None,
+    overwrite: bool = False,
+    on_image: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Write encoded images sequentially into rolling tar or zip shards.
+
+    Image ``n`` (from 1) is stored uncompressed as ``frame_filename(pattern, n)``
+    in shard ``(n - 1) // shard_frames`` named from the ``archive`` template;
+    without ``shard_frames`` everything goes into shard 0. ``archive_index.csv``
+    in ``output_dir`` lists ``member,shard,offset,size`` for every image, where
+    ``offset`` is the position of the image bytes inside the shard file.
+    ``on_image`` is called with the running count. Returns the number of images.
+    """
+    import csv
+    import io
+    import tarfile
+    import zipfile
+
+    is_zip = Path(archive).suffix.lower() == ".zip"
+    mode = "w" if overwrite else "x"
+    rows = []
+    current = None
+    shard_no = -1
+    count = 0
+    try:
+        for data in images:
+            count += 1
+            wanted = (count - 1) // shard_frames if shard_frames else 0
+            if wanted != shard_no:
+                if current is not None:
+                    current.close()
+                shard_no = wanted
+                shard_path = output_dir / frame_filename(archive, shard_no)
+                if is_zip:
+                    current = zipfile.ZipFile(shard_path, mode, zipfile.ZIP_STORED)
+                else:
+                    current = tarfile.open(shard_path, mode)
+            name = frame_filename(pattern, count)
+            if is_zip:
+                current.writestr(zipfile.ZipInfo(name, time.localtime()[:6]), data)
+                offset = current.fp.tell() - len(data)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = int(time.time())
+                current.addfile(info, io.BytesIO(data))
+                padded = -(-len(data) // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+                offset = current.offset - padded
+            rows.append((name, shard_path.name, offset, len(data)))
+            if on_image is not None:
+                on_image(count)
+    finally:
+        if current is not None:
+            current.close()
+        with open(output_dir / ARCHIVE_INDEX, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["member", "shard", "offset", "size"])
+            writer.writerows(rows)
+    return count
+
+
+def _extract_to_archive(
+    cmd: List[str],
+    output_dir: Path,
+    archive: str,
+    pattern: str,
+    *,
+    shard_frames: Optional[int],
+    overwrite: bool,
+    on_progress: Optional[Callable[[dict], None]],
+    cancel: Optional[threading.Event] = None,
+) -> Tuple[int, int]:
+    """Run an ``image2pipe`` command and feed its stdout into archive shards.
+
+    Returns ``(return_code, frames_written)``. Progress events are produced
+    here from the images received, since stdout carries the image data.
+    """
+    import subprocess
+
+    kind = "jpeg" if Path(pattern).suffix.lower() in {".jpg", ".jpeg"} else "png"
+
+    def on_image(n: int) -> None:
+        on_progress({"frame": n, "out_time": None, "speed": None, "fps": None, "done": False})
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    _kill_on_cancel(proc, cancel)
+    try:
+        count = write_archive_shards(
+            split_image_stream(proc.stdout, kind),
+            output_dir,
+            archive,
+            pattern,
+            shard_frames=shard_frames,
+            overwrite=overwrite,
+            on_image=on_image if on_progress else None,
+        )
+    except (ValueError, OSError) as exc:
+        proc.kill()
+        print(f"Archive output failed: {exc}", file=sys.stderr)
+        return 1, 0
+    finally:
+        proc.stdout.close()
+        rc = proc.wait()
+    if rc == 0 and on_progress is not None:
+        on_progress({"frame": count, "out_time": None, "speed": None, "fps": None, "done": True})
+    return rc, count
+
+
+FRAMESTORE_EXT = ".framestore"
+FRAMESTORE_MAGIC = b"FRMSTORE"
+# magic, version, pix_fmt, width, height, channels, count, data offset, index offset
+_FRAMESTORE_HEADER = "<8sH8sIIIQQQ"
+# Frames start on a page boundary so mapped slices are page-aligned
+FRAMESTORE_DATA_OFFSET = 4096
+
+
+def validate_framestore_name(name: str) -> None:
+    """Check a frame store file name such as ``frames.framestore``.
+
+    Raises:
+        SystemExit: If the extension is not ``.framestore`` or the name
+            contains directories.
+    """
+    if Path(name).suffix.lower() != FRAMESTORE_EXT:
+        print(f"Frame store name must end in {FRAMESTORE_EXT}", file=sys.stderr)
+        sys.exit(1)
+    p = Path(name)
+    if p.is_absolute() or p.name != name or "/" in name or "\\" in name:
+        print(
+            "Frame store name must be a filename only (no directories or absolute paths)",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def write_framestore(
+    store_path: Path,
+    stream,
+    *,
+    width: int,
+    height: int,
+    pix_fmt: str = "rgb24",
+    pts: Optional[Callable[[], Sequence[float]]] = None,
+    overwrite: bool = False,
+    on_frame: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Write a ``rawvideo`` byte stream into a ``.framestore`` file.
+
+    Layout: a fixed header (see ``_FRAMESTORE_HEADER``), zero padding up to
+    ``FRAMESTORE_DATA_OFFSET``, the frames back to back at a fixed stride of
+    ``width * height * channels`` bytes, then one little-endian float64 PTS
+    (seconds) per frame. Frames are copied sequentially; a truncated tail is
+    dropped. ``pts`` is called once the stream is exhausted and returns the
+    frame times, so they may be collected concurrently; missing entries are
+    stored as NaN. The file is
+    written under a temporary name and moved into place when complete.
+
+    Returns the number of frames stored.
+    """
+    import struct
+
+    channels = RAW_PIX_FMTS[pix_fmt]
+    frame_bytes = width * height * channels
+    if store_path.exists() and not overwrite:
+        raise FileExistsError(f"Frame store already exists: {store_path}")
+    tmp = store_path.with_name(store_path.name + ".part")
+    count = 0
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(bytes(FRAMESTORE_DATA_OFFSET))
+            buf = bytearray(frame_bytes)
+            view = memoryview(buf)
+            while True:
+                got = 0
+                while got < frame_bytes:
+                    n = stream.readinto(view[got:])
+                    if not n:
+                        break
+                    got += n
+                if got < frame_bytes:
+                    break
+                fh.write(buf)
+                count += 1
+                if on_frame is not None:
+                    on_frame(count)
+            times = list(pts() if pts is not None else [])[:count]
+            times += [float("nan")] * (count - len(times))
+            index_offset = FRAMESTORE_DATA_OFFSET + count * frame_bytes
+            fh.write(struct.pack(f"<{count}d", *times))
+            fh.seek(0)
+            fh.write(
+                struct.pack(
+                    _FRAMESTORE_HEADER,
+                    FRAMESTORE_MAGIC,
+                    1,
+                    pix_fmt.encode("ascii"),
+                    width,
+                    height,
+                    channels,
+                    count,
+                    FRAMESTORE_DATA_OFFSET,
+                    index_offset,
+                )
+            )
+        os.replace(tmp, store_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return count
+
+
+class FrameStore:
+    """Random access to the frames of a ``.framestore`` file.
+
+    The file is memory-mapped read-only, so ``store[i]`` is an O(1) slice of
+    the mapping: no copy and no decode. Frames are NumPy ``uint8`` arrays of
+    shape ``(height, width[, channels])`` when NumPy is installed, else
+    ``memoryview`` objects of the same shape; either stays valid only while
+    the store is open (``close`` fails while frames are still referenced).
+
+    Example::
+
+        with FrameStore("frames/clip.framestore") as store:
+            frame = store[len(store) // 2]
+            when = store.pts[len(store) // 2]
+    """
+
+    def __init__(self, path) -> None:
+        import mmap
+        import struct
+
+        self.path = Path(path)
+        self._fh = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._fh.close()
+            raise ValueError(f"Not a frame store: {self.path}")
+        header_size = struct.calcsize(_FRAMESTORE_HEADER)
+        if len(self._mm) < header_size:
+            self.close()
+            raise ValueError(f"Not a frame store: {self.path}")
+        (
+            magic,
+            version,
+            pix_fmt,
+            self.width,
+            self.height,
+            self.channels,
+            self._count,
+            self._data_offset,
+            index_offset,
+        ) = struct.unpack_from(_FRAMESTORE_HEADER, self._mm)
+        if magic != FRAMESTORE_MAGIC or version != 1:
+            self.close()
+            raise ValueError(f"Not a frame store: {self.path}")
+        self.pix_fmt = pix_fmt.rstrip(b"\0").decode("ascii")
+        self.frame_bytes = self.width * self.height * self.channels
+        if self.channels > 1:
+            self.shape: Tuple[int, ...] = (self.height, self.width, self.channels)
+        else:
+            self.shape = (self.height, self.width)
+        if index_offset + 8 * self._count > len(self._mm):
+            self.close()
+            raise ValueError(f"Truncated frame store: {self.path}")
+        #: Presentation time in seconds of each frame
+        self.pts: List[float] = list(struct.unpack_from(f"<{self._count}d", self._mm, index_offset))
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        self._np = np
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("frame index out of range")
+        offset = self._data_offset + index * self.frame_bytes
+        if self._np is not None:
+            return self._np.frombuffer(
+                self._mm, dtype=self._np.uint8, count=self.frame_bytes, offset=offset
+            ).reshape(self.shape)
+        return memoryview(self._mm)[offset : offset + self.frame_bytes].cast("B", self.shape)
+
+    def close(self) -> None:
+        """Unmap the file and close it."""
+        self._mm.close()
+        self._fh.close()
+
+    def __enter__(self) -> "FrameStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_SHOWINFO_PTS_RE = re.compile(r"\[Parsed_showinfo[^]]*\].*\bpts_time:\s*(\S+)")
+
+
+def extract_framestore(
+    input_video: Path,
+    store_path: Path,
+    *,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    fps: Optional[float] = None,
+    size: Optional[Tuple[int, int]] = None,
+    scaler: Optional[str] = None,
+    pix_fmt: str = "rgb24",
+    overwrite: bool = False,
+    dry_run: bool = False,
+    on_progress: Optional[Callable[[dict], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Tuple[int, int, List[str]]:
+    """Decode a range into a ``.framestore`` file (see :func:`write_framestore`).
+
+    ``ffmpeg`` writes ``rawvideo`` to a pipe that is copied straight into the
+    store, while the ``showinfo`` filter's stderr log supplies each frame's
+    PTS (shifted by ``start`` so it is a position in the source). Without
+    ``size`` the probed source size is used; ``scaler`` picks the swscale
+    algorithm for resizing to ``size``. Returns
+    ``(return_code, frames_written, cmd)`` like :func:`extract_frames`;
+    ``dry_run`` only builds ``cmd``; ``cancel`` kills ffmpeg as described for
+    :func:`extract_frames`.
+    """
+    import subprocess
+
+    if pix_fmt not in RAW_PIX_FMTS:
+        raise ValueError(f"pix_fmt must be one of: {', '.join(sorted(RAW_PIX_FMTS))}")
+    if scaler is not None and scaler not in SCALERS:
+        raise ValueError(f"scaler must be one of: {', '.join(SCALERS)}")
+    cmd = build_ffmpeg_cmd(
+        input_video,
+        None,
+        start=start,
+        end=end,
+        fps=fps,
+        size=_frame_size(input_video, size) if size is not None else None,
+        scaler=scaler,
+        pipe_format="rawvideo",
+        pix_fmt=pix_fmt,
+        showinfo=True,
+    )
+    if dry_run:
+        return 0, 0, cmd
+    width, height = _frame_size(input_video, size)
+    offset = time_to_seconds(start) if start is not None else 0.0
+    pts: List[float] = []
+    other: List[str] = []
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _kill_on_cancel(proc, cancel)
+
+    def read_log() -> None:
+        for raw in proc.stderr:
+            line = raw.decode("utf-8", "replace")
+            m = _SHOWINFO_PTS_RE.search(line)
+            if m:
+                try:
+                    pts.append(float(m.group(1)) + offset)
+                    continue
+                except ValueError:
+                    pass
+            other.append(line)
+
+    def frame_times() -> List[float]:
+        # stdout is at EOF, so ffmpeg is exiting; let the log reader catch up
+        proc.wait()
+        log_thread.join()
+        return pts
+
+    def on_frame(n: int) -> None:
+        on_progress({"frame": n, "out_time": None, "speed": None, "fps": None, "done": False})
+
+    log_thread = threading.Thread(target=read_log, daemon=True)
+    log_thread.start()
+    try:
+        count = write_framestore(
+            store_path,
+            proc.stdout,
+            width=width,
+            height=height,
+            pix_fmt=pix_fmt,
+            pts=frame_times,
+            overwrite=overwrite,
+            on_frame=on_frame if on_progress else None,
+        )
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        proc.stdout.close()
+        rc = proc.wait()
+        log_thread.join()
+        proc.stderr.close()
+    if rc != 0:
+        sys.stderr.write("".join(other))
+        store_path.unlink(missing_ok=True)
+        return rc, 0, cmd
+    if on_progress is not None:
+        on_progress({"frame": count, "out_time": None, "speed": None, "fps": None, "done": True})
+    return 0, count, cmd
+
+
+def _bytes_written_since(
+    output_dir: Path, since_ns: int, shard_size: Optional[int] = None
+) -> Tuple[int, int]:
+    """Return ``(bytes, files)`` of this run's files in ``output_dir``.
+
+    Counts files modified since ``since_ns`` directly in ``output_dir`` and,
+    with ``shard_size``, in the numbered shard directories frames were moved
+    into during the run. Other subdirectories are not walked.
+    """
+    total = files = 0
+    shards: List[str] = []
+
+    def scan(directory, top: bool) -> None:
+        nonlocal total, files
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                    if entry.is_dir(follow_symlinks=False):
+                        if top and shard_size and entry.name.isdigit() and st.st_mtime_ns >= since_ns:
+                            shards.append(entry.path)
+                        continue
+                except OSError:
+                    continue
+                if st.st_mtime_ns >= since_ns:
+                    total += st.st_size
+                    files += 1
+
+    scan(output_dir, True)
+    for shard in shards:
+        scan(shard, False)
+    return total, files
+
+
+def _child_rusage() -> Optional[Tuple[float, float, int]]:
+    """``(user_s, sys_s, max_rss_kb)`` of waited-for children (``None`` without ``resource``)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # macOS reports bytes, Linux KiB
+    rss = ru.ru_maxrss // 1024 if sys.platform == "darwin" else ru.ru_maxrss
+    return ru.ru_utime, ru.ru_stime, rss
+
+
+def _extract_with_stats(
+    kwargs: dict, stats: Optional[dict], stats_json: Optional[Path]
+) -> Tuple[int, int, List[str]]:
+    """Run :func:`extract_frames` with a stage timer and collect its statistics.
+
+    Fills ``stats`` (see :func:`extract_frames`) and writes it to
+    ``stats_json`` if given.
+    """
+    import json
+
+    timer = _StageTimer()
+    since_ns = time.time_ns()
+    usage_before = _child_rusage()
+    first_frame: List[float] = []
+    last: dict = {}
+    on_progress = kwargs.get("on_progress")
+
+    def observe(event: dict) -> None:
+        if event.get("frame") and not first_frame:
+            first_frame.append(time.perf_counter())
+        last.update({k: v for k, v in event.items() if v is not None})
+        if on_progress is not None:
+            on_progress(event)
+
+    _STAGE_TIMER.timer = timer
+    started = time.perf_counter()
+    try:
+        rc, frames, cmd = extract_frames(**dict(kwargs, on_progress=observe))
+    finally:
+        _STAGE_TIMER.timer = None
+    timer.lap("finalize" if "extract" in timer.stages else "extract")
+    wall = time.perf_counter() - started
+
+    output_dir = Path(kwargs["output_dir"])
+    written = files = 0
+    if not kwargs.get("dry_run") and output_dir.is_dir():
+        written, files = _bytes_written_since(output_dir, since_ns, kwargs.get("shard_size"))
+    usage_after = _child_rusage()
+    child = {"child_user_s": None, "child_sys_s": None, "child_cpu_s": None, "child_max_rss_kb": None}
+    if usage_before is not None and usage_after is not None:
+        user = usage_after[0] - usage_before[0]
+        system = usage_after[1] - usage_before[1]
+        child = {
+            "child_user_s": round(user, 4),
+            "child_sys_s": round(system, 4),
+            "child_cpu_s": round(user + system, 4),
+            "child_max_rss_kb": usage_after[2],
+        }
+    extract_s = timer.stages.get("extract", 0.0)
+    start_mark = timer.marks.get("plan")
+    result = {
+        "input_video": str(kwargs["input_video"]),
+        "output_dir": str(output_dir),
+        "rc": rc,
+        "frames": frames,
+        "wall_s": round(wall, 4),
+        "stages": {k: round(v, 4) for k, v in timer.stages.items()},
+        "first_frame_s": (
+            round(first_frame[0] - start_mark, 4) if first_frame and start_mark else None
+        ),
+        "speed": last.get("speed"),
+        "frames_per_s": round(frames / extract_s, 2) if frames and extract_s > 0 else None,
+        "bytes_written": written,
+        "files_written": files,
+        "bytes_per_frame": round(written / frames, 1) if frames else None,
+        "retries": timer.retries,
+        **child,
+    }
+    if stats is not None:
+        stats.clear()
+        stats.update(result)
+    if stats_json is not None:
+        Path(stats_json).write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    return rc, frames, cmd
+
+
+def extract_frames(
+    input_video: Path,
+    output_dir: Path,
+    *,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    fps: Optional[float] = None,
+    pattern: str = "frame_%06d.jpg",
+    overwrite: bool = False,
+    verbose: bool = False,
+    dry_run: bool = False,
+    jobs: int = 1,
+    timestamps: Optional[Sequence] = None,
+    name_by: str = "index",
+    scene: Optional[float] = None,
+    on_progress: Optional[Callable[[dict], None]] = None,
+    resume: bool = False,
+    shard_size: Optional[int] = None,
+    archive: Optional[str] = None,
+    archive_shard_frames: Optional[int] = None,
+    framestore: Optional[str] = None,
+    keyframes_only: bool = False,
+    size: Optional[Tuple[int, int]] = None,
+    count: Optional[int] = None,
+    max_side: Optional[int] = None,
+    crop: Optional[Tuple[int, int, int, int]] = None,
+    scaler: Optional[str] = None,
+    pix_fmt: Optional[str] = None,
+    cancel: Optional[threading.Event] = None,
+    stats: Optional[dict] = None,
+    stats_json: Optional[Path] = None,
+) -> Tuple[int, int, List[str]]:
+    """Extract frames according to options and return status.
+
+    Returns a tuple of ``(return_code, frames_written, cmd)`` where ``cmd`` is the
+    argument list passed to ``ffmpeg``. In ``dry_run`` mode, no files are written
+    and ``frames_written`` is ``0``. ``frames_written`` is ffmpeg's own count from
+    its final ``-progress`` report, so files already in ``output_dir`` are never
+    counted and the directory is not listed; :func:`written_frame_files` gives
+    the corresponding file names.
+
+    With ``jobs > 1`` the range is split into keyframe-aligned segments that run
+    as concurrent ``ffmpeg`` processes (see :func:`plan_segments`); ``cmd`` is
+    then the command of the first segment.
+
+    ``timestamps`` (seconds or time strings) extracts the first frame at or after
+    each time instead of a range, in one ``select`` pass per group of nearby
+    times (see :func:`plan_timestamp_groups`); groups run on up to ``jobs``
+    processes. ``name_by="pts"`` then numbers files by frame PTS in
+    milliseconds instead of 1..N.
+
+    ``scene`` keeps only frames whose scene-change score exceeds the threshold
+    and writes each kept frame's timestamp and score to ``scenes.csv`` in
+    ``output_dir``.
+
+    ``on_progress`` is called with events from ffmpeg's ``-progress`` stream
+    (see :func:`parse_progress`); parallel passes are reported combined.
+
+    ``resume`` continues an interrupted run: frames already in ``output_dir``
+    are kept (see :func:`find_resume_point`) and only the missing tail is
+    decoded, starting at the matching timestamp with ``-start_number`` set.
+    ``frames_written`` then includes the frames kept from before.
+
+    ``shard_size`` bounds directory sizes: frames are moved into numbered
+    subdirectories of ``output_dir`` holding ``shard_size`` frames each (see
+    :func:`shard_name`), while ffmpeg runs for single-process extractions and
+    after the run otherwise.
+
+    ``archive`` (a template such as ``out-%05d.tar`` or ``.zip``) writes no
+    image files: ffmpeg encodes to an ``image2pipe`` stream that is split into
+    images and stored in rolling shards of ``archive_shard_frames`` images in
+    ``output_dir``, named by ``pattern`` inside the archive, plus an
+    ``archive_index.csv`` (see :func:`write_archive_shards`).
+
+    ``framestore`` (a file name ending in ``.framestore``) decodes the range
+    into one raw RGB file in ``output_dir`` for memory-mapped random access
+    with :class:`FrameStore` (see :func:`extract_framestore`).
+
+    ``keyframes_only`` decodes nothing but keyframes (``-skip_frame nokey``),
+    for quick representative thumbnails. ``fps`` then thins them to at most
+    that rate instead of resampling (see :func:`thin_keyframes`), and files are
+    numbered by PTS in milliseconds, taken from the keyframe index.
+
+    ``size`` scales every frame to ``(width, height)``; ``max_side`` instead
+    shrinks it to fit a square of that many pixels. ``crop`` (``x, y, w, h``)
+    is cut out first, ``scaler`` picks the swscale algorithm and ``pix_fmt``
+    the output pixel format, so frames leave ffmpeg at their final size and
+    format (see :func:`build_ffmpeg_cmd`).
+
+    For sparse ``fps`` sampling a cost model (see :func:`plan_seek_strategy`)
+    may replace the continuous decode by one seek per sample, run in parallel;
+    ``verbose`` reports the decision.
+
+    ``count`` extracts exactly that many frames, evenly spaced over the range
+    (the centre of each of ``count`` equal slices, see
+    :func:`plan_count_times`), each by its own seek on up to
+    :data:`SEEK_WORKERS` parallel processes. A sample that yields no frame is
+    retried slightly earlier; if one still fails the return code is 1. The
+    range end defaults to the probed duration.
+
+    Setting the ``cancel`` event from another thread kills the running ffmpeg
+    processes at once and starts no further ones; the call then returns a
+    non-zero return code with no frames counted, and frames already written
+    are left in place.
+
+    ``stats`` (a dict, filled in place) and/or ``stats_json`` (a file path)
+    collect run statistics: ``stages`` maps ``validate``, ``probe``
+    (ffprobe calls), ``plan`` (command building, seek planning), ``extract``
+    (ffmpeg decoding and writing) and ``finalize`` (renames, sharding,
+    sidecars) to seconds. ``first_frame_s`` is the time from ffmpeg's start
+    to its first frame (seek plus first decode), to within the 50 ms
+    progress interval used while collecting stats. Also included are ``speed``
+    (ffmpeg's last reported realtime factor), ``frames_per_s`` (over the
+    extract stage) and ``bytes_written``/``files_written`` for files in
+    ``output_dir`` modified by the run, with ``bytes_per_frame``, and
+    ``retries`` (ffmpeg commands re-run, see ``count``). The
+    ``child_*`` values are ``getrusage`` figures for child processes: CPU
+    seconds used during the call, and the largest child's peak RSS in KiB
+    (``None`` where ``resource`` is unavailable). Other threads' children are
+    counted too when extractions run concurrently. The RSS is a lifetime
+    maximum over every child this Python process has waited for, so after
+    an earlier, larger run it only bounds this run's peak from above.
+    ``bytes_written`` counts ``output_dir`` itself and, with ``shard_size``,
+    the shard directories touched by the run.
+    """
+    if (stats is not None or stats_json is not None) and getattr(_STAGE_TIMER, "timer", None) is None:
+        kwargs = {k: v for k, v in locals().items() if k not in ("stats", "stats_json")}
+        return _extract_with_stats(kwargs, stats, stats_json)
+    check_ffmpeg_available()
+    validate_paths(input_video, output_dir)
+    validate_pattern(pattern)
+    if name_by not in ("index", "pts"):
+        print("name_by must be 'index' or 'pts'", file=sys.stderr)
+        sys.exit(1)
+    times: Optional[List[float]] = None
+    if timestamps is not None:
+        if start is not None or end is not None or fps is not None:
+            print("Timestamps cannot be combined with start, end or fps", file=sys.stderr)
+            sys.exit(1)
+        try:
+            times = [time_to_seconds(str(t)) for t in timestamps]
+        except ValueError as exc:
+            print(f"Invalid timestamp: {exc}", file=sys.stderr)
+            sys.exit(1)
+        if not times:
+            print("No timestamps given", file=sys.stderr)
+            sys.exit(1)
+    if resume and (times is not None or scene is not None or jobs > 1 or overwrite):
+        print("Resume cannot be combined with timestamps, scene, jobs or overwrite", file=sys.stderr)
+        sys.exit(1)
+    if shard_size is not None and shard_size <= 0:
+        print("Shard size must be a positive integer", file=sys.stderr)
+        sys.exit(1)
+    if archive_shard_frames is not None and archive is None:
+        print("Shard frames requires an archive", file=sys.stderr)
+        sys.exit(1)
+    if archive is not None:
+        validate_archive_pattern(archive)
+        if times is not None or jobs > 1 or resume or shard_size is not None:
+            print(
+                "Archive output cannot be combined with timestamps, jobs, resume or shard size",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        if archive_shard_frames is not None and archive_shard_frames <= 0:
+            print("Shard frames must be a positive integer", file=sys.stderr)
+            sys.exit(1)
+        first_shard = output_dir / frame_filename(archive, 0)
+        if first_shard.exists() and not overwrite and not dry_run:
+            print(f"Archive already exists: {first_shard} (use --overwrite)", file=sys.stderr)
+            sys.exit(1)
+    if keyframes_only and (
+        times is not None
+        or scene is not None
+        or resume
+        or jobs > 1
+        or archive is not None
+        or framestore is not None
+    ):
+        print(
+            "Keyframes-only mode cannot be combined with timestamps, scene, resume, jobs, "
+            "archive or framestore",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    if size is not None and max_side is not None:
+        print("Use either a scale size or a maximum side, not both", file=sys.stderr)
+        sys.exit(1)
+    if max_side is not None and max_side <= 0:
+        print("Maximum side must be a positive integer", file=sys.stderr)
+        sys.exit(1)
+    if scaler is not None:
+        if scaler not in SCALERS:
+            print(f"Scaler must be one of: {', '.join(SCALERS)}", file=sys.stderr)
+            sys.exit(1)
+        if size is None and max_side is None:
+            print("A scaler needs a scale size or a maximum side", file=sys.stderr)
+            sys.exit(1)
+    if count is not None:
+        if count <= 0:
+            print("Count must be a positive integer", file=sys.stderr)
+            sys.exit(1)
+        if (
+            fps is not None
+            or times is not None
+            or scene is not None
+            or resume
+            or keyframes_only
+            or archive is not None
+            or framestore is not None
+        ):
+            print(
+                "Count cannot be combined with fps, timestamps, scene, resume, keyframes-only, "
+                "archive or framestore",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+    if framestore is not None:
+        validate_framestore_name(framestore)
+        if (
+            times is not None
+            or jobs > 1
+            or resume
+            or shard_size is not None
+            or archive is not None
+            or scene is not None
+            or crop is not None
+            or max_side is not None
+        ):
+            print(
+                "Frame store output cannot be combined with timestamps, jobs, resume, "
+                "shard size, archive, scene, crop or max side",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        store_path = output_dir / framestore
+        if store_path.exists() and not overwrite and not dry_run:
+            print(f"Frame store already exists: {store_path} (use --overwrite)", file=sys.stderr)
+            sys.exit(1)
+        if not dry_run and not output_dir.exists():
+            output_dir.mkdir(parents=True, exist_ok=True)
+        _lap("validate")
+        try:
+            return extract_framestore(
+                input_video,
+                store_path,
+                start=start,
+                end=end,
+                fps=fps,
+                size=size,
+                scaler=scaler,
+                pix_fmt=pix_fmt or "rgb24",
+                overwrite=overwrite,
+                dry_run=dry_run,
+                on_progress=on_progress,
+                cancel=cancel,
+            )
+        except (RuntimeError, ValueError) as exc:
+            print(str(exc), file=sys.stderr)
+            sys.exit(1)
+    if scene is not None:
+        if times is not None or jobs > 1:
+            print("Scene mode cannot be combined with timestamps or jobs", file=sys.stderr)
+            sys.exit(1)
+        if not 0 < scene < 1:
+            print("Scene threshold must be between 0 and 1", file=sys.stderr)
+            sys.exit(1)
+    _lap("validate")
+
+    # Progress reports are always requested: the final one is the frame count
+    timed = getattr(_STAGE_TIMER, "timer", None) is not None
+    common = dict(
+        pattern=pattern,
+        overwrite=overwrite,
+        verbose=verbose,
+        progress=True,
+        progress_period=STATS_PROGRESS_PERIOD if timed else None,
+        size=size,
+        max_side=max_side,
+        crop=crop,
+        scaler=scaler,
+        pix_fmt=pix_fmt,
+    )
+    frame_pts: List[float] = []
+    done = 0
+    if resume:
+        done = find_resume_point(output_dir, pattern, shard_size)
+    sample_cmds = None
+    if fps is not None and not (done or keyframes_only or scene is not None or archive is not None):
+        sample_cmds = _sample_seek_cmds(
+            input_video, output_dir, start=start, end=end, fps=fps, **common
+        )
+    if done:
+        rate = fps or probe_video_info(input_video).get("fps")
+        if not rate:
+            print("Cannot resume: source frame rate is unknown", file=sys.stderr)
+            sys.exit(1)
+        start_s = time_to_seconds(start) if start is not None else 0.0
+        seek = grid_seek(
+            start_s,
+            done,
+            rate,
+            resample=fps is not None,
+            offset=0.0 if fps is not None else probe_start_offset(input_video),
+        )
+        if verbose:
+            print(f"Resuming after frame {done} at {seek:.3f}s", file=sys.stderr)
+        cmds = [
+            build_ffmpeg_cmd(
+                input_video,
+                output_dir,
+                start=f"{seek:.6f}",
+                end=end,
+                fps=fps,
+                start_number=done + 1,
+                **common,
+            )
+        ]
+    elif count is not None:
+        start_s = time_to_seconds(start) if start is not None else 0.0
+        if end is not None:
+            end_s = time_to_seconds(end)
+        else:
+            try:
+                end_s = probe_video_info(input_video).get("duration")
+            except RuntimeError:
+                end_s = None
+        if not end_s or end_s <= start_s:
+            print("Cannot use count: the range end is unknown; pass --end", file=sys.stderr)
+            sys.exit(1)
+        count_times = plan_count_times(start_s, end_s, count)
+        cmds = _count_cmds(input_video, output_dir, count_times, **common)
+        jobs = max(jobs, min(SEEK_WORKERS, os.cpu_count() or 1))
+    elif sample_cmds:
+        cmds = sample_cmds
+        # Independent short processes: run them side by side
+        jobs = max(jobs, min(SEEK_WORKERS, os.cpu_count() or 1))
+    elif keyframes_only:
+        cmds, frame_pts = _keyframe_cmds(
+            input_video, output_dir, start=start, end=end, fps=fps, **common
+        )
+        name_by = "pts"
+    elif times is not None:
+        cmds, frame_pts = _timestamp_cmds(input_video, output_dir, times, **common)
+    elif jobs > 1:
+        cmds = _segment_cmds(
+            input_video, output_dir, start=start, end=end, fps=fps, jobs=jobs, **common
+        )
+    else:
+        scene_opts = {}
+        if scene is not None:
+            scene_opts = dict(scene=scene, scene_log=output_dir / ".scenes.log")
+        if archive is not None:
+            # stdout carries the images, so progress is counted from them
+            scene_opts.update(pipe_format="image2pipe", progress=False)
+        cmds = [
+            build_ffmpeg_cmd(
+                input_video,
+                output_dir,
+                start=start,
+                end=end,
+                fps=fps,
+                **{**common, **scene_opts},
+            )
+        ]
+    if verbose and len(cmds) > 1:
+        for i, c in enumerate(cmds, 1):
+            printable = " ".join(shlex.quote(part) for part in c)
+            print(f"Segment {i}/{len(cmds)}: {printable}", file=sys.stderr)
+    cmd = cmds[0]
+    _lap("plan")
+
+    if dry_run:
+        return 0, 0, cmd
+
+    if not output_dir.exists():
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    flush = None
+    if archive is not None:
+        rc, frames = _extract_to_archive(
+            cmd,
+            output_dir,
+            archive,
+            pattern,
+            shard_frames=archive_shard_frames,
+            overwrite=overwrite,
+            on_progress=on_progress,
+            cancel=cancel,
+        )
+    elif count is not None:
+        rc, frames = _extract_count(
+            input_video,
+            output_dir,
+            cmds,
+            count_times,
+            (end_s - start_s) / count,
+            jobs,
+            on_progress,
+            cancel,
+            **common,
+        )
+    elif len(cmds) > 1:
+        rc, frames = _run_parallel(cmds, jobs, on_progress, cancel)
+    elif shard_size and not frame_pts:
+        hook, flush = _shard_progress_hook(output_dir, pattern, shard_size, done + 1, on_progress)
+        rc, frames = _run_ffmpeg(cmd, hook, cancel)
+    else:
+        rc, frames = _run_ffmpeg(cmd, on_progress, cancel)
+    _lap("extract")
+    if cancel is not None and cancel.is_set():
+        return rc or 1, 0, cmd
+    if rc != 0:
+        return rc, 0, cmd
+
+    numbers: Iterable[int] = range(done + 1, done + (frames or 0) + 1)
+    if times is not None and (frames or 0) < len(frame_pts):
+        print(
+            f"Only {frames or 0} of {len(frame_pts)} requested timestamp frames were written",
+            file=sys.stderr,
+        )
+    if keyframes_only and len(frame_pts) != (frames or 0):
+        print(
+            f"Decoded {frames or 0} keyframes but the index lists {len(frame_pts)}; "
+            "keeping sequential names",
+            file=sys.stderr,
+        )
+        frame_pts = []
+    if frame_pts and name_by == "pts":
+        renumbered = [(i, int(round(pts * 1000))) for i, pts in enumerate(frame_pts, 1)]
+        _rename_frames(output_dir, pattern, renumbered)
+        numbers = [new for _old, new in renumbered]
+    if flush is not None:
+        flush(frames or 0)
+    elif shard_size:
+        shard_frames(output_dir, pattern, numbers, shard_size)
+
+    if scene is not None:
+        log = output_dir / ".scenes.log"
+        if log.exists():
+            write_scene_sidecar(
+                log,
+                output_dir / SCENE_SIDECAR,
+                pattern,
+                shard_size=shard_size,
+                offset=time_to_seconds(start) if start is not None else 0.0,
+            )
+            log.unlink()
+
+    return 0, done + (frames or 0), cmd
+
+
+def _remove_new_frames(output_dir: Path, pattern: str, before: set, since_ns: int) -> int:
+    """Delete frames of ``pattern`` that were created since ``since_ns``.
+
+    ``before`` holds the matching names that existed when the run started.
+    Those are kept even if the run overwrote them (their old content is gone
+    either way), unless the rewrite was cut short and left a truncated image.
+    Returns the number of files removed.
+    """
+    regex = pattern_to_regex(pattern)
+    removed = 0
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            if not regex.match(entry.name):
+                continue
+            if entry.name in before and (
+                entry.stat().st_mtime_ns < since_ns or image_complete(Path(entry.path))
+            ):
+                continue
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+    return removed
+
+
+async def extract_frames_async(
+    input_video: Path,
+    output_dir: Path,
+    *,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    fps: Optional[float] = None,
+    pattern: str = "frame_%06d.jpg",
+    overwrite: bool = False,
+    verbose: bool = False,
+    size: Optional[Tuple[int, int]] = None,
+    max_side: Optional[int] = None,
+    crop: Optional[Tuple[int, int, int, int]] = None,
+    scaler: Optional[str] = None,
+    pix_fmt: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """Extract a range on the running event loop, yielding progress events.
+
+    ``ffmpeg`` is started with :func:`asyncio.create_subprocess_exec` and its
+    ``-progress`` stream is parsed as it arrives; each report is yielded as a
+    :func:`parse_progress` event, the last one having ``done`` set and the
+    final frame count. Options mean the same as for :func:`extract_frames`;
+    invalid values raise ``ValueError`` and a failed run ``RuntimeError``.
+
+    Cancelling the consuming task (or closing the iterator early) kills
+    ``ffmpeg`` and deletes the frames this run created, along with
+    ``output_dir`` if the run created it and it is left empty. With
+    ``overwrite``, frames that existed before keep whatever the run wrote
+    into them (only a truncated one is deleted).
+
+    Example::
+
+        async for event in extract_frames_async("talk.mp4", "frames", fps=1):
+            print(event["frame"], event["speed"])
+    """
+    import asyncio
+
+    input_video, output_dir = Path(input_video), Path(output_dir)
+    try:
+        start = parse_time(str(start)) if start is not None else None
+        end = parse_time(str(end)) if end is not None else None
+        fps = positive_fps(str(fps)) if fps is not None else None
+    except argparse.ArgumentTypeError as exc:
+        raise ValueError(str(exc)) from exc
+    if size is not None and max_side is not None:
+        raise ValueError("Use either size or max_side, not both")
+    if scaler is not None and scaler not in SCALERS:
+        raise ValueError(f"scaler must be one of: {', '.join(SCALERS)}")
+    try:
+        # The shared validators report on stderr and exit; a library call raises
+        check_ffmpeg_available()
+        validate_paths(input_video, output_dir)
+        validate_pattern(pattern)
+    except SystemExit:
+        raise ValueError(f"Invalid extraction request for {input_video}") from None
+
+    cmd = build_ffmpeg_cmd(
+        input_video,
+        output_dir,
+        start=start,
+        end=end,
+        fps=fps,
+        pattern=pattern,
+        overwrite=overwrite,
+        verbose=verbose,
+        progress=True,
+        size=size,
+        max_side=max_side,
+        crop=crop,
+        scaler=scaler,
+        pix_fmt=pix_fmt,
+    )
+    created_dir = not output_dir.exists()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    regex = pattern_to_regex(pattern)
+    before = {name for name in os.listdir(output_dir) if regex.match(name)}
+    started_ns = time.time_ns()
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE)
+    finished = False
+    try:
+        block: dict = {}
+        while True:
+            line = await proc.stdout.readline()
+            if not line:
+                break
+            key, sep, value = line.decode("utf-8", "replace").strip().partition("=")
+            if not sep:
+                continue
+            block[key] = value.strip()
+            if key == "progress":
+                yield _progress_event(block)
+                block = {}
+        rc = await proc.wait()
+        finished = True
+    finally:
+        if not finished:
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+            _remove_new_frames(output_dir, pattern, before, started_ns)
+            if created_dir and not any(output_dir.iterdir()):
+                output_dir.rmdir()
+    if rc != 0:
+        raise RuntimeError(f"ffmpeg exited with code {rc}")
+
+
+class OutputTarget(NamedTuple):
+    """One output of a single-decode multi-output run (:func:`extract_multi`).
+
+    ``size``/``max_side``/``crop``/``scaler``/``pix_fmt`` are as for
+    :func:`build_ffmpeg_cmd`. ``quality`` is the JPEG ``-q:v`` (1-31, lower is
+    better; default 2) or the PNG ``-compression_level`` (0-9).
+    """
+
+    output_dir: Path
+    pattern: str = "frame_%06d.jpg"
+    size: Optional[Tuple[int, int]] = None
+    max_side: Optional[int] = None
+    crop: Optional[Tuple[int, int, int, int]] = None
+    scaler: Optional[str] = None
+    quality: Optional[int] = None
+    pix_fmt: Optional[str] = None
+
+
+def build_multi_cmd(
+    input_video: Path,
+    targets: Sequence[OutputTarget],
+    *,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    fps: Optional[float] = None,
+    overwrite: bool = False,
+    verbose: bool = False,
+    progress: bool = False,
+) -> List[str]:
+    """Assemble one ``ffmpeg`` command that decodes once and writes every target.
+
+    The decoded (and ``fps``-sampled) stream is fanned out with ``split`` in a
+    ``-filter_complex`` graph; each branch gets its own crop/scale filters and
+    is mapped to its own image2 output with its own encoder options.
+    """
+    cmd: List[str] = ["ffmpeg", "-hide_banner"]
+    cmd += ["-loglevel", "info" if verbose else "error"]
+    if progress:
+        cmd += ["-progress", "pipe:1", "-nostats"]
+    if start is not None:
+        cmd += ["-ss", str(start)]
+    if end is not None:
+        cmd += ["-to", str(end)]
+    cmd += ["-i", str(input_video)]
+    head = [f"fps={fps}"] if fps is not None else []
+    head.append(f"split={len(targets)}")
+    chains = ["[0:v]" + ",".join(head) + "".join(f"[s{i}]" for i in range(len(targets)))]
+    labels = []
+    for i, t in enumerate(targets):
+        geometry = _geometry_filters(size=t.size, max_side=t.max_side, crop=t.crop, scaler=t.scaler)
+        if geometry:
+            chains.append(f"[s{i}]" + ",".join(geometry) + f"[o{i}]")
+            labels.append(f"[o{i}]")
+        else:
+            labels.append(f"[s{i}]")
+    cmd += ["-filter_complex", ";".join(chains)]
+    cmd += ["-y" if overwrite else "-n"]
+    for t, label in zip(targets, labels):
+        cmd += ["-map", label]
+        if t.pix_fmt is not None:
+            cmd += ["-pix_fmt", t.pix_fmt]
+        if Path(t.pattern).suffix.lower() in {".jpg", ".jpeg"}:
+            cmd += ["-q:v", str(t.quality if t.quality is not None else 2)]
+        elif t.quality is not None:
+            cmd += ["-compression_level", str(t.quality)]
+        cmd += [str(Path(t.output_dir) / t.pattern)]
+    return cmd
+
+
+def extract_multi(
+    input_video: Path,
+    targets: Sequence[OutputTarget],
+    *,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    fps: Optional[float] = None,
+    overwrite: bool = False,
+    verbose: bool = False,
+    dry_run: bool = False,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> Tuple[int, int, List[str]]:
+    """Extract several outputs (sizes, formats, dirs) from a single decode.
+
+    Every target is checked like a normal run (:func:`validate_paths`,
+    :func:`validate_pattern`, geometry options). Returns
+    ``(return_code, frames_per_target, cmd)``; all targets receive the same
+    frames, numbered 1..N.
+    """
+    check_ffmpeg_available()
+    if not targets:
+        print("No output targets given", file=sys.stderr)
+        sys.exit(1)
+    seen = set()
+    for t in targets:
+        validate_paths(input_video, Path(t.output_dir))
+        validate_pattern(t.pattern)
+        key = (Path(t.output_dir).resolve(), t.pattern)
+        if key in seen:
+            print(f"Duplicate output target: {Path(t.output_dir) / t.pattern}", file=sys.stderr)
+            sys.exit(1)
+        seen.add(key)
+        if t.size is not None and t.max_side is not None:
+            print("Use either a scale size or a maximum side, not both", file=sys.stderr)
+            sys.exit(1)
+        if t.scaler is not None and t.scaler not in SCALERS:
+            print(f"Scaler must be one of: {', '.join(SCALERS)}", file=sys.stderr)
+            sys.exit(1)
+        if t.quality is not None:
+            jpeg = Path(t.pattern).suffix.lower() in {".jpg", ".jpeg"}
+            low, high = (1, 31) if jpeg else (0, 9)
+            if not low <= t.quality <= high:
+                print(
+                    f"Quality for {t.pattern} must be between {low} and {high}", file=sys.stderr
+                )
+                sys.exit(1)
+
+    cmd = build_multi_cmd(
+        input_video,
+        targets,
+        start=start,
+        end=end,
+        fps=fps,
+        overwrite=overwrite,
+        verbose=verbose,
+        progress=True,
+    )
+    if dry_run:
+        return 0, 0, cmd
+    for t in targets:
+        Path(t.output_dir).mkdir(parents=True, exist_ok=True)
+    rc, frames = _run_ffmpeg(cmd, on_progress)
+    if rc != 0:
+        return rc, 0, cmd
+    return 0, frames or 0, cmd
+
+
+_TARGET_KEYS = {"output_dir", "pattern", "scale", "max_side", "crop", "scaler", "quality", "pix_fmt"}
+
+
+def load_output_targets(path: Path) -> List[OutputTarget]:
+    """Read multi-output targets from a JSON config file.
+
+    The file holds ``{"outputs": [{...}, ...]}``; each entry needs
+    ``output_dir`` and may set ``pattern``, ``scale`` (``"WxH"``),
+    ``max_side``, ``crop`` (``"x:y:w:h"``), ``scaler``, ``quality`` and
+    ``pix_fmt``. Raises ``ValueError`` naming the offending entry.
+    """
+    import json
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"{path}: invalid JSON ({exc})") from None
+    entries = data.get("outputs") if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path}: expected a non-empty \"outputs\" list")
+    targets = []
+    for i, entry in enumerate(entries, 1):
+        where = f"{path}: output {i}"
+        if not isinstance(entry, dict) or "output_dir" not in entry:
+            raise ValueError(f"{where}: needs an \"output_dir\"")
+        unknown = set(entry) - _TARGET_KEYS
+        if unknown:
+            raise ValueError(f"{where}: unknown keys {', '.join(sorted(unknown))}")
+        try:
+            targets.append(
+                OutputTarget(
+                    output_dir=Path(entry["output_dir"]),
+                    pattern=entry.get("pattern", "frame_%06d.jpg"),
+                    size=scale_size(entry["scale"]) if "scale" in entry else None,
+                    max_side=positive_int(str(entry["max_side"])) if "max_side" in entry else None,
+                    crop=crop_box(entry["crop"]) if "crop" in entry else None,
+                    scaler=entry.get("scaler"),
+                    quality=int(entry["quality"]) if "quality" in entry else None,
+                    pix_fmt=entry.get("pix_fmt"),
+                )
+            )
+        except (argparse.ArgumentTypeError, TypeError, ValueError) as exc:
+            raise ValueError(f"{where}: {exc}") from None
+    return targets
+
+
+def output_targets_file(value: str) -> List[OutputTarget]:
+    """``argparse`` type for the multi-output config file."""
+    try:
+        return load_output_targets(Path(value))
+    except (OSError, ValueError) as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def format_progress(event: dict) -> str:
+    """One-line human-readable rendering of a progress event."""
+    parts = [f"frame={event['frame']}"]
+    if event.get("out_time") is not None:
+        secs = event["out_time"]
+        parts.append(f"time={int(secs // 3600):02d}:{int(secs % 3600 // 60):02d}:{secs % 60:05.2f}")
+    if event.get("speed") is not None:
+        parts.append(f"speed={event['speed']:.2f}x")
+    return " ".join(parts)
+
+
+def print_progress(event: dict) -> None:
+    """CLI progress display: rewrite one stderr line, end it on the last event."""
+    end = "\n" if event.get("done") else ""
+    # Pad so a shorter line fully overwrites the previous one
+    print("\r" + format_progress(event).ljust(48), end=end, file=sys.stderr, flush=True)
+
+
+def _add_extract_args(parser: argparse.ArgumentParser) -> None:
+    """Register the extraction flags shared by the single and batch CLIs."""
+    parser.add_argument("--start", type=parse_time, help="Start time (sec or HH:MM:SS[.ms])")
+    parser.add_argument("--end", type=parse_time, help="End time (sec or HH:MM:SS[.ms])")
+    parser.add_argument("--fps", type=positive_fps, help="Sample at fixed frames per second")
+    parser.add_argument(
+        "--pattern",
+        default="frame_%06d.jpg",
+        help="Output filename pattern (.jpg/.jpeg/.png), e.g., frame_%%06d.jpg",
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Overwrite existing output files (ffmpeg -y)",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print more details while preparing the command",
+    )
+    parser.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        action="store_true",
+        default=False,
+        help="Do not execute ffmpeg; only print the constructed command",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=positive_int,
+        default=1,
+        help="Split the range into N keyframe-aligned segments run in parallel",
+    )
+    parser.add_argument(
+        "--timestamps",
+        type=timestamps_file,
+        metavar="FILE",
+        help="Extract the frame at each time listed in FILE (one per line)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run after the last complete frame in the output dir",
+    )
+    parser.add_argument(
+        "--shard-size",
+        dest="shard_size",
+        type=positive_int,
+        metavar="N",
+        help="Move frames into numbered subdirectories of at most N frames each",
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="TEMPLATE",
+        help="Write frames into tar/zip shards named by TEMPLATE (e.g. out-%%05d.tar) "
+        "instead of image files",
+    )
+    parser.add_argument(
+        "--shard-frames",
+        dest="shard_frames",
+        type=positive_int,
+        metavar="N",
+        help="With --archive, start a new shard every N frames",
+    )
+    parser.add_argument(
+        "--framestore",
+        metavar="NAME",
+        help="Decode into one raw NAME.framestore file for random access instead of images",
+    )
+    parser.add_argument(
+        "--keyframes-only",
+        dest="keyframes_only",
+        action="store_true",
+        help="Decode only keyframes (fast thumbnails); --fps thins them, files are named by PTS",
+    )
+    parser.add_argument(
+        "--scale",
+        type=scale_size,
+        metavar="WxH",
+        help="Scale frames to WxH, e.g. 320x180",
+    )
+    parser.add_argument(
+        "--count",
+        type=positive_int,
+        metavar="N",
+        help="Extract exactly N evenly spaced frames, each by its own seek",
+    )
+    parser.add_argument(
+        "--max-side",
+        dest="max_side",
+        type=positive_int,
+        metavar="PX",
+        help="Shrink frames so neither side exceeds PX pixels (keeps aspect ratio)",
+    )
+    parser.add_argument(
+        "--crop",
+        type=crop_box,
+        metavar="X:Y:W:H",
+        help="Crop this rectangle from each frame before scaling",
+    )
+    parser.add_argument(
+        "--scaler",
+        choices=SCALERS,
+        help="Scaling algorithm for --scale/--max-side (fast_bilinear is fastest)",
+    )
+    parser.add_argument(
+        "--pix-fmt",
+        dest="pix_fmt",
+        metavar="FMT",
+        help="Output pixel format, e.g. gray or yuvj444p",
+    )
+    parser.add_argument(
+        "--scene",
+        type=scene_threshold,
+        metavar="THRESHOLD",
+        help="Keep only frames with scene-change score above THRESHOLD (0-1); "
+        "writes scenes.csv with timestamps and scores",
+    )
+    parser.add_argument(
+        "--name-by",
+        dest="name_by",
+        choices=("index", "pts"),
+        default="index",
+        help="Number --timestamps output by position (index) or frame PTS in ms (pts)",
+    )
+
+
+def _extract_kwargs(args: argparse.Namespace) -> dict:
+    """Map parsed extraction flags to :func:`extract_frames` keyword arguments."""
+    return {
+        "start": args.start,
+        "end": args.end,
+        "fps": args.fps,
+        "pattern": args.pattern,
+        "overwrite": args.overwrite,
+        "verbose": args.verbose,
+        "dry_run": args.dry_run,
+        "jobs": args.jobs,
+        "timestamps": args.timestamps,
+        "name_by": args.name_by,
+        "scene": args.scene,
+        "resume": args.resume,
+        "shard_size": args.shard_size,
+        "archive": args.archive,
+        "archive_shard_frames": args.shard_frames,
+        "framestore": args.framestore,
+        "keyframes_only": args.keyframes_only,
+        "size": args.scale,
+        "count": args.count,
+        "max_side": args.max_side,
+        "crop": args.crop,
+        "scaler": args.scaler,
+        "pix_fmt": args.pix_fmt,
+    }
+
+
+# Metrics export ---------------------------------------------------------------
+
+METRIC_TIME_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+METRIC_SPEED_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+
+_METRIC_COUNTERS = (
+    ("framegrab_extractions_total", "Extractions finished, successful or not."),
+    ("framegrab_frames_extracted_total", "Frames written by finished extractions."),
+    ("framegrab_bytes_written_total", "Bytes of output files written by finished extractions."),
+    ("framegrab_ffmpeg_failures_total", "Extractions whose ffmpeg exited with an error."),
+    ("framegrab_retries_total", "ffmpeg commands re-run after a sample yielded no frame."),
+)
+_METRIC_HISTOGRAMS = (
+    ("framegrab_extraction_seconds", "Wall time per extracted video.", METRIC_TIME_BUCKETS),
+    ("framegrab_speed_factor", "ffmpeg realtime speed factor per extracted video.", METRIC_SPEED_BUCKETS),
+)
+# Minimum seconds between metrics rewrites for progress of running extractions
+METRICS_PROGRESS_INTERVAL = 5.0
+_METRIC_SAMPLE_RE = re.compile(r'^([a-zA-Z_:][\w:]*)(?:\{le="([^"]*)"\})?\s+(\S+)')
+
+
+def _metric_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsExporter:
+    """Keep a Prometheus textfile-collector file up to date with extraction metrics.
+
+    Counters (frames, bytes, failures, retries) and histograms (wall time and
+    speed factor per video) are fed from :func:`extract_frames` statistics
+    (see its ``stats`` argument) by :meth:`observe`. The file is rewritten
+    atomically (temporary file plus ``os.replace``) on every change, in the
+    text format node_exporter reads. Counters and histograms already in the
+    file are loaded first, so they keep counting across runs that share it.
+    Writers in different processes must use different files.
+
+    While extractions run, :meth:`progress` feeds their frame counts to the
+    ``framegrab_frames_in_progress`` gauge; those updates rewrite the file
+    at most every :data:`METRICS_PROGRESS_INTERVAL` seconds.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._counters = {name: 0.0 for name, _help in _METRIC_COUNTERS}
+        self._buckets = {name: [0.0] * (len(b) + 1) for name, _help, b in _METRIC_HISTOGRAMS}
+        self._sums = {name: 0.0 for name, _help, _b in _METRIC_HISTOGRAMS}
+        self._pending = 0
+        self._running: dict = {}
+        self._written = 0.0
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            text = self.path.read_text(encoding="utf-8")
+        except OSError:
+            return
+        bounds = {name: list(b) + [math.inf] for name, _help, b in _METRIC_HISTOGRAMS}
+        for line in text.splitlines():
+            m = _METRIC_SAMPLE_RE.match(line)
+            if not m:
+                continue
+            name, le, raw = m.groups()
+            try:
+                value = float(raw)
+            except ValueError:
+                continue
+            if name in self._counters:
+                self._counters[name] = value
+            elif name.endswith("_bucket") and name[: -len("_bucket")] in self._buckets and le:
+                family = name[: -len("_bucket")]
+                le_value = math.inf if le == "+Inf" else float(le)
+                if le_value in bounds[family]:
+                    self._buckets[family][bounds[family].index(le_value)] = value
+            elif name.endswith("_sum") and name[: -len("_sum")] in self._sums:
+                self._sums[name[: -len("_sum")]] = value
+
+    def _observe_histogram(self, name: str, value: float) -> None:
+        buckets = next(b for n, _help, b in _METRIC_HISTOGRAMS if n == name)
+        for i, bound in enumerate(list(buckets) + [math.inf]):
+            if value <= bound:
+                self._buckets[name][i] += 1
+        self._sums[name] += value
+
+    def started(self) -> None:
+        """Count one more pending (queued or running) extraction and rewrite the file."""
+        with self._lock:
+            self._pending += 1
+            self._write()
+
+    def progress(self, run: Hashable, event: dict) -> None:
+        """Note the latest progress ``event`` of the running extraction ``run``.
+
+        ``run`` is any key identifying the extraction until :meth:`observe`
+        is called with it. The file is rewritten only if the last write is
+        at least :data:`METRICS_PROGRESS_INTERVAL` seconds old.
+        """
+        with self._lock:
+            self._running[run] = event.get("frame") or 0
+            if time.monotonic() - self._written >= METRICS_PROGRESS_INTERVAL:
+                self._write()
+
+    def observe(
+        self, stats: Optional[dict], *, cancelled: bool = False, run: Optional[Hashable] = None
+    ) -> None:
+        """Record one finished extraction from its ``stats`` and rewrite the file.
+
+        A non-zero ``rc`` counts as an ffmpeg failure unless the run was
+        ``cancelled``. Time and speed histograms only take successful runs.
+        Empty ``stats`` (the run never started, e.g. on invalid options) only
+        end the pending count. ``run`` ends the progress tracked under that
+        key (see :meth:`progress`).
+        """
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+            self._running.pop(run, None)
+            if not stats:
+                self._write()
+                return
+            c = self._counters
+            c["framegrab_extractions_total"] += 1
+            c["framegrab_frames_extracted_total"] += stats.get("frames") or 0
+            c["framegrab_bytes_written_total"] += stats.get("bytes_written") or 0
+            c["framegrab_retries_total"] += stats.get("retries") or 0
+            if stats.get("rc"):
+                if not cancelled:
+                    c["framegrab_ffmpeg_failures_total"] += 1
+            else:
+                if stats.get("wall_s") is not None:
+                    self._observe_histogram("framegrab_extraction_seconds", stats["wall_s"])
+                if stats.get("speed") is not None:
+                    self._observe_histogram("framegrab_speed_factor", stats["speed"])
+            self._write()
+
+    def render(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, help_text in _METRIC_COUNTERS:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines.append(f"{name} {_metric_value(self._counters[name])}")
+        for name, help_text, buckets in _METRIC_HISTOGRAMS:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for bound, count in zip(list(buckets) + [math.inf], self._buckets[name]):
+                lines.append(f'{name}_bucket{{le="{_metric_value(bound)}"}} {_metric_value(count)}')
+            lines.append(f"{name}_sum {_metric_value(self._sums[name])}")
+            lines.append(f"{name}_count {_metric_value(self._buckets[name][-1])}")
+        lines += [
+            "# HELP framegrab_extractions_pending Extractions queued or running.",
+            "# TYPE framegrab_extractions_pending gauge",
+            f"framegrab_extractions_pending {self._pending}",
+            "# HELP framegrab_frames_in_progress Frames written so far by running extractions.",
+            "# TYPE framegrab_frames_in_progress gauge",
+            f"framegrab_frames_in_progress {_metric_value(sum(self._running.values()))}",
+            "# HELP framegrab_metrics_updated_timestamp_seconds Last update of this file.",
+            "# TYPE framegrab_metrics_updated_timestamp_seconds gauge",
+            f"framegrab_metrics_updated_timestamp_seconds {time.time():.3f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _write(self) -> None:
+        # The collector only reads *.prom, so the temporary name is never scraped
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self._written = time.monotonic()
+        try:
+            tmp.write_text(self.render(), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            print(f"Cannot write metrics file {self.path}: {exc}", file=sys.stderr)
+
+
+def _add_metrics_arg(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--metrics-file",
+        dest="metrics_file",
+        type=Path,
+        default=None,
+        help=(
+            "Keep Prometheus metrics (frames, bytes, failures, retries, time and speed "
+            "histograms) in this file, e.g. for the node_exporter textfile collector"
+        ),
+    )
+
+
+def _add_index_arg(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=None,
+        help=f"Keyframe index database to read and update (default: {INDEX_PATH})",
+    )
+
+
+def _use_index(index_path: Optional[Path]) -> None:
+    """Point the keyframe index at ``index_path`` for this process and its workers."""
+    global INDEX_PATH
+    if index_path is None:
+        return
+    INDEX_PATH = index_path
+    # Batch worker processes read it back when they import this module
+    os.environ[INDEX_ENV] = str(index_path)
+
+
+VIDEO_EXTS = (".mp4", ".mov", ".mkv", ".avi", ".webm", ".m4v")
+MANIFEST_EXTS = (".txt", ".lst", ".list")
+
+
+def collect_inputs(specs: Sequence[str]) -> List[Path]:
+    """Expand batch input specs into an ordered, de-duplicated list of videos.
+
+    Each spec may be a directory (its video files, non-recursive), a manifest
+    file (``.txt``/``.lst``/``.list``; one path per line, ``#`` comments,
+    relative paths resolved against the manifest's directory), a glob
+    (``**`` is recursive), or a plain video path.
+    """
+    found: List[Path] = []
+    for spec in specs:
+        path = Path(spec)
+        if path.is_dir():
+            found += sorted(
+                p for p in path.iterdir() if p.is_file() and p.suffix.lower() in VIDEO_EXTS
+            )
+        elif path.is_file() and path.suffix.lower() in MANIFEST_EXTS:
+            for line in path.read_text(encoding="utf-8").splitlines():
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                entry = Path(line)
+                found.append(entry if entry.is_absolute() else path.parent / entry)
+        elif path.is_file():
+            found.append(path)
+        else:
+            found += sorted(Path(p) for p in glob.glob(spec, recursive=True) if Path(p).is_file())
+    unique: List[Path] = []
+    seen = set()
+    for p in found:
+        key = os.path.normpath(str(p))
+        if key not in seen:
+            seen.add(key)
+            unique.append(p)
+    return unique
+
+
+def batch_output_dirs(inputs: Sequence[Path], output_root: Path) -> List[Path]:
+    """Return one output subdirectory per input, named after the file stem.
+
+    Repeated stems get a numeric suffix (``clip``, ``clip_2``, ...) that
+    skips names already taken, including other inputs' own stems, so
+    ``a/clip.mp4``, ``b/clip.mp4`` and ``c/clip_2.mp4`` get ``clip``,
+    ``clip_3`` and ``clip_2``. Names are compared case-insensitively, as on
+    macOS and Windows file systems.
+    """
+    stems = [inp.stem or "video" for inp in inputs]
+    # Every plain stem is reserved for the first input that has it
+    taken = {stem.casefold() for stem in stems}
+    seen: set = set()
+    dirs: List[Path] = []
+    for stem in stems:
+        name = stem
+        if stem.casefold() in seen:
+            n = 2
+            while f"{stem}_{n}".casefold() in taken:
+                n += 1
+            name = f"{stem}_{n}"
+            taken.add(name.casefold())
+        seen.add(stem.casefold())
+        dirs.append(output_root / name)
+    return dirs
+
+
+def _batch_job(
+    input_video: Path, output_dir: Path, kwargs: dict, with_stats: bool = False
+) -> Tuple[int, int, List[str], dict]:
+    """Process-pool entry point: one :func:`extract_frames` call per video.
+
+    Returns its result plus, ``with_stats``, the run statistics (empty if it
+    never ran or they were not asked for).
+    """
+    stats: dict = {}
+    try:
+        rc, count, cmd = extract_frames(
+            input_video, output_dir, stats=stats if with_stats else None, **kwargs
+        )
+        return rc, count, cmd, stats
+    except SystemExit as exc:
+        # Validation helpers exit; report that as a failed job instead
+        code = exc.code if isinstance(exc.code, int) else 1
+        return code or 1, 0, [], {}
+    except Exception as exc:
+        print(f"{input_video}: {exc}", file=sys.stderr)
+        return 1, 0, [], {}
+
+
+def _observe_batch_job(metrics: "MetricsExporter", fut) -> None:
+    # A job lost with its worker (BrokenProcessPool) or never run has no stats;
+    # its rerun on a fresh pool counts as a new pending extraction
+    failed = fut.cancelled() or fut.exception() is not None
+    metrics.observe({} if failed else fut.result()[3])
+
+
+def run_batch(
+    inputs: Sequence[Path],
+    output_root: Path,
+    *,
+    workers: Optional[int] = None,
+    metrics: Optional["MetricsExporter"] = None,
+    **kwargs,
+) -> List[Tuple[Path, int, int, List[str]]]:
+    """Extract every input on a process pool of at most ``workers`` processes.
+
+    Each video is written to its own subdirectory of ``output_root`` (see
+    :func:`batch_output_dirs`). Remaining keyword arguments are passed to
+    :func:`extract_frames`. Returns ``(input, return_code, frames, cmd)`` per
+    input, in input order. ``metrics`` is updated as each video finishes.
+
+    A worker that dies (crash, OOM kill) breaks the pool and fails every job
+    still queued on it. Those jobs are rerun on a fresh single-worker pool,
+    where the first job to break it again is the one that killed its worker:
+    it is reported with return code 1 and the rest carry on.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    outdirs = batch_output_dirs(inputs, output_root)
+    if not kwargs.get("dry_run") and inputs:
+        output_root.mkdir(parents=True, exist_ok=True)
+    with_stats = metrics is not None and not kwargs.get("dry_run")
+    results: dict = {}
+    todo = list(range(len(inputs)))
+    max_workers = workers or os.cpu_count() or 1
+    while todo:
+        lost: List[int] = []
+        blamed = False
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = []
+            for i in todo:
+                fut = pool.submit(_batch_job, inputs[i], outdirs[i], kwargs, with_stats)
+                if with_stats:
+                    metrics.started()
+                    fut.add_done_callback(lambda f: _observe_batch_job(metrics, f))
+                futures.append(fut)
+            for i, fut in zip(todo, futures):
+                try:
+                    rc, count, cmd, _stats = fut.result()
+                except BrokenProcessPool as exc:
+                    if max_workers == 1 and not blamed:
+                        print(f"{inputs[i]}: worker process died ({exc})", file=sys.stderr)
+                        results[i] = (inputs[i], 1, 0, [])
+                        blamed = True
+                    else:
+                        lost.append(i)
+                    continue
+                results[i] = (inputs[i], rc, count, cmd)
+        todo = lost
+        max_workers = 1
+    return [results[i] for i in range(len(inputs))]
+
+
+def batch_main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="framegrab.py batch",
+        description=(
+            "Extract frames from many videos on a bounded process pool. Each video "
+            "gets its own subdirectory of OUTPUT_ROOT."
+        ),
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Video files, directories, globs or manifest files (.txt/.lst/.list)",
+    )
+    parser.add_argument("output_root", type=Path, help="Directory for per-video output dirs")
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=None,
+        help="Maximum number of videos processed concurrently (default: CPU count)",
+    )
+    _add_extract_args(parser)
+    _add_index_arg(parser)
+    _add_metrics_arg(parser)
+    args = parser.parse_args(argv)
+
+    _use_index(args.index)
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("No input videos found.", file=sys.stderr)
+        return 1
+    if args.verbose:
+        print(f"Scheduling {len(inputs)} videos...", file=sys.stderr)
+
+    metrics = MetricsExporter(args.metrics_file) if args.metrics_file else None
+    results = run_batch(
+        inputs,
+        args.output_root,
+        workers=args.workers,
+        metrics=metrics,
+        **_extract_kwargs(args),
+    )
+
+    failed = 0
+    total = 0
+    for inp, rc, count, cmd in results:
+        if args.dry_run:
+            if cmd:
+                print(" ".join(shlex.quote(part) for part in cmd))
+        elif rc == 0:
+            print(f"{inp}: wrote {count} frames")
+        else:
+            print(f"{inp}: failed (exit code {rc})", file=sys.stderr)
+        if rc != 0:
+            failed += 1
+        total += count
+    if not args.dry_run:
+        print(
+            f"Batch: {len(results) - failed}/{len(results)} videos succeeded, "
+            f"{total} frames written to {args.output_root}"
+        )
+    return 1 if failed else 0
+
+
+def index_main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="framegrab.py index",
+        description=(
+            "Record probe info and keyframe positions of videos in the keyframe index "
+            "so later extractions do not have to scan the container again."
+        ),
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Video files, directories, globs or manifest files (.txt/.lst/.list)",
+    )
+    _add_index_arg(parser)
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=None,
+        help="Number of files probed concurrently (default: CPU count)",
+    )
+    args = parser.parse_args(argv)
+
+    _use_index(args.index)
+
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("No input videos found.", file=sys.stderr)
+        return 1
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    def job(inp: Path):
+        try:
+            return build_index(inp), None
+        except Exception as exc:
+            return None, exc
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers or os.cpu_count() or 1) as pool:
+        for inp, (info, err) in zip(inputs, pool.map(job, inputs)):
+            if err is not None or not info.get("keyframes"):
+                failed += 1
+                print(f"{inp}: could not index ({err or 'no keyframes found'})", file=sys.stderr)
+                continue
+            print(f"{inp}: {info['keyframes']} keyframes")
+    return 1 if failed else 0
+
+
+def multi_main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="framegrab.py multi",
+        description=(
+            "Decode a video once and write several outputs (directories, patterns, "
+            "sizes, quality) described in a JSON config file."
+        ),
+    )
+    parser.add_argument("input_video", type=Path, help="Path to input video file")
+    parser.add_argument(
+        "config",
+        type=output_targets_file,
+        help='JSON file with {"outputs": [{"output_dir": ..., "pattern": ..., ...}]}',
+    )
+    parser.add_argument("--start", type=parse_time, help="Start time (sec or HH:MM:SS[.ms])")
+    parser.add_argument("--end", type=parse_time, help="End time (sec or HH:MM:SS[.ms])")
+    parser.add_argument("--fps", type=positive_fps, help="Sample at fixed frames per second")
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Overwrite existing output files (ffmpeg -y)",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print more details while preparing the command",
+    )
+    parser.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        action="store_true",
+        default=False,
+        help="Do not execute ffmpeg; only print the constructed command",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Show a live frame/time/speed line on stderr while extracting",
+    )
+    args = parser.parse_args(argv)
+
+    rc, count, cmd = extract_multi(
+        args.input_video,
+        args.config,
+        start=args.start,
+        end=args.end,
+        fps=args.fps,
+        overwrite=args.overwrite,
+        verbose=args.verbose,
+        dry_run=args.dry_run,
+        on_progress=print_progress if args.progress and not args.dry_run else None,
+    )
+    if args.dry_run:
+        print(" ".join(shlex.quote(part) for part in cmd))
+        return rc
+    if rc != 0:
+        return rc
+    for target in args.config:
+        print(f"Wrote {count} frames to {target.output_dir}")
+    return rc
+
+
+# Job server -----------------------------------------------------------------
+
+SERVE_PORT = 8765
+# Finished jobs kept for status polling; older ones are forgotten first
+SERVE_HISTORY = 1000
+
+
+def _job_size(value) -> Tuple[int, int]:
+    return scale_size(value) if isinstance(value, str) else tuple(int(v) for v in value)
+
+
+def _job_crop(value) -> Tuple[int, int, int, int]:
+    return crop_box(value) if isinstance(value, str) else tuple(int(v) for v in value)
+
+
+def _job_flag(value) -> bool:
+    if not isinstance(value, bool):
+        raise ValueError("must be true or false")
+    return value
+
+
+def _job_timestamps(value) -> List[float]:
+    if not isinstance(value, list):
+        raise ValueError("timestamps must be a list")
+    return [time_to_seconds(str(v)) for v in value]
+
+
+# JSON job fields and how each becomes an extract_frames argument; the
+# converters are the CLI's argparse types so both accept the same values
+_JOB_FIELDS: dict = {
+    "start": lambda v: parse_time(str(v)),
+    "end": lambda v: parse_time(str(v)),
+    "fps": lambda v: positive_fps(str(v)),
+    "pattern": str,
+    "overwrite": _job_flag,
+    "verbose": _job_flag,
+    "dry_run": _job_flag,
+    "jobs": lambda v: positive_int(str(v)),
+    "timestamps": _job_timestamps,
+    "name_by": str,
+    "scene": lambda v: scene_threshold(str(v)),
+    "resume": _job_flag,
+    "shard_size": lambda v: positive_int(str(v)),
+    "archive": str,
+    "archive_shard_frames": lambda v: positive_int(str(v)),
+    "framestore": str,
+    "keyframes_only": _job_flag,
+    "size": _job_size,
+    "count": lambda v: positive_int(str(v)),
+    "max_side": lambda v: positive_int(str(v)),
+    "crop": _job_crop,
+    "scaler": str,
+    "pix_fmt": str,
+}
+
+
+def parse_job_spec(spec: dict) -> Tuple[Path, Path, dict]:
+    """Turn a JSON job into ``(input_video, output_dir, kwargs)`` for :func:`extract_frames`.
+
+    ``spec`` needs ``input_video`` and ``output_dir`` as absolute paths (a
+    server's working directory means nothing to its clients); every other
+    key must be one of the :func:`extract_frames` options in
+    :data:`_JOB_FIELDS`.
+
+    Raises:
+        ValueError: On a missing or relative path, an unknown key or an
+            invalid value.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("job must be a JSON object")
+    missing = [k for k in ("input_video", "output_dir") if not spec.get(k)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    relative = [k for k in ("input_video", "output_dir") if not Path(str(spec[k])).is_absolute()]
+    if relative:
+        raise ValueError(f"{', '.join(relative)} must be absolute")
+    unknown = sorted(set(spec) - set(_JOB_FIELDS) - {"input_video", "output_dir"})
+    if unknown:
+        raise ValueError(f"unknown option(s): {', '.join(unknown)}")
+    kwargs = {}
+    for key, value in spec.items():
+        if key in _JOB_FIELDS and value is not None:
+            try:
+                kwargs[key] = _JOB_FIELDS[key](value)
+            except (argparse.ArgumentTypeError, TypeError, ValueError) as exc:
+                raise ValueError(f"{key}: {exc}") from None
+    return Path(spec["input_video"]), Path(spec["output_dir"]), kwargs
+
+
+class _StderrTee:
+    """``sys.stderr`` stand-in that copies capturing threads' writes (see :func:`_captured_stderr`)."""
+
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.buffers: dict = {}
+
+    def write(self, text: str) -> int:
+        captured = self.buffers.get(threading.get_ident())
+        if captured is not None:
+            captured.append(text)
+        return self.stream.write(text)
+
+    def __getattr__(self, name: str):
+        return getattr(self.stream, name)
+
+
+_STDERR_LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def _captured_stderr() -> Iterator[List[str]]:
+    """Collect what the current thread writes to ``sys.stderr``, still passing it on.
+
+    Validation helpers report problems on stderr before exiting; this lets a
+    worker thread keep the reason without seeing other threads' output.
+    """
+    captured: List[str] = []
+    ident = threading.get_ident()
+    with _STDERR_LOCK:
+        if not isinstance(sys.stderr, _StderrTee):
+            sys.stderr = _StderrTee(sys.stderr)
+        tee = sys.stderr
+        tee.buffers[ident] = captured
+    try:
+        yield captured
+    finally:
+        with _STDERR_LOCK:
+            del tee.buffers[ident]
+            if not tee.buffers and sys.stderr is tee:
+                sys.stderr = tee.stream
+
+
+class JobQueue:
+    """Run :func:`extract_frames` jobs on a bounded thread pool and track them.
+
+    At most ``workers`` jobs run at once, however many are submitted; the
+    rest wait in order. Job status is a dict (see :meth:`get`) with a
+    ``status`` of ``queued``, ``running``, ``done``, ``failed`` or
+    ``cancelled`` and the latest ``progress`` event. ``metrics`` (see
+    :class:`MetricsExporter`) is updated as jobs are queued and finish.
+    """
+
+    def __init__(self, workers: int, metrics: Optional[MetricsExporter] = None) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._metrics = metrics
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._cancel: dict = {}
+        self._changed = threading.Condition()
+        self._next_id = 1
+
+    def submit(self, spec: dict) -> dict:
+        """Queue a JSON job (see :func:`parse_job_spec`) and return its status."""
+        input_video, output_dir, kwargs = parse_job_spec(spec)
+        with self._changed:
+            job_id = str(self._next_id)
+            self._next_id += 1
+            job = {
+                "id": job_id,
+                "status": "queued",
+                "input_video": str(input_video),
+                "output_dir": str(output_dir),
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+                "progress": None,
+                "rc": None,
+                "frames": None,
+                "cmd": None,
+                "error": None,
+            }
+            self._jobs[job_id] = job
+            self._cancel[job_id] = threading.Event()
+            self._forget_old()
+            snapshot = dict(job)
+        if self._metrics is not None:
+            self._metrics.started()
+        self._pool.submit(self._run, job_id, input_video, output_dir, kwargs)
+        return snapshot
+
+    def _forget_old(self) -> None:
+        finished = [k for k, j in self._jobs.items() if j["finished"] is not None]
+        for job_id in finished[: max(0, len(finished) - SERVE_HISTORY)]:
+            del self._jobs[job_id]
+            del self._cancel[job_id]
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._changed:
+            self._jobs[job_id].update(fields)
+            self._changed.notify_all()
+
+    def _progress(self, job_id: str, event: dict) -> None:
+        self._update(job_id, progress=event)
+        if self._metrics is not None:
+            self._metrics.progress(job_id, event)
+
+    def _run(self, job_id: str, input_video: Path, output_dir: Path, kwargs: dict) -> None:
+        with self._changed:
+            cancel = self._cancel.get(job_id)
+        stats: dict = {}
+        if cancel is None or cancel.is_set():
+            # Cancelled (and possibly forgotten) while queued
+            if self._metrics is not None:
+                self._metrics.observe(stats)
+            return
+        self._update(job_id, status="running", started=time.time())
+        fields: dict = {"status": "failed"}
+        with _captured_stderr() as messages:
+            try:
+                rc, frames, cmd = extract_frames(
+                    input_video,
+                    output_dir,
+                    on_progress=lambda event: self._progress(job_id, event),
+                    cancel=cancel,
+                    stats=stats if self._metrics is not None else None,
+                    **kwargs,
+                )
+                fields.update(rc=rc, frames=frames, cmd=cmd)
+                if cancel.is_set():
+                    fields["status"] = "cancelled"
+                elif rc == 0:
+                    fields["status"] = "done"
+            except SystemExit as exc:
+                # Validation helpers print the reason to stderr and exit
+                reason = " ".join("".join(messages).split())
+                fields.update(
+                    rc=exc.code if isinstance(exc.code, int) else 1,
+                    error=reason or "invalid job options",
+                )
+            except Exception as exc:
+                fields.update(rc=1, error=str(exc))
+        if self._metrics is not None:
+            self._metrics.observe(
+                {} if kwargs.get("dry_run") else stats, cancelled=cancel.is_set(), run=job_id
+            )
+        self._update(job_id, finished=time.time(), **fields)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a copy of a job's status, or ``None`` for an unknown id."""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def list(self) -> List[dict]:
+        """Return the status of every known job, oldest first."""
+        with self._changed:
+            return [dict(job) for job in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """Cancel a job: a queued one never starts, a running one has ffmpeg killed."""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job["finished"] is None:
+                self._cancel[job_id].set()
+                if job["status"] == "queued":
+                    job.update(status="cancelled", finished=time.time())
+                    self._changed.notify_all()
+            return dict(job)
+
+    def watch(self, job_id: str, timeout: float = 30.0) -> Iterator[dict]:
+        """Yield a job's status on every change until it finishes.
+
+        The unchanged status is repeated after ``timeout`` seconds without a
+        change, so a stream consumer can notice a dropped connection.
+        """
+        last = None
+        while True:
+            with self._changed:
+                if last is not None:
+                    self._changed.wait_for(lambda: self._jobs.get(job_id) != last, timeout)
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                snapshot = dict(job)
+            yield snapshot
+            if snapshot["finished"] is not None:
+                return
+            last = snapshot
+
+    def shutdown(self) -> None:
+        """Cancel queued and running jobs and wait for the workers to stop."""
+        with self._changed:
+            job_ids = list(self._jobs)
+        for job_id in job_ids:
+            self.cancel(job_id)
+        self._pool.shutdown(wait=True)
+
+
+_JOB_PATH_RE = re.compile(r"^/jobs/(\d+)(/events)?/?$")
+
+
+def _job_request_handler(jobs: JobQueue, token: Optional[str] = None):
+    """Build the HTTP handler class for :func:`serve` around a :class:`JobQueue`."""
+    import hmac
+    import json
+    from http.server import BaseHTTPRequestHandler
+
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        server_version = "framegrab"
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+        def _send_json(self, status: int, payload) -> None:
+            body = (json.dumps(payload) + "\n").encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _refuse(self) -> bool:
+            """Answer and return ``True`` for requests a local client would not send.
+
+            Browsers add an ``Origin`` header to cross-site requests, and DNS
+            rebinding shows up as a foreign ``Host``; both are refused so a web
+            page cannot drive the server. With a ``token``, TCP clients must
+            also send ``Authorization: Bearer <token>``.
+            """
+            if self.headers.get("Origin") is not None:
+                self._send_json(403, {"error": "cross-origin requests are not allowed"})
+                return True
+            address = self.server.server_address
+            if isinstance(address, tuple):
+                allowed = {f"127.0.0.1:{address[1]}", f"localhost:{address[1]}"}
+                if self.headers.get("Host") not in allowed:
+                    self._send_json(403, {"error": "unexpected Host header"})
+                    return True
+            if token is not None:
+                sent = self.headers.get("Authorization") or ""
+                if not hmac.compare_digest(sent.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+                    self._send_json(401, {"error": "missing or wrong token"})
+                    return True
+            return False
+
+        def do_GET(self) -> None:
+            if self._refuse():
+                return
+            path = self.path.split("?", 1)[0]
+            if path.rstrip("/") == "/jobs":
+                self._send_json(200, jobs.list())
+                return
+            m = _JOB_PATH_RE.match(path)
+            job = jobs.get(m.group(1)) if m else None
+            if job is None:
+                self._send_json(404, {"error": "no such job"})
+                return
+            if not m.group(2):
+                self._send_json(200, job)
+                return
+            # One JSON status per line until the job finishes
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            try:
+                for snapshot in jobs.watch(m.group(1)):
+                    self.wfile.write((json.dumps(snapshot) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_POST(self) -> None:
+            if self._refuse():
+                return
+            if self.path.split("?", 1)[0].rstrip("/") != "/jobs":
+                self._send_json(404, {"error": "not found"})
+                return
+            content_type = (self.headers.get("Content-Type") or "").split(";", 1)[0]
+            if content_type.strip().lower() != "application/json":
+                self._send_json(415, {"error": "Content-Type must be application/json"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                spec = json.loads(self.rfile.read(length) or b"null")
+                job = jobs.submit(spec)
+            except ValueError as exc:
+                self._send_json(400, {"error": str(exc)})
+                return
+            self._send_json(202, job)
+
+        def do_DELETE(self) -> None:
+            if self._refuse():
+                return
+            m = _JOB_PATH_RE.match(self.path.split("?", 1)[0])
+            job = jobs.cancel(m.group(1)) if m and not m.group(2) else None
+            if job is None:
+                self._send_json(404, {"error": "no such job"})
+                return
+            self._send_json(200, job)
+
+    return JobRequestHandler
+
+
+def serve(
+    jobs: JobQueue,
+    *,
+    port: int = SERVE_PORT,
+    socket_path: Optional[Path] = None,
+    token: Optional[str] = None,
+):
+    """Create the HTTP server of ``framegrab serve`` (not yet serving).
+
+    Listens on ``127.0.0.1:port``, or on the Unix socket ``socket_path``
+    instead. Requests with an ``Origin`` header, and TCP requests whose
+    ``Host`` is not ``127.0.0.1:<port>`` or ``localhost:<port>``, get
+    ``403``. With a ``token``, requests without ``Authorization: Bearer
+    <token>`` get ``401``. Requests are handled on their own threads:
+
+    - ``POST /jobs`` with a JSON job (see :func:`parse_job_spec`) queues it
+      and answers ``202`` with its status (``400`` for invalid jobs, ``415``
+      unless the ``Content-Type`` is ``application/json``).
+    - ``GET /jobs`` lists all jobs; ``GET /jobs/<id>`` returns one.
+    - ``GET /jobs/<id>/events`` streams the status as JSON lines on every
+      change until the job finishes.
+    - ``DELETE /jobs/<id>`` cancels the job.
+
+    Call ``serve_forever()`` on the result to run it.
+    """
+    import socketserver
+    from http.server import ThreadingHTTPServer
+
+    handler = _job_request_handler(jobs, token)
+    if socket_path is None:
+        return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+    class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def get_request(self):
+            request, _addr = super().get_request()
+            # BaseHTTPRequestHandler expects a (host, port) client address
+            return request, ("local", 0)
+
+    if socket_path.exists():
+        socket_path.unlink()
+    return UnixHTTPServer(str(socket_path), handler)
+
+
+def serve_main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="framegrab.py serve",
+        description=(
+            "Run a persistent extraction server that takes JSON jobs over local HTTP, "
+            "so repeated extractions skip interpreter startup and reuse warm probe "
+            "and keyframe caches."
+        ),
+    )
+    parser.add_argument(
+        "--port",
+        type=positive_int,
+        default=SERVE_PORT,
+        help=f"Port on 127.0.0.1 to listen on (default: {SERVE_PORT})",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="Listen on this Unix socket instead of a TCP port",
+    )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=None,
+        help="Maximum number of jobs extracted concurrently (default: CPU count)",
+    )
+    _add_index_arg(parser)
+    _add_metrics_arg(parser)
+    args = parser.parse_args(argv)
+    _use_index(args.index)
+
+    import secrets
+    import socket
+
+    check_ffmpeg_available()
+    if args.socket is not None and not hasattr(socket, "AF_UNIX"):
+        print("Unix sockets are not supported on this platform; use --port", file=sys.stderr)
+        return 1
+    metrics = MetricsExporter(args.metrics_file) if args.metrics_file else None
+    jobs = JobQueue(args.workers or os.cpu_count() or 1, metrics)
+    # Any local user can reach a TCP port; a Unix socket is guarded by its
+    # file permissions instead
+    token = secrets.token_urlsafe(24) if args.socket is None else None
+    try:
+        server = serve(jobs, port=args.port, socket_path=args.socket, token=token)
+    except OSError as exc:
+        print(f"Cannot listen: {exc}", file=sys.stderr)
+        return 1
+    if args.socket is not None:
+        print(f"Serving on {args.socket}", file=sys.stderr)
+    else:
+        print(f"Serving on http://127.0.0.1:{args.port}", file=sys.stderr)
+        print(f"Authorization: Bearer {token}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        jobs.shutdown()
+        if args.socket is not None and args.socket.exists():
+            args.socket.unlink()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "batch":
+        return batch_main(argv[1:])
+    if argv and argv[0] == "index":
+        return index_main(argv[1:])
+    if argv and argv[0] == "multi":
+        return multi_main(argv[1:])
+    if argv and argv[0] == "serve":
+        return serve_main(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        prog="framegrab.py",
+        description=(
+            "Extract frames from a video via ffmpeg. This scaffold prints the constructed "
+            "ffmpeg command in --dry-run mode. Use 'framegrab.py batch' for many videos, "
+            "'framegrab.py index' to pre-build the keyframe index, 'framegrab.py multi' "
+            "for several outputs from one decode and 'framegrab.py serve' for a "
+            "long-running job server."
+        ),
+    )
+    parser.add_argument("input_video", type=Path, help="Path to input video file")
+    parser.add_argument("output_dir", type=Path, help="Directory for extracted frames")
+    _add_extract_args(parser)
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Show a live frame/time/speed line on stderr while extracting",
+    )
+    parser.add_argument(
+        "--stats-json",
+        dest="stats_json",
+        type=Path,
+        default=None,
+        help="Write stage timings, throughput, bytes written and ffmpeg CPU/RSS to this JSON file",
+    )
+    _add_index_arg(parser)
+    _add_metrics_arg(parser)
+
+    args = parser.parse_args(argv)
+    _use_index(args.index)
+
+    if args.verbose:
+        print("Assembling ffmpeg command...", file=sys.stderr)
+
+    on_progress = print_progress if args.progress and not args.dry_run else None
+    metrics = None
+    if args.metrics_file and not args.dry_run:
+        metrics = MetricsExporter(args.metrics_file)
+        metrics.started()
+        show = on_progress
+
+        def report(event: dict) -> None:
+            metrics.progress(args.input_video, event)
+            if show is not None:
+                show(event)
+
+        on_progress = report
+    stats: dict = {}
+    try:
+        rc, count, cmd = extract_frames(
+            args.input_video,
+            args.output_dir,
+            on_progress=on_progress,
+            stats=stats if metrics is not None else None,
+            stats_json=args.stats_json,
+            **_extract_kwargs(args),
+        )
+    finally:
+        if metrics is not None:
+            metrics.observe(stats, run=args.input_video)
 
     printable = " ".join(shlex.quote(part) for part in cmd)
     if args.dry_run:
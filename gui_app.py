@@ -3,7 +3,8 @@
 FrameExtractor GUI (tkinter + ttk)
 
 Modernized, stdlib-only GUI that reuses ``framegrab.extract_frames``.
-Adds source info, FPS guard, estimates, pattern preview, reset, and prefs.
+Adds source info, FPS guard, estimates, pattern preview, reset, prefs, and a
+job queue with concurrent workers and per-job cancel.
 """
 
 from __future__ import annotations
@@ -14,15 +15,35 @@ import queue
 import re
 import shlex
 import threading
+import time
 import tkinter as tk
+from collections import deque
 from tkinter import filedialog, messagebox
 from tkinter import ttk
-from typing import Optional
+from typing import Deque, Dict, Optional
 
 from pathlib import Path
 
 import framegrab
 
+# Upper bound for the "Workers" setting (concurrent ffmpeg jobs)
+MAX_WORKERS = 8
+# How long Exit waits in total for cancelled jobs to stop their ffmpeg
+EXIT_JOIN_TIMEOUT = 3.0
+
+
+class Job:
+    """One queued extraction: its ``extract_frames`` arguments and state."""
+
+    def __init__(self, job_id: int, kwargs: dict, total: Optional[int]) -> None:
+        self.id = job_id
+        self.iid = str(job_id)
+        self.kwargs = kwargs
+        self.total = total
+        self.cancel = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.finished = False
+
 
 class App(tk.Tk):
     def __init__(self) -> None:
@@ -34,13 +55,17 @@ class App(tk.Tk):
         self._prefs_path = Path.home() / ".frameextractor.json"
 
         self._build_ui()
-        self._job: Optional[threading.Thread] = None
+        self._jobs: Dict[str, Job] = {}
+        self._pending: Deque[Job] = deque()
+        self._running: Dict[str, Job] = {}
+        self._next_job_id = 1
         self._msgs: "queue.Queue[str]" = queue.Queue()
         self._src_info: Optional[dict] = None
         self._theme: str = "system"
 
         self._load_prefs()
         self.protocol("WM_DELETE_WINDOW", self._on_exit)
+        self.after(100, self._drain_queue)
 
     def _apply_styles(self) -> None:
         style = ttk.Style()
@@ -204,30 +229,73 @@ class App(tk.Tk):
         actions_fr.grid_columnconfigure(0, weight=1)
         self.preview_btn = ttk.Button(actions_fr, text="Preview Command", command=self._on_preview)
         self.preview_btn.grid(row=0, column=0, sticky="w")
-        self.extract_btn = ttk.Button(actions_fr, text="Extract Frames", command=self._on_extract)
+        self.extract_btn = ttk.Button(actions_fr, text="Add to Queue", command=self._on_extract)
         self.extract_btn.grid(row=0, column=1, sticky="e")
         self.open_out_btn = ttk.Button(actions_fr, text="Open Output", command=self._open_output, state="disabled")
         self.open_out_btn.grid(row=0, column=2, sticky="e", padx=(8, 0))
         self.reset_btn = ttk.Button(actions_fr, text="Reset", command=self._on_reset)
         self.reset_btn.grid(row=0, column=3, sticky="e", padx=(8, 0))
+        ttk.Label(actions_fr, text="Workers:").grid(row=0, column=4, sticky="e", padx=(12, 0))
+        self.workers_var = tk.StringVar(value="1")
+        workers = ttk.Spinbox(
+            actions_fr,
+            from_=1,
+            to=MAX_WORKERS,
+            textvariable=self.workers_var,
+            width=3,
+            command=self._pump_jobs,
+        )
+        workers.grid(row=0, column=5, sticky="e")
+        workers.bind("<FocusOut>", lambda e: self._pump_jobs())
+
+        # Job queue: one row per extraction
+        jobs_fr = ttk.LabelFrame(root, text="Jobs")
+        jobs_fr.grid(row=3, column=0, sticky="nsew", pady=(8, 0))
+        jobs_fr.grid_columnconfigure(0, weight=1)
+        jobs_fr.grid_rowconfigure(0, weight=1)
+        self.jobs_view = ttk.Treeview(
+            jobs_fr,
+            columns=("video", "output", "status", "progress"),
+            show="headings",
+            height=5,
+        )
+        for col, heading, width in (
+            ("video", "Input Video", 200),
+            ("output", "Output Dir", 200),
+            ("status", "Status", 110),
+            ("progress", "Progress", 220),
+        ):
+            self.jobs_view.heading(col, text=heading)
+            self.jobs_view.column(col, width=width, stretch=col in ("video", "output"))
+        self.jobs_view.grid(row=0, column=0, columnspan=3, sticky="nsew")
+        jobs_scroll = ttk.Scrollbar(jobs_fr, orient="vertical", command=self.jobs_view.yview)
+        jobs_scroll.grid(row=0, column=3, sticky="ns")
+        self.jobs_view.configure(yscrollcommand=jobs_scroll.set)
+        ttk.Button(jobs_fr, text="Cancel Selected", command=self._on_cancel_jobs).grid(
+            row=1, column=1, sticky="e", pady=(6, 0)
+        )
+        ttk.Button(jobs_fr, text="Clear Finished", command=self._on_clear_jobs).grid(
+            row=1, column=2, sticky="e", padx=(8, 0), pady=(6, 0)
+        )
 
-        # Progress
+        # Overall progress: finished jobs out of all listed jobs
         prog_fr = ttk.Frame(root)
-        prog_fr.grid(row=3, column=0, sticky="ew", pady=(6, 0))
+        prog_fr.grid(row=4, column=0, sticky="ew", pady=(6, 0))
         prog_fr.grid_columnconfigure(1, weight=1)
         ttk.Label(prog_fr, text="Progress:").grid(row=0, column=0, sticky="w")
-        self.progress = ttk.Progressbar(prog_fr, mode="determinate", maximum=100)
+        self.progress = ttk.Progressbar(prog_fr, mode="determinate", maximum=1)
         self.progress.grid(row=0, column=1, sticky="ew")
-        self.progress_var = tk.StringVar(value="0%")
+        self.progress_var = tk.StringVar(value="0/0 jobs")
         self.progress_lbl = ttk.Label(prog_fr, textvariable=self.progress_var)
         self.progress_lbl.grid(row=0, column=2, sticky="e", padx=(6, 0))
 
         # Status area
         status_fr = ttk.LabelFrame(root, text="Status / Output")
-        status_fr.grid(row=4, column=0, sticky="nsew", pady=(8, 0))
-        root.grid_rowconfigure(4, weight=1)
+        status_fr.grid(row=5, column=0, sticky="nsew", pady=(8, 0))
+        root.grid_rowconfigure(3, weight=1)
+        root.grid_rowconfigure(5, weight=1)
         root.grid_columnconfigure(0, weight=1)
-        self.status = tk.Text(status_fr, height=10, wrap="word", state="disabled")
+        self.status = tk.Text(status_fr, height=8, wrap="word", state="disabled")
         self.status.grid(row=0, column=0, sticky="nsew")
         status_fr.grid_rowconfigure(0, weight=1)
         status_fr.grid_columnconfigure(0, weight=1)
@@ -235,13 +303,13 @@ class App(tk.Tk):
         # Bottom status bar
         self.statusbar_var = tk.StringVar(value="Ready")
         self.statusbar = ttk.Label(root, textvariable=self.statusbar_var, style="Status.TLabel")
-        self.statusbar.grid(row=5, column=0, sticky="ew", pady=(6, 0))
+        self.statusbar.grid(row=6, column=0, sticky="ew", pady=(6, 0))
 
         # Source info + estimate
         self.srcinfo_var = tk.StringVar(value="Source: –")
         self.estimate_var = tk.StringVar(value="Estimate: –")
         info_fr = ttk.Frame(root)
-        info_fr.grid(row=6, column=0, sticky="ew")
+        info_fr.grid(row=7, column=0, sticky="ew")
         ttk.Label(info_fr, textvariable=self.srcinfo_var).grid(row=0, column=0, sticky="w")
         ttk.Label(info_fr, textvariable=self.estimate_var).grid(row=0, column=1, sticky="e")
 
@@ -492,144 +560,178 @@ class App(tk.Tk):
             messagebox.showerror("Error", str(exc))
 
     def _on_extract(self) -> None:
-        if self._job and self._job.is_alive():
-            messagebox.showinfo("Busy", "An extraction is already running.")
-            return
         try:
             if not self._validate_fields():
                 self._append_status("Fix validation errors above.")
                 return
             kwargs = self._gather_args()
-            # Ensure source info/duration is available just before starting
-            # to enable determinate progress when possible.
+            # Ensure source info/duration is available before queueing so the
+            # job row can show determinate progress when possible.
             try:
                 if not self._src_info or not self._src_info.get("duration"):
                     info = framegrab.probe_video_info(kwargs["input_video"])  # may raise
                     self._update_srcinfo_ui(info)
             except Exception as exc:
-                # Non-fatal: proceed with indeterminate progress
+                # Non-fatal: the job row then counts frames without a total
                 self._append_status(f"Probe error: {exc}")
         except Exception as exc:
             messagebox.showerror("Error", str(exc))
             return
 
-        self.preview_btn.configure(state="disabled")
-        self.extract_btn.configure(state="disabled")
-        self.statusbar_var.set("Running...")
-
-        # Configure progress
-        self._setup_progress(kwargs)
-
-        def worker():
-            try:
-                rc, count, cmd = framegrab.extract_frames(**kwargs)
-                printable = " ".join(shlex.quote(part) for part in cmd)
-                if rc == 0 and not kwargs.get("dry_run", False):
-                    self._msgs.put(printable)
-                    self._msgs.put(f"Wrote {count} frames to {kwargs['output_dir']}")
-                elif rc == 0 and kwargs.get("dry_run", False):
-                    self._msgs.put(printable)
-                    self._msgs.put("(dry-run) Not executing ffmpeg.")
-                else:
-                    self._msgs.put(printable)
-                    self._msgs.put(f"ffmpeg returned non-zero exit code: {rc}")
-            except Exception as exc:
-                self._msgs.put(f"Error: {exc}")
-            finally:
-                self._msgs.put("__DONE__")
-
-        self._job = threading.Thread(target=worker, daemon=True)
-        self._job.start()
-        self.after(50, self._drain_queue)
-        self.after(200, self._poll_progress, kwargs)
+        job = Job(self._next_job_id, kwargs, self._estimated_total())
+        self._next_job_id += 1
+        self._jobs[job.iid] = job
+        self.jobs_view.insert(
+            "",
+            "end",
+            iid=job.iid,
+            values=(kwargs["input_video"].name, str(kwargs["output_dir"]), "Queued", ""),
+        )
+        self._pending.append(job)
+        self._pump_jobs()
+        self._update_overall()
 
-    def _setup_progress(self, kwargs: dict) -> None:
-        # Determine expected frame count from estimate text
-        est = None
+    def _estimated_total(self) -> Optional[int]:
+        # Expected frame count from the estimate text, if any
         m = re.search(r"~(\d+) frames", self.estimate_var.get())
-        if m:
-            try:
-                est = int(m.group(1))
-            except Exception:
-                est = None
-        self._progress_total = est if est and est > 0 else None
-        self._progress_glob = None
+        if not m:
+            return None
+        total = int(m.group(1))
+        return total if total > 0 else None
+
+    def _worker_count(self) -> int:
         try:
-            patt = kwargs.get("pattern") or "frame_%06d.jpg"
-            from framegrab import pattern_to_glob
-            self._progress_glob = pattern_to_glob(patt)
-        except Exception:
-            self._progress_glob = None
-        self._progress_outdir = Path(kwargs.get("output_dir", "."))
-        self._progress_running = not kwargs.get("dry_run", False)
-        self._progress_last = 0
-        if not self._progress_running:
-            # No progress for dry-run
-            self.progress.stop()
-            self.progress.configure(mode="determinate")
-            self.progress['value'] = 0
-            self.progress_var.set("0%")
+            n = int(self.workers_var.get())
+        except (TypeError, ValueError):
+            return 1
+        return min(max(n, 1), MAX_WORKERS)
+
+    def _pump_jobs(self) -> None:
+        """Start queued jobs while fewer than the configured workers run."""
+        while self._pending and len(self._running) < self._worker_count():
+            job = self._pending.popleft()
+            self._running[job.iid] = job
+            self._set_job_row(job, status="Running")
+            job.thread = threading.Thread(target=self._run_job, args=(job,), daemon=True)
+            job.thread.start()
+
+    def _run_job(self, job: Job) -> None:
+        # Worker thread: only talks to the UI through the message queue
+        kwargs = job.kwargs
+        tag = f"[#{job.id}]"
+
+        def on_progress(event: dict) -> None:
+            self._msgs.put(("__PROGRESS__", job.iid, event))
+
+        status = "Error"
+        try:
+            rc, count, cmd = framegrab.extract_frames(
+                on_progress=on_progress, cancel=job.cancel, **kwargs
+            )
+            printable = " ".join(shlex.quote(part) for part in cmd)
+            self._msgs.put(f"{tag} {printable}")
+            if job.cancel.is_set():
+                status = "Cancelled"
+                self._msgs.put(f"{tag} Cancelled; ffmpeg was stopped.")
+            elif rc == 0 and not kwargs.get("dry_run", False):
+                status = f"Done ({count} frames)"
+                self._msgs.put(f"{tag} Wrote {count} frames to {kwargs['output_dir']}")
+            elif rc == 0:
+                status = "Dry-run"
+                self._msgs.put(f"{tag} (dry-run) Not executing ffmpeg.")
+            else:
+                status = "Failed"
+                self._msgs.put(f"{tag} ffmpeg returned non-zero exit code: {rc}")
+        except SystemExit as exc:
+            self._msgs.put(f"{tag} Validation error: {exc}")
+        except Exception as exc:
+            self._msgs.put(f"{tag} Error: {exc}")
+        finally:
+            self._msgs.put(("__JOBDONE__", job.iid, status))
+
+    def _set_job_row(self, job: Job, *, status: Optional[str] = None, progress: Optional[str] = None) -> None:
+        if not self.jobs_view.exists(job.iid):
             return
-        if self._progress_total is None:
-            # Indeterminate when we cannot estimate total frames
-            self.progress.configure(mode="indeterminate")
-            self.progress.start(10)
-            self.progress_var.set("…")
-        else:
-            self.progress.stop()
-            self.progress.configure(mode="determinate", maximum=self._progress_total)
-            self.progress['value'] = 0
-            self.progress_var.set("0%")
-
-    def _poll_progress(self, kwargs: dict) -> None:
-        # Periodically update progress by counting files written
-        if not getattr(self, "_progress_running", False):
+        if status is not None:
+            self.jobs_view.set(job.iid, "status", status)
+        if progress is not None:
+            self.jobs_view.set(job.iid, "progress", progress)
+
+    def _update_job_progress(self, job: Job, event: dict) -> None:
+        # Driven by ffmpeg's -progress stream; no directory scans needed
+        if job.finished:
             return
-        try:
-            if self._progress_glob:
-                import glob as _glob
-                files = _glob.glob(str(self._progress_outdir / self._progress_glob))
-                count = len(files)
+        count = int(event.get("frame") or 0)
+        if job.total:
+            pct = int(100 * min(count, job.total) / job.total)
+            text = f"{pct}%  {framegrab.format_progress(event)}"
+        else:
+            text = framegrab.format_progress(event)
+        self._set_job_row(job, progress=text)
+
+    def _finish_job(self, job: Job, status: str) -> None:
+        job.finished = True
+        self._running.pop(job.iid, None)
+        self._set_job_row(job, status=status)
+        if status.startswith("Done") and job.total:
+            self._set_job_row(job, progress="100%")
+        if status.startswith("Done"):
+            self.open_out_btn.configure(state="normal")
+        self._pump_jobs()
+        self._update_overall()
+
+    def _update_overall(self) -> None:
+        total = len(self._jobs)
+        finished = sum(1 for job in self._jobs.values() if job.finished)
+        self.progress.configure(maximum=max(total, 1))
+        self.progress["value"] = finished
+        self.progress_var.set(f"{finished}/{total} jobs")
+        if self._running or self._pending:
+            self.statusbar_var.set(
+                f"Running {len(self._running)} job(s), {len(self._pending)} queued"
+            )
+        else:
+            self.statusbar_var.set("Ready")
+
+    def _on_cancel_jobs(self) -> None:
+        for iid in self.jobs_view.selection():
+            job = self._jobs.get(iid)
+            if job is None or job.finished:
+                continue
+            if job in self._pending:
+                self._pending.remove(job)
+                self._finish_job(job, "Cancelled")
             else:
-                count = 0
-        except Exception:
-            count = self._progress_last
-        self._progress_last = count
-        if self.progress.cget('mode') == 'determinate' and self._progress_total:
-            self.progress['value'] = min(count, self._progress_total)
-            pct = int(100 * min(count, self._progress_total) / max(1, self._progress_total))
-            self.progress_var.set(f"{pct}%")
-        # reschedule while job is alive
-        if self._job and self._job.is_alive():
-            self.after(300, self._poll_progress, kwargs)
+                # The worker's extract_frames kills ffmpeg and then reports back
+                job.cancel.set()
+                self._set_job_row(job, status="Cancelling…")
+
+    def _on_clear_jobs(self) -> None:
+        for iid, job in list(self._jobs.items()):
+            if job.finished:
+                del self._jobs[iid]
+                self.jobs_view.delete(iid)
+        self._update_overall()
 
     def _drain_queue(self) -> None:
         try:
             while True:
                 msg = self._msgs.get_nowait()
-                if msg == "__DONE__":
-                    self.preview_btn.configure(state="normal")
-                    self.extract_btn.configure(state="normal")
-                    self.statusbar_var.set("Ready")
-                    self.open_out_btn.configure(state="normal")
-                    # finalize progress
-                    self._progress_running = False
-                    try:
-                        self.progress.stop()
-                    except Exception:
-                        pass
-                    if self.progress.cget('mode') == 'determinate' and self._progress_total:
-                        self.progress['value'] = self._progress_total
-                        self.progress_var.set("100%")
+                if isinstance(msg, tuple) and msg and msg[0] == "__SRCINFO__":
+                    self._update_srcinfo_ui(msg[1])
+                elif isinstance(msg, tuple) and msg and msg[0] == "__PROGRESS__":
+                    job = self._jobs.get(msg[1])
+                    if job is not None:
+                        self._update_job_progress(job, msg[2])
+                elif isinstance(msg, tuple) and msg and msg[0] == "__JOBDONE__":
+                    job = self._jobs.get(msg[1])
+                    if job is not None:
+                        self._finish_job(job, msg[2])
                 else:
-                    if isinstance(msg, tuple) and msg and msg[0] == "__SRCINFO__":
-                        self._update_srcinfo_ui(msg[1])
-                    else:
-                        self._append_status(msg)
+                    self._append_status(msg)
         except queue.Empty:
             pass
-        if self._job and self._job.is_alive():
-            self.after(100, self._drain_queue)
+        self.after(100, self._drain_queue)
 
     def _open_output(self) -> None:
         path = self.out_var.get().strip()
@@ -683,6 +785,7 @@ class App(tk.Tk):
         self.overwrite_var.set(bool(data.get("overwrite", False)))
         self.verbose_var.set(bool(data.get("verbose", False)))
         self.dry_run_var.set(bool(data.get("dry_run", False)))
+        self.workers_var.set(str(data.get("workers", 1)))
         theme = data.get("theme")
         if theme in ("system", "light", "dark"):
             self._set_theme(theme)
@@ -702,6 +805,7 @@ class App(tk.Tk):
             "overwrite": bool(self.overwrite_var.get()),
             "verbose": bool(self.verbose_var.get()),
             "dry_run": bool(self.dry_run_var.get()),
+            "workers": self._worker_count(),
             "theme": self._theme,
         }
         try:
@@ -711,6 +815,16 @@ class App(tk.Tk):
 
     def _on_exit(self) -> None:
         self._save_prefs()
+        # Drop queued jobs and stop running ffmpeg processes before closing
+        self._pending.clear()
+        for job in self._running.values():
+            job.cancel.set()
+        # The workers' watcher threads kill ffmpeg within moments; wait for
+        # that, as these daemon threads die with the interpreter
+        deadline = time.monotonic() + EXIT_JOIN_TIMEOUT
+        for job in self._running.values():
+            if job.thread is not None:
+                job.thread.join(max(0.0, deadline - time.monotonic()))
         self.destroy()
 
 
@@ -0,0 +1,132 @@
+import csv
+import io
+import struct
+import tarfile
+import zipfile
+import zlib
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+def jpeg(tag: int) -> bytes:
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    sos = b"\xff\xda" + struct.pack(">H", 8) + bytes(6)
+    # Stuffed 0xFF, a restart marker and fill bytes must not end the scan
+    scan = bytes([tag]) + b"\xff\x00\x12\xff\xd3\x34\xff\xff"
+    return b"\xff\xd8" + app0 + sos + scan + b"\xff\xd9"
+
+
+def png(tag: int) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    ihdr = struct.pack(">IIBBBBB", 1, 1, 8, 0, 0, 0, 0)
+    idat = zlib.compress(bytes([0, tag]))
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", idat) + chunk(b"IEND", b"")
+
+
+class ChunkedReader:
+    """Returns at most ``size`` bytes per read, like a pipe."""
+
+    def __init__(self, data, size):
+        self.data = io.BytesIO(data)
+        self.size = size
+
+    def read(self, n):
+        return self.data.read(min(n, self.size))
+
+
+@pytest.mark.parametrize("make,kind", [(jpeg, "jpeg"), (png, "png")])
+def test_split_image_stream_across_reads(make, kind):
+    images = [make(i) for i in range(4)]
+    got = list(framegrab.split_image_stream(ChunkedReader(b"".join(images), 7), kind, 5))
+    assert got == images
+
+
+def test_split_image_stream_rejects_truncated_and_foreign_data():
+    with pytest.raises(ValueError):
+        list(framegrab.split_image_stream(io.BytesIO(jpeg(1)[:-1]), "jpeg"))
+    with pytest.raises(ValueError):
+        list(framegrab.split_image_stream(io.BytesIO(png(1)), "jpeg"))
+
+
+@pytest.mark.parametrize("archive", ["out-%03d.tar", "out-%03d.zip"])
+def test_write_archive_shards_rolls_and_indexes(tmp_path, archive):
+    images = [jpeg(i) for i in range(5)]
+    count = framegrab.write_archive_shards(
+        iter(images), tmp_path, archive, "frame_%06d.jpg", shard_frames=2
+    )
+    assert count == 5
+    shards = sorted(p.name for p in tmp_path.iterdir() if p.name.startswith("out-"))
+    assert shards == [framegrab.frame_filename(archive, n) for n in range(3)]
+    first = tmp_path / shards[0]
+    if archive.endswith(".tar"):
+        with tarfile.open(first) as tar:
+            assert tar.getnames() == ["frame_000001.jpg", "frame_000002.jpg"]
+    else:
+        with zipfile.ZipFile(first) as zf:
+            assert zf.namelist() == ["frame_000001.jpg", "frame_000002.jpg"]
+    with open(tmp_path / framegrab.ARCHIVE_INDEX, newline="") as fh:
+        rows = list(csv.DictReader(fh))
+    assert [r["member"] for r in rows][-1] == "frame_000005.jpg"
+    assert rows[4]["shard"] == shards[2]
+    for row, data in zip(rows, images):
+        raw = (tmp_path / row["shard"]).read_bytes()
+        offset = int(row["offset"])
+        assert raw[offset : offset + int(row["size"])] == data
+
+
+def test_extract_to_archive_streams_image2pipe(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "out"
+    outdir.mkdir()
+    payload = b"".join(png(i) for i in range(3))
+    seen = []
+
+    class FakePopen:
+        def __init__(self, cmd, stdout=None, **kwargs):
+            seen.append(cmd)
+            self.stdout = io.BufferedReader(io.BytesIO(payload))
+
+        def kill(self):
+            pass
+
+        def wait(self):
+            return 0
+
+    monkeypatch.setattr("subprocess.Popen", FakePopen)
+    events = []
+    rc, frames, cmd = framegrab.extract_frames(
+        inp, outdir, pattern="f_%04d.png", archive="shard-%02d.tar", on_progress=events.append
+    )
+    assert (rc, frames) == (0, 3)
+    assert cmd[-5:] == ["-c:v", "png", "-f", "image2pipe", "pipe:1"]
+    assert "-progress" not in cmd
+    assert sorted(p.name for p in outdir.iterdir()) == [framegrab.ARCHIVE_INDEX, "shard-00.tar"]
+    assert [e["frame"] for e in events] == [1, 2, 3, 3] and events[-1]["done"]
+
+
+def test_archive_validation(tmp_path, capsys):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    for extra in (
+        ["--archive", "out.tar"],
+        ["--archive", "out-%d.7z"],
+        ["--archive", "sub/out-%d.tar"],
+        ["--archive", "out-%d.tar", "--jobs", "2"],
+        ["--shard-frames", "10"],
+    ):
+        with pytest.raises(SystemExit):
+            framegrab.main([str(inp), str(tmp_path), *extra])
+    (tmp_path / "out-0.tar").write_bytes(b"")
+    with pytest.raises(SystemExit):
+        framegrab.main([str(inp), str(tmp_path), "--archive", "out-%d.tar"])
+    assert "already exists" in capsys.readouterr().err
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+class FakeProcess:
+    """Writes frame files and progress blocks; optionally hangs like a long run."""
+
+    def __init__(self, cmd, outdir, frames, hang):
+        self.cmd = cmd
+        self.returncode = None
+        self.killed = False
+        self.stdout = asyncio.StreamReader()
+        for n in range(1, frames + 1):
+            (outdir / f"frame_{n:06d}.jpg").write_bytes(b"jpg")
+            self.stdout.feed_data(f"frame={n}\nout_time_us={n * 500000}\nspeed=2.0x\n".encode())
+            self.stdout.feed_data(b"progress=continue\n" if hang or n < frames else b"progress=end\n")
+        if not hang:
+            self.stdout.feed_eof()
+            self.returncode = 0
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+        self.stdout.feed_eof()
+
+    async def wait(self):
+        return self.returncode
+
+
+@pytest.fixture
+def fake_exec(monkeypatch):
+    procs = []
+
+    def install(outdir, frames, hang=False):
+        async def create(*cmd, stdout=None, **kwargs):
+            proc = FakeProcess(list(cmd), outdir, frames, hang)
+            procs.append(proc)
+            return proc
+
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", create)
+        return procs
+
+    return install
+
+
+def _video(tmp_path):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    return inp
+
+
+def test_async_extraction_streams_events(tmp_path, fake_exec):
+    outdir = tmp_path / "frames"
+    outdir.mkdir()
+    procs = fake_exec(outdir, 3)
+
+    async def collect():
+        return [e async for e in framegrab.extract_frames_async(_video(tmp_path), outdir, fps=2)]
+
+    events = asyncio.run(collect())
+    assert [e["frame"] for e in events] == [1, 2, 3]
+    assert events[-1]["done"] and events[1]["out_time"] == 1.0 and events[0]["speed"] == 2.0
+    assert procs[0].cmd[procs[0].cmd.index("-progress") + 1] == "pipe:1"
+
+
+def test_cancel_kills_ffmpeg_and_removes_partial_frames(tmp_path, fake_exec):
+    outdir = tmp_path / "frames"
+    outdir.mkdir()
+    old = outdir / "frame_000009.jpg"
+    old.write_bytes(b"old")
+    (outdir / "notes.txt").write_text("keep")
+    procs = fake_exec(outdir, 2, hang=True)
+    seen = []
+
+    async def consume():
+        async for event in framegrab.extract_frames_async(_video(tmp_path), outdir):
+            seen.append(event)
+
+    async def run():
+        task = asyncio.create_task(consume())
+        while len(seen) < 2:
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert procs[0].killed
+    assert sorted(p.name for p in outdir.iterdir()) == ["frame_000009.jpg", "notes.txt"]
+
+
+def test_async_rejects_bad_options(tmp_path):
+    async def first(**kwargs):
+        async for _ in framegrab.extract_frames_async(_video(tmp_path), tmp_path, **kwargs):
+            break
+
+    with pytest.raises(ValueError):
+        asyncio.run(first(fps=0))
+    with pytest.raises(ValueError):
+        asyncio.run(first(pattern="out.gif"))
+
+
+def test_cancel_keeps_preexisting_frames_rewritten_with_overwrite(tmp_path, monkeypatch):
+    outdir = tmp_path / "frames"
+    outdir.mkdir()
+    (outdir / "frame_000001.jpg").write_bytes(b"old")
+    (outdir / "frame_000002.jpg").write_bytes(b"old")
+
+    async def create(*cmd, stdout=None, **kwargs):
+        # Frame 1 is rewritten completely, frame 2 is cut off mid-write
+        proc = FakeProcess(list(cmd), outdir, 2, hang=True)
+        (outdir / "frame_000001.jpg").write_bytes(b"\xff\xd8new\xff\xd9")
+        return proc
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", create)
+    seen = []
+
+    async def consume():
+        async for event in framegrab.extract_frames_async(_video(tmp_path), outdir, overwrite=True):
+            seen.append(event)
+
+    async def run():
+        task = asyncio.create_task(consume())
+        while len(seen) < 2:
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert [p.name for p in outdir.iterdir()] == ["frame_000001.jpg"]
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+from pathlib import Path
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+def _touch(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"fake")
+    return path
+
+
+def test_collect_inputs_from_dir_manifest_and_glob(tmp_path):
+    a = _touch(tmp_path / "videos" / "a.mp4")
+    b = _touch(tmp_path / "videos" / "b.MKV")
+    _touch(tmp_path / "videos" / "notes.md")
+    c = _touch(tmp_path / "more" / "deep" / "c.mov")
+    manifest = tmp_path / "list.txt"
+    manifest.write_text("# nightly\nvideos/a.mp4\n\nmore/deep/c.mov\n", encoding="utf-8")
+
+    assert framegrab.collect_inputs([str(tmp_path / "videos")]) == [a, b]
+    assert framegrab.collect_inputs([str(manifest)]) == [a, c]
+    assert framegrab.collect_inputs([str(tmp_path / "**" / "*.mov")]) == [c]
+    # Duplicates across specs are dropped, order is preserved
+    assert framegrab.collect_inputs([str(c), str(tmp_path / "videos"), str(a)]) == [c, a, b]
+
+
+def test_batch_output_dirs_disambiguate_stems(tmp_path):
+    dirs = framegrab.batch_output_dirs(
+        [Path("x/clip.mp4"), Path("y/clip.mov"), Path("z/other.mp4")], tmp_path
+    )
+    assert dirs == [tmp_path / "clip", tmp_path / "clip_2", tmp_path / "other"]
+    # A suffix never lands on another input's own stem, whatever the case
+    dirs = framegrab.batch_output_dirs(
+        [Path("a/clip.mp4"), Path("b/clip.mp4"), Path("c/clip_2.mp4"), Path("d/CLIP.mov")], tmp_path
+    )
+    assert [d.name for d in dirs] == ["clip", "clip_3", "clip_2", "CLIP_4"]
+
+
+def test_video_named_like_a_subcommand(tmp_path, monkeypatch, capsys):
+    _touch(tmp_path / "batch")
+    monkeypatch.chdir(tmp_path)
+    assert framegrab.main(["./batch", "out", "--dry-run"]) == 0
+    assert framegrab.main(["--dry-run", "--", "batch", "out"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert "-i batch" in out[0] and "-i batch" in out[1]
+
+
+def test_batch_dry_run_prints_one_command_per_video(tmp_path, capsys):
+    _touch(tmp_path / "in" / "a.mp4")
+    _touch(tmp_path / "in" / "b.mp4")
+    out = tmp_path / "out"
+    out.mkdir()
+    rc = framegrab.main(["batch", str(tmp_path / "in"), str(out), "--dry-run", "--workers", "2"])
+    assert rc == 0
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert len(lines) == 2
+    assert str(out / "a" / "frame_%06d.jpg") in lines[0]
+    assert str(out / "b" / "frame_%06d.jpg") in lines[1]
+    assert list(out.iterdir()) == []
+
+
+def test_batch_reports_failures_in_exit_status(tmp_path, capsys):
+    _touch(tmp_path / "in" / "a.mp4")
+    rc = framegrab.main(
+        ["batch", str(tmp_path / "in"), str(tmp_path / "out"), "--pattern", "bad.txt", "--workers", "1"]
+    )
+    assert rc == 1
+    assert "0/1 videos succeeded" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="workers must inherit the patched job"
+)
+def test_batch_survives_a_worker_that_dies(tmp_path, monkeypatch, capsys):
+    inputs = [_touch(tmp_path / "in" / f"{name}.mp4") for name in ("a", "crash", "b", "c")]
+
+    def extract(input_video, output_dir, **_kwargs):
+        if input_video.stem == "crash":
+            os._exit(137)
+        return 0, 1, ["ffmpeg", str(input_video)]
+
+    monkeypatch.setattr(framegrab, "extract_frames", extract)
+    results = framegrab.run_batch(inputs, tmp_path / "out", workers=2)
+    assert [(inp.stem, rc) for inp, rc, _count, _cmd in results] == [
+        ("a", 0),
+        ("crash", 1),
+        ("b", 0),
+        ("c", 0),
+    ]
+    assert "crash.mp4: worker process died" in capsys.readouterr().err
@@ -0,0 +1,55 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+import framegrab
+
+BENCH = Path(__file__).resolve().parent.parent / "benchmarks" / "bench_extract.py"
+
+
+@pytest.fixture(scope="module")
+def bench():
+    spec = importlib.util.spec_from_file_location("bench_extract", BENCH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _report(**fps):
+    return {
+        "results": [
+            {"video": "v", "case": case, "rc": 0, "frames": 10, "wall_s": 1.0, "fps": value}
+            for case, value in fps.items()
+        ]
+    }
+
+
+def test_case_kwargs_scale_range_to_duration(bench):
+    kwargs = bench.case_kwargs(bench.Case("range", start=0.4, end=0.6), 20.0)
+    assert kwargs == {"pattern": "frame_%06d.jpg", "overwrite": True, "start": "8.000", "end": "12.000"}
+    assert bench.case_kwargs(bench.Case("fps_thin", fps=2.0), 20.0)["fps"] == 2.0
+
+
+def test_compare_reports_flags_slowdowns_beyond_tolerance(bench):
+    baseline = _report(full_jpeg=100.0, fps_thin=50.0, range=80.0)
+    report = _report(full_jpeg=95.0, fps_thin=40.0)
+    problems = bench.compare_reports(report, baseline, tolerance=0.1)
+    assert len(problems) == 2
+    assert problems[0].startswith("v / fps_thin: 40.0 frames/s vs 50.0 baseline")
+    assert problems[1] == "v / range: missing from this run"
+    assert "-5%" in bench.format_report(report, baseline)
+
+
+def test_run_case_measures_one_extraction(bench, tmp_path, monkeypatch):
+    seen = {}
+
+    def fake_extract(input_video, output_dir, **kwargs):
+        seen.update(kwargs)
+        return 0, 12, ["ffmpeg"]
+
+    monkeypatch.setattr(framegrab, "extract_frames", fake_extract)
+    monkeypatch.setattr(framegrab, "INDEX_PATH", framegrab.INDEX_PATH)
+    result = bench.run_case(tmp_path / "in.mp4", tmp_path / "frames", {"fps": 1.0})
+    assert seen == {"fps": 1.0}
+    assert result["rc"] == 0 and result["frames"] == 12 and result["wall_s"] >= 0
@@ -0,0 +1,72 @@
+import os
+import threading
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+class FakePopen:
+    """ffmpeg stand-in that reports one progress block, then hangs until killed."""
+
+    instances = []
+
+    def __init__(self, cmd, stdout=None, text=False, **kwargs):
+        self.cmd = cmd
+        self.killed = False
+        self.returncode = None
+        read_fd, self._write_fd = os.pipe()
+        self.stdout = os.fdopen(read_fd, "r")
+        os.write(self._write_fd, b"frame=3\nprogress=continue\n")
+        FakePopen.instances.append(self)
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+        os.close(self._write_fd)
+
+    def wait(self):
+        return self.returncode
+
+
+@pytest.fixture
+def fake_popen(monkeypatch):
+    FakePopen.instances = []
+    monkeypatch.setattr("subprocess.Popen", FakePopen)
+    return FakePopen
+
+
+def test_cancel_kills_running_ffmpeg(tmp_path, fake_popen):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    cancel = threading.Event()
+    events = []
+
+    def on_progress(event):
+        events.append(event)
+        cancel.set()
+
+    rc, count, _cmd = framegrab.extract_frames(
+        inp, tmp_path / "frames", on_progress=on_progress, cancel=cancel
+    )
+    assert rc != 0 and count == 0
+    assert [e["frame"] for e in events] == [3]
+    assert fake_popen.instances[0].killed
+
+
+def test_cancel_set_before_start_runs_nothing(tmp_path, fake_popen):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    cancel = threading.Event()
+    cancel.set()
+    rc, count, _cmd = framegrab.extract_frames(inp, tmp_path / "frames", cancel=cancel)
+    assert rc == 1 and count == 0
+    assert fake_popen.instances == []
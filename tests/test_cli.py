@@ -46,8 +46,9 @@ def test_run_executes_and_summarizes(tmp_path, monkeypatch, capsys):
     def fake_run(cmd, *args, **kwargs):
         (outdir / "frame_000001.jpg").parent.mkdir(parents=True, exist_ok=True)
         (outdir / "frame_000001.jpg").write_bytes(b"data")
-        class R:  # simple returncode holder
+        class R:  # returncode plus ffmpeg's final -progress report
             returncode = 0
+            stdout = "frame=1\nprogress=end\n"
         return R()
 
     monkeypatch.setattr("subprocess.run", fake_run)
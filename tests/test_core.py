@@ -36,6 +36,7 @@ def test_extract_frames_executes_and_counts(tmp_path, monkeypatch):
         (outdir / "frame_000001.jpg").write_bytes(b"data")
         class R:
             returncode = 0
+            stdout = "frame=1\nprogress=end\n"
         return R()
 
     monkeypatch.setattr("subprocess.run", fake_run)
@@ -48,3 +49,49 @@ def test_extract_frames_executes_and_counts(tmp_path, monkeypatch):
     assert count == 1
     assert outdir.exists()
 
+
+def test_frame_count_comes_from_ffmpeg_not_directory(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+    outdir.mkdir()
+    for n in range(1, 6):  # leftovers from an earlier, longer run
+        (outdir / f"frame_{n:06d}.jpg").write_bytes(b"old")
+
+    def fake_run(cmd, *args, **kwargs):
+        assert cmd[cmd.index("-progress") + 1] == "pipe:1"
+
+        class R:
+            returncode = 0
+            stdout = "frame=1\nprogress=continue\nframe=3\nprogress=end\n"
+        return R()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    monkeypatch.setattr("glob.glob", lambda *a, **kw: pytest.fail("output dir was listed"))
+    rc, count, _ = framegrab.extract_frames(inp, outdir)
+    assert rc == 0
+    assert count == 3
+    assert framegrab.written_frame_files(outdir, "frame_%06d.jpg", count) == [
+        outdir / "frame_000001.jpg",
+        outdir / "frame_000002.jpg",
+        outdir / "frame_000003.jpg",
+    ]
+
+
+@pytest.mark.parametrize(
+    "banner, version",
+    [
+        ("ffmpeg version 4.4.2-0ubuntu0.22.04.1 Copyright (c) 2000-2021", (4, 4)),
+        ("ffmpeg version n6.1.1 Copyright (c) 2000-2023", (6, 1)),
+        ("ffmpeg version N-113347-g1e8d6c8 Copyright (c) 2000-2024", None),
+    ],
+)
+def test_ffmpeg_version_is_parsed_from_the_banner(monkeypatch, banner, version):
+    monkeypatch.setattr(framegrab, "_FFMPEG_VERSIONS", {})
+
+    class R:
+        returncode = 0
+        stdout = banner + "\nbuilt with gcc 12\n"
+
+    monkeypatch.setattr("subprocess.run", lambda *a, **k: R())
+    assert framegrab.ffmpeg_version() == version
@@ -0,0 +1,55 @@
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+def test_plan_count_times_uses_slice_centres():
+    assert framegrab.plan_count_times(0.0, 8.0, 4) == [1.0, 3.0, 5.0, 7.0]
+    times = framegrab.plan_count_times(2.0, 12.0, 64)
+    assert len(times) == 64 and times[0] > 2.0 and times[-1] < 12.0
+
+
+def test_count_extracts_exactly_n_and_retries_empty_seeks(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    monkeypatch.setattr(framegrab, "probe_video_info", lambda _: {"duration": 10.0})
+    seeks = []
+
+    def fake_run(cmd, *args, **kwargs):
+        seek = float(cmd[cmd.index("-ss") + 1])
+        seeks.append(seek)
+        # The last frame decodes at 9.5 s; later seeks produce nothing
+        wrote = 1 if seek <= 9.5 else 0
+
+        class R:
+            returncode = 0
+            stdout = f"frame={wrote}\nprogress=end\n"
+
+        return R()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    rc, frames, cmd = framegrab.extract_frames(inp, tmp_path, count=5)
+    assert (rc, frames) == (0, 5)
+    assert cmd[cmd.index("-frames:v") + 1] == "1"
+    assert sorted(seeks) == [1.0, 3.0, 5.0, 7.0, 9.0]
+
+    # A sample that stays empty after the retries fails the run
+    seeks.clear()
+    rc, frames, _ = framegrab.extract_frames(inp, tmp_path, count=2, start="8", end="12")
+    assert rc == 1
+    assert sorted(seeks) == [9.0, 10.0, 10.5, 11.0]
+
+
+def test_count_needs_a_known_end(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    monkeypatch.setattr(framegrab, "probe_video_info", lambda _: {"duration": None})
+    with pytest.raises(SystemExit):
+        framegrab.extract_frames(inp, tmp_path, count=3, dry_run=True)
+    with pytest.raises(SystemExit):
+        framegrab.main([str(inp), str(tmp_path), "--count", "3", "--fps", "2"])
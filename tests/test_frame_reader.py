@@ -0,0 +1,64 @@
+import pytest
+
+import framegrab
+
+
+@pytest.fixture
+def fake_decoder(tmp_path, monkeypatch):
+    """Decoder yielding frame i as ``bytes([i])``; records each run's first frame."""
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    runs = []
+    total = 100
+
+    def fake_iter_frames(input_video, *, start=None, size=None, pix_fmt="rgb24", readahead=8):
+        # grid_seek lands half a frame before the wanted frame at 10 fps
+        first = round(float(start) * 10 + 0.5) if start else 0
+        runs.append(first)
+        for i in range(first, total):
+            yield bytes([i])
+
+    monkeypatch.setattr(framegrab, "iter_frames", fake_iter_frames)
+    monkeypatch.setattr(
+        framegrab, "probe_video_info", lambda _: {"fps": 10.0, "width": 1, "height": 1}
+    )
+    monkeypatch.setattr(framegrab, "probe_keyframes", lambda _: [0.0, 2.0, 4.0])
+    yield inp, runs
+    framegrab.close_readers()
+
+
+def test_seeks_to_preceding_keyframe_and_continues_forward(fake_decoder):
+    inp, runs = fake_decoder
+    with framegrab.FrameReader(inp, cache_bytes=1000) as reader:
+        assert reader.get_frame(25) == bytes([25])
+        assert runs == [20]
+        # Cached on the way, and the same decode continues forward
+        assert reader.get_frame(22) == bytes([22])
+        assert reader.get_frame(30) == bytes([30])
+        assert runs == [20]
+        # A keyframe beyond the current position: seek instead of decoding
+        assert reader.get_frame(45) == bytes([45])
+        assert runs == [20, 40]
+        # Behind the decode and not cached: seek back
+        assert reader.get_frame(5) == bytes([5])
+        assert runs == [20, 40, 0]
+        assert reader.get_frame_at("00:00:03.01") == bytes([31])
+        with pytest.raises(IndexError):
+            reader.get_frame(100)
+
+
+def test_cache_is_bounded_in_bytes(fake_decoder):
+    inp, runs = fake_decoder
+    with framegrab.FrameReader(inp, pix_fmt="gray", cache_bytes=3) as reader:
+        reader.get_frame(25)
+        assert list(reader._cache) == [23, 24, 25]
+        reader.get_frame(21)
+        assert runs == [20, 20]
+
+
+def test_module_functions_share_a_reader(fake_decoder):
+    inp, runs = fake_decoder
+    assert framegrab.get_frame(inp, 12) == bytes([12])
+    assert framegrab.get_frame_at(inp, 1.05) == bytes([11])
+    assert framegrab.get_frame(inp, 15) == bytes([15])
+    assert runs == [0]
@@ -0,0 +1,104 @@
+import io
+import math
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+def test_write_and_read_store(tmp_path):
+    path = tmp_path / "clip.framestore"
+    # Three 2x1 RGB frames plus a truncated tail that must be dropped
+    payload = bytes(range(18)) + b"\x00\x01"
+    count = framegrab.write_framestore(
+        path, io.BytesIO(payload), width=2, height=1, pts=lambda: [0.0, 0.5]
+    )
+    assert count == 3
+    assert not (tmp_path / "clip.framestore.part").exists()
+    with framegrab.FrameStore(path) as store:
+        assert len(store) == 3
+        assert (store.width, store.height, store.pix_fmt) == (2, 1, "rgb24")
+        frame = store[1]
+        assert tuple(frame.shape) == (1, 2, 3)
+        assert bytes(frame) == bytes(range(6, 12))
+        assert bytes(store[-1]) == bytes(range(12, 18))
+        assert store.pts[:2] == [0.0, 0.5] and math.isnan(store.pts[2])
+        with pytest.raises(IndexError):
+            store[3]
+        del frame
+    with pytest.raises(FileExistsError):
+        framegrab.write_framestore(path, io.BytesIO(b""), width=2, height=1)
+
+
+def test_reader_rejects_other_files(tmp_path):
+    bad = tmp_path / "bad.framestore"
+    bad.write_bytes(b"not a store" * 10)
+    with pytest.raises(ValueError):
+        framegrab.FrameStore(bad)
+
+
+def test_extract_framestore_reads_showinfo_pts(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    log = (
+        b"Input #0, mov,mp4 from 'video.mp4':\n"
+        b"[Parsed_showinfo_2 @ 0x1] n:   0 pts:      0 pts_time:0       duration: 1\n"
+        b"[Parsed_showinfo_2 @ 0x1] n:   1 pts:    512 pts_time:0.5     duration: 1\n"
+    )
+    seen = []
+
+    class FakePopen:
+        def __init__(self, cmd, stdout=None, stderr=None, **kwargs):
+            seen.append(cmd)
+            self.stdout = io.BufferedReader(io.BytesIO(bytes(12)))
+            self.stderr = io.BufferedReader(io.BytesIO(log))
+
+        def kill(self):
+            pass
+
+        def wait(self):
+            return 0
+
+    monkeypatch.setattr("subprocess.Popen", FakePopen)
+    monkeypatch.setattr(framegrab, "probe_video_info", lambda _: {"width": 2, "height": 1})
+    rc, frames, cmd = framegrab.extract_frames(
+        inp, tmp_path / "out", start="10", fps=2, framestore="clip.framestore"
+    )
+    assert (rc, frames) == (0, 2)
+    assert cmd[cmd.index("-vf") + 1] == "fps=2,showinfo"
+    assert cmd[-3:] == ["-f", "rawvideo", "pipe:1"]
+    with framegrab.FrameStore(tmp_path / "out" / "clip.framestore") as store:
+        assert store.pts == [10.0, 10.5]
+
+
+def test_framestore_validation(tmp_path):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    for extra in (
+        ["--framestore", "clip.raw"],
+        ["--framestore", "sub/clip.framestore"],
+        ["--framestore", "clip.framestore", "--jobs", "2"],
+    ):
+        with pytest.raises(SystemExit):
+            framegrab.main([str(inp), str(tmp_path), *extra])
+
+
+def test_framestore_passes_the_scaler_on(tmp_path):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    _rc, _frames, cmd = framegrab.extract_frames(
+        inp,
+        tmp_path,
+        size=(64, 36),
+        scaler="lanczos",
+        framestore="clip.framestore",
+        dry_run=True,
+    )
+    assert cmd[cmd.index("-vf") + 1] == "scale=64:36:flags=lanczos,showinfo"
+    with pytest.raises(ValueError):
+        framegrab.extract_framestore(inp, tmp_path / "clip.framestore", scaler="sharp", dry_run=True)
@@ -0,0 +1,53 @@
+import argparse
+from pathlib import Path
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+def test_filter_chain_orders_fps_crop_scale():
+    cmd = framegrab.build_ffmpeg_cmd(
+        Path("in.mp4"),
+        Path("out"),
+        fps=2.0,
+        crop=(10, 20, 640, 360),
+        size=(224, 224),
+        scaler="fast_bilinear",
+        pix_fmt="gray",
+    )
+    assert cmd[cmd.index("-vf") + 1] == "fps=2.0,crop=640:360:10:20,scale=224:224:flags=fast_bilinear"
+    assert cmd[cmd.index("-pix_fmt") + 1] == "gray"
+
+
+def test_max_side_keeps_aspect_without_upscaling():
+    cmd = framegrab.build_ffmpeg_cmd(Path("in.mp4"), Path("out"), max_side=512)
+    assert cmd[cmd.index("-vf") + 1] == (
+        "scale=w='min(512,iw)':h='min(512,ih)':force_original_aspect_ratio=decrease"
+    )
+
+
+def test_crop_box_validation():
+    assert framegrab.crop_box("0:60:1280:600") == (0, 60, 1280, 600)
+    for bad in ("1:2:3", "a:b:c:d", "0:0:0:10", "-1:0:10:10"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            framegrab.crop_box(bad)
+
+
+def test_cli_geometry_flags(tmp_path, capsys):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    rc = framegrab.main(
+        [str(inp), str(tmp_path), "--max-side", "256", "--crop", "0:0:100:50", "--scaler", "area", "--dry-run"]
+    )
+    assert rc == 0
+    out = capsys.readouterr().out
+    assert "crop=100:50:0:0,scale=w=" in out and "flags=area" in out
+    for extra in (["--scaler", "area"], ["--scale", "10x10", "--max-side", "5"]):
+        with pytest.raises(SystemExit):
+            framegrab.main([str(inp), str(tmp_path), "--dry-run", *extra])
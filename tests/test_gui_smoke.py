@@ -65,3 +65,32 @@ def test_gui_preview_forces_dry_run(monkeypatch, tmp_path):
         assert captured.get("dry_run") is True
     finally:
         app.destroy()
+
+
+def test_gui_exit_waits_for_cancelled_jobs():
+    try:
+        import gui_app
+    except Exception:
+        pytest.skip("tkinter not available; skipping GUI test")
+    import threading
+    import types
+    from collections import deque
+
+    # No display needed: run _on_exit against a stand-in for the window
+    stopped = []
+    job = gui_app.Job(1, {}, None)
+
+    def run():
+        job.cancel.wait()
+        stopped.append("ffmpeg")
+
+    job.thread = threading.Thread(target=run, daemon=True)
+    job.thread.start()
+    app = types.SimpleNamespace(
+        _save_prefs=lambda: None,
+        _pending=deque(),
+        _running={job.iid: job},
+        destroy=lambda: stopped.append("destroy"),
+    )
+    gui_app.App._on_exit(app)
+    assert stopped == ["ffmpeg", "destroy"]
@@ -0,0 +1,100 @@
+import json
+import os
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def isolated_index(monkeypatch, tmp_path):
+    monkeypatch.setattr(framegrab, "INDEX_PATH", tmp_path / "index.sqlite3")
+    # --index exports the path for batch workers; undo that after each test
+    monkeypatch.delenv(framegrab.INDEX_ENV, raising=False)
+
+
+def _fake_ffprobe(calls):
+    info = {
+        "streams": [{"codec_type": "video", "width": 64, "height": 48, "avg_frame_rate": "25/1"}],
+        "format": {"duration": "8.0"},
+    }
+
+    def fake_run(cmd, *a, **kw):
+        calls.append(cmd)
+
+        class R:
+            returncode = 0
+            if "packet=pts_time,pos,flags" in cmd:
+                stdout = "0.000000,48,K_\n0.040000,900,__\n4.000000,5120,K_\nN/A,6000,K_\n"
+            else:
+                stdout = json.dumps(info)
+
+        return R()
+
+    return fake_run
+
+
+def test_build_index_then_probes_read_from_index(tmp_path, monkeypatch):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"fake")
+    calls = []
+    monkeypatch.setattr("subprocess.run", _fake_ffprobe(calls))
+
+    built = framegrab.build_index(video)
+    assert built["keyframes"] == 2
+    assert len(calls) == 2
+
+    assert framegrab.probe_video_info(video) == {"fps": 25.0, "duration": 8.0, "width": 64, "height": 48}
+    assert framegrab.probe_keyframes(video) == [0.0, 4.0]
+    assert framegrab.index_lookup(video)["keyframes"] == [(0.0, 48), (4.0, 5120)]
+    assert len(calls) == 2  # no further ffprobe runs
+
+
+def test_index_entry_invalidated_when_file_changes(tmp_path, monkeypatch):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"fake")
+    monkeypatch.setattr("subprocess.run", _fake_ffprobe([]))
+    framegrab.build_index(video)
+    video.write_bytes(b"longer content")
+    st = video.stat()
+    os.utime(video, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert framegrab.index_lookup(video) is None
+
+
+def test_probe_keyframes_populates_index_on_miss(tmp_path, monkeypatch):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"fake")
+    calls = []
+    monkeypatch.setattr("subprocess.run", _fake_ffprobe(calls))
+    assert framegrab.probe_keyframes(video) == [0.0, 4.0]
+    assert framegrab.probe_keyframes(video) == [0.0, 4.0]
+    assert len(calls) == 1
+    # Probe info was not part of the packet scan
+    assert framegrab.index_lookup(video)["info"] is None
+
+
+def test_index_command_reports_keyframes(tmp_path, monkeypatch, capsys):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"fake")
+    monkeypatch.setattr("subprocess.run", _fake_ffprobe([]))
+    rc = framegrab.main(["index", str(video), "--index", str(tmp_path / "other.sqlite3")])
+    assert rc == 0
+    assert "2 keyframes" in capsys.readouterr().out
+    assert (tmp_path / "other.sqlite3").exists()
+
+
+def test_extract_and_batch_accept_index_path(tmp_path, monkeypatch, capsys):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"fake")
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+    monkeypatch.setattr("subprocess.run", _fake_ffprobe([]))
+    other = tmp_path / "other.sqlite3"
+    rc = framegrab.main([str(video), str(tmp_path / "out"), "--fps", "1", "--dry-run", "--index", str(other)])
+    assert rc == 0
+    assert framegrab.index_lookup(video, other)["info"]["fps"] == 25.0
+    assert not (tmp_path / "index.sqlite3").exists()
+    assert os.environ[framegrab.INDEX_ENV] == str(other)
+    (tmp_path / "root").mkdir()
+    rc = framegrab.main(["batch", str(video), str(tmp_path / "root"), "--dry-run", "--index", str(other)])
+    assert rc == 0
+    assert framegrab.INDEX_PATH == other
@@ -0,0 +1,83 @@
+import io
+from pathlib import Path
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+class FakePopen:
+    instances = []
+
+    def __init__(self, cmd, stdout=None, **kwargs):
+        self.cmd = cmd
+        self.killed = False
+        self.stdout = io.BufferedReader(io.BytesIO(FakePopen.payload))
+        FakePopen.instances.append(self)
+
+    def kill(self):
+        self.killed = True
+
+    def wait(self):
+        return FakePopen.returncode
+
+
+@pytest.fixture
+def fake_popen(monkeypatch):
+    FakePopen.instances = []
+    FakePopen.returncode = 0
+    monkeypatch.setattr("subprocess.Popen", FakePopen)
+    return FakePopen
+
+
+def _video(tmp_path) -> Path:
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    return inp
+
+
+def test_iter_frames_yields_shaped_frames(tmp_path, fake_popen):
+    # Three 2x1 RGB frames plus a truncated tail that must be dropped
+    fake_popen.payload = bytes(range(18)) + b"\x00\x01"
+    frames = list(
+        framegrab.iter_frames(_video(tmp_path), start="1", fps="5", size=(2, 1), readahead=1)
+    )
+    assert len(frames) == 3
+    first = frames[0]
+    assert tuple(first.shape) == (1, 2, 3)
+    assert bytes(first) == bytes(range(6))
+    assert bytes(frames[2]) == bytes(range(12, 18))
+    cmd = fake_popen.instances[0].cmd
+    assert cmd[-3:] == ["-f", "rawvideo", "pipe:1"]
+    assert "fps=5.0,scale=2:1" in cmd
+    assert cmd[cmd.index("-pix_fmt") + 1] == "rgb24"
+
+
+def test_iter_frames_close_stops_ffmpeg(tmp_path, fake_popen):
+    fake_popen.payload = bytes(4 * 100)
+    gen = framegrab.iter_frames(_video(tmp_path), size=(2, 2), pix_fmt="gray", readahead=2)
+    frame = next(gen)
+    assert tuple(frame.shape) == (2, 2)
+    gen.close()
+    assert fake_popen.instances[0].killed
+
+
+def test_iter_frames_reports_ffmpeg_failure(tmp_path, fake_popen):
+    fake_popen.payload = b""
+    fake_popen.returncode = 1
+    with pytest.raises(RuntimeError):
+        list(framegrab.iter_frames(_video(tmp_path), size=(2, 2)))
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"start": "-1"}, {"end": "1:2:3"}, {"fps": "0"}, {"pix_fmt": "yuv420p"}, {"size": (0, 4)}],
+)
+def test_iter_frames_validates_arguments(tmp_path, kwargs):
+    with pytest.raises(ValueError):
+        next(framegrab.iter_frames(_video(tmp_path), **dict({"size": (2, 2)}, **kwargs)))
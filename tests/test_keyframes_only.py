@@ -0,0 +1,107 @@
+import argparse
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+    # Commands below are checked for the current -fps_mode option
+    monkeypatch.setattr(framegrab, "ffmpeg_version", lambda: (7, 0))
+
+
+KEYFRAMES = [0.0, 2.0, 4.0, 5.0, 6.0, 8.0, 12.0]
+
+
+def test_thin_keyframes_limits_rate_and_range():
+    assert framegrab.thin_keyframes(KEYFRAMES) == KEYFRAMES
+    assert framegrab.thin_keyframes(KEYFRAMES, fps=0.25) == [0.0, 4.0, 8.0, 12.0]
+    assert framegrab.thin_keyframes(KEYFRAMES, 3.0, 9.0, fps=0.5) == [4.0, 6.0, 8.0]
+    assert framegrab.keyframe_interval(KEYFRAMES) == 2.0
+    assert framegrab.keyframe_interval([1.0]) is None
+
+
+def test_keyframes_only_skips_decode_and_names_by_pts(tmp_path, monkeypatch, capsys):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "thumbs"
+    monkeypatch.setattr(framegrab, "probe_keyframes", lambda _: KEYFRAMES)
+    seen = []
+
+    def fake_run(cmd, *args, **kwargs):
+        seen.append(cmd)
+        for n in range(1, 4):
+            (outdir / f"t_{n:06d}.jpg").write_bytes(b"jpg")
+
+        class R:
+            returncode = 0
+            stdout = "frame=3\nprogress=end\n"
+
+        return R()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    rc = framegrab.main(
+        [
+            str(inp),
+            str(outdir),
+            "--keyframes-only",
+            "--start",
+            "3",
+            "--end",
+            "9",
+            "--fps",
+            "0.5",
+            "--scale",
+            "160x90",
+            "--pattern",
+            "t_%06d.jpg",
+            "--verbose",
+        ]
+    )
+    assert rc == 0
+    cmd = seen[0]
+    assert cmd[cmd.index("-skip_frame") + 1] == "nokey"
+    assert cmd.index("-skip_frame") < cmd.index("-i")
+    vf = cmd[cmd.index("-vf") + 1]
+    assert "fps=" not in vf
+    assert "prev_selected_t" in vf and vf.endswith("scale=160:90")
+    assert cmd[cmd.index("-fps_mode") + 1] == "vfr"
+    assert sorted(p.name for p in outdir.iterdir()) == [
+        "t_004000.jpg",
+        "t_006000.jpg",
+        "t_008000.jpg",
+    ]
+    assert "Keyframe interval 2.00s; extracting 3 of 7 keyframes" in capsys.readouterr().err
+
+
+def test_probe_reports_keyframe_interval(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    monkeypatch.setattr(framegrab, "INDEX_PATH", tmp_path / "index.sqlite3")
+    monkeypatch.setattr(
+        framegrab,
+        "_probe_video_info_uncached",
+        lambda _: {"fps": 25.0, "duration": 12.0, "width": 4, "height": 2},
+    )
+    monkeypatch.setattr(framegrab, "_probe_keyframe_packets", lambda _: [(k, None) for k in KEYFRAMES])
+    framegrab._PROBE_CACHE.clear()
+    info = framegrab.probe_video_info(inp, keyframes=True)
+    assert info["keyframe_count"] == 7 and info["keyframe_interval"] == 2.0
+    assert "keyframe_interval" not in framegrab.probe_video_info(inp)
+    framegrab._PROBE_CACHE.clear()
+
+
+def test_scale_size_validation():
+    assert framegrab.scale_size("320x180") == (320, 180)
+    for bad in ("320", "0x10", "axb"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            framegrab.scale_size(bad)
+
+
+def test_keyframes_only_rejects_jobs(tmp_path):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    with pytest.raises(SystemExit):
+        framegrab.main([str(inp), str(tmp_path), "--keyframes-only", "--jobs", "2"])
@@ -0,0 +1,108 @@
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+def _samples(path):
+    samples = {}
+    for line in path.read_text().splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_exporter_counts_and_buckets_finished_runs(tmp_path):
+    path = tmp_path / "framegrab.prom"
+    metrics = framegrab.MetricsExporter(path)
+    metrics.started()
+    assert _samples(path)["framegrab_extractions_pending"] == 1
+    metrics.observe({"rc": 0, "frames": 10, "bytes_written": 4096, "retries": 1, "wall_s": 3.0, "speed": 6.0})
+    metrics.observe({"rc": 1, "frames": 0, "bytes_written": 0, "wall_s": 0.2, "speed": None})
+    metrics.observe({"rc": -9, "frames": 0, "wall_s": 1.0}, cancelled=True)
+    s = _samples(path)
+    assert s["framegrab_extractions_pending"] == 0
+    assert s["framegrab_extractions_total"] == 3
+    assert s["framegrab_frames_extracted_total"] == 10
+    assert s["framegrab_bytes_written_total"] == 4096
+    assert s["framegrab_ffmpeg_failures_total"] == 1
+    assert s["framegrab_retries_total"] == 1
+    assert s['framegrab_extraction_seconds_bucket{le="2"}'] == 0
+    assert s['framegrab_extraction_seconds_bucket{le="5"}'] == 1
+    assert s['framegrab_extraction_seconds_bucket{le="+Inf"}'] == 1
+    assert s["framegrab_extraction_seconds_sum"] == 3.0
+    assert s['framegrab_speed_factor_bucket{le="8"}'] == 1
+    assert s["framegrab_speed_factor_count"] == 1
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_exporter_continues_counters_from_existing_file(tmp_path):
+    path = tmp_path / "framegrab.prom"
+    framegrab.MetricsExporter(path).observe({"rc": 0, "frames": 5, "wall_s": 0.4, "speed": 2.0})
+    metrics = framegrab.MetricsExporter(path)
+    metrics.observe({"rc": 0, "frames": 7, "wall_s": 0.6, "speed": 0.5})
+    s = _samples(path)
+    assert s["framegrab_frames_extracted_total"] == 12
+    assert s['framegrab_extraction_seconds_bucket{le="0.5"}'] == 1
+    assert s['framegrab_extraction_seconds_bucket{le="1"}'] == 2
+    assert s["framegrab_extraction_seconds_sum"] == pytest.approx(1.0)
+    assert s["framegrab_speed_factor_count"] == 2
+
+
+def test_cli_metrics_file(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+
+    def fake_run_ffmpeg(cmd, on_progress=None, cancel=None):
+        outdir.mkdir(exist_ok=True)
+        (outdir / "frame_000001.jpg").write_bytes(b"x" * 10)
+        on_progress({"frame": 1, "out_time": 0.04, "speed": 3.0, "fps": None, "done": True})
+        return 0, 1
+
+    monkeypatch.setattr(framegrab, "_run_ffmpeg", fake_run_ffmpeg)
+    prom = tmp_path / "framegrab.prom"
+    assert framegrab.main([str(inp), str(outdir), "--metrics-file", str(prom)]) == 0
+    s = _samples(prom)
+    assert s["framegrab_frames_extracted_total"] == 1
+    assert s["framegrab_bytes_written_total"] == 10
+    assert s['framegrab_speed_factor_bucket{le="4"}'] == 1
+
+
+def test_exporter_reports_running_progress_throttled(tmp_path, monkeypatch):
+    path = tmp_path / "framegrab.prom"
+    clock = [100.0]
+    monkeypatch.setattr(framegrab.time, "monotonic", lambda: clock[0])
+    metrics = framegrab.MetricsExporter(path)
+    metrics.started()
+    metrics.progress("a", {"frame": 10})
+    assert _samples(path)["framegrab_frames_in_progress"] == 0
+    clock[0] += framegrab.METRICS_PROGRESS_INTERVAL
+    metrics.progress("b", {"frame": 5})
+    assert _samples(path)["framegrab_frames_in_progress"] == 15
+    metrics.observe({"rc": 0, "frames": 12, "wall_s": 1.0}, run="a")
+    assert _samples(path)["framegrab_frames_in_progress"] == 5
+
+
+def test_batch_metrics_survive_lost_workers(tmp_path):
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+
+    path = tmp_path / "framegrab.prom"
+    metrics = framegrab.MetricsExporter(path)
+    metrics.started()
+    metrics.started()
+    broken = Future()
+    broken.set_exception(BrokenProcessPool("worker died"))
+    framegrab._observe_batch_job(metrics, broken)
+    done = Future()
+    done.set_result((0, 3, ["ffmpeg"], {"rc": 0, "frames": 3, "wall_s": 1.0}))
+    framegrab._observe_batch_job(metrics, done)
+    s = _samples(path)
+    assert s["framegrab_extractions_pending"] == 0
+    assert s["framegrab_extractions_total"] == 1
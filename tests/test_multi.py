@@ -0,0 +1,92 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+def test_build_multi_cmd_splits_one_decode():
+    targets = [
+        framegrab.OutputTarget(Path("full"), "f_%06d.png"),
+        framegrab.OutputTarget(Path("mid"), "f_%06d.jpg", max_side=512, quality=4),
+        framegrab.OutputTarget(Path("thumb"), "t_%06d.jpg", size=(128, 72), scaler="fast_bilinear"),
+    ]
+    cmd = framegrab.build_multi_cmd(Path("in.mp4"), targets, fps=2.0, start="5")
+    assert cmd.count("-i") == 1
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert graph.split(";") == [
+        "[0:v]fps=2.0,split=3[s0][s1][s2]",
+        "[s1]scale=w='min(512,iw)':h='min(512,ih)':force_original_aspect_ratio=decrease[o1]",
+        "[s2]scale=128:72:flags=fast_bilinear[o2]",
+    ]
+    tail = cmd[cmd.index("-n") + 1 :]
+    assert tail == [
+        "-map", "[s0]", str(Path("full") / "f_%06d.png"),
+        "-map", "[o1]", "-q:v", "4", str(Path("mid") / "f_%06d.jpg"),
+        "-map", "[o2]", "-q:v", "2", str(Path("thumb") / "t_%06d.jpg"),
+    ]
+
+
+def test_extract_multi_validates_every_target(tmp_path):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    good = framegrab.OutputTarget(tmp_path / "a")
+    for bad in (
+        framegrab.OutputTarget(tmp_path / "b", "frame.gif"),
+        framegrab.OutputTarget(tmp_path / "b", "sub/f_%d.jpg"),
+        framegrab.OutputTarget(tmp_path / "a"),
+        framegrab.OutputTarget(tmp_path / "b", "f_%d.png", quality=12),
+    ):
+        with pytest.raises(SystemExit):
+            framegrab.extract_multi(inp, [good, bad], dry_run=True)
+
+
+def test_multi_cli_reads_config(tmp_path, monkeypatch, capsys):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    config = tmp_path / "outputs.json"
+    config.write_text(
+        json.dumps(
+            {
+                "outputs": [
+                    {"output_dir": str(tmp_path / "full"), "pattern": "f_%06d.png"},
+                    {"output_dir": str(tmp_path / "small"), "scale": "320x180", "crop": "0:0:64:64"},
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+    seen = []
+
+    def fake_run(cmd, *args, **kwargs):
+        seen.append(cmd)
+
+        class R:
+            returncode = 0
+            stdout = "frame=7\nprogress=end\n"
+
+        return R()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    assert framegrab.main(["multi", str(inp), str(config), "--fps", "1"]) == 0
+    assert len(seen) == 1
+    assert "[s1]crop=64:64:0:0,scale=320:180[o1]" in seen[0][seen[0].index("-filter_complex") + 1]
+    out = capsys.readouterr().out
+    assert f"Wrote 7 frames to {tmp_path / 'full'}" in out
+    assert (tmp_path / "small").is_dir()
+
+
+def test_load_output_targets_reports_bad_entries(tmp_path):
+    config = tmp_path / "c.json"
+    config.write_text('{"outputs": [{"output_dir": "a", "size": "1x1"}]}', encoding="utf-8")
+    with pytest.raises(ValueError, match="output 1: unknown keys size"):
+        framegrab.load_output_targets(config)
+    config.write_text('{"outputs": [{"output_dir": "a", "scale": "big"}]}', encoding="utf-8")
+    with pytest.raises(ValueError, match="output 1"):
+        framegrab.load_output_targets(config)
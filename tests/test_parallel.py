@@ -0,0 +1,127 @@
+from pathlib import Path
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+def test_plan_segments_keeps_numbering_continuous():
+    segments = framegrab.plan_segments(0.0, 100.0, [0.0, 24.0, 49.0, 76.0], 2.0, 4, resample=True)
+    assert [s.first_index for s in segments] == [0, 48, 98, 152]
+    assert [s.frames for s in segments] == [48, 50, 54, None]
+    # Each cut sits on the output grid right after its keyframe
+    assert segments[1].start == pytest.approx(24.0)
+    assert segments[2].start == pytest.approx(49.0)
+
+
+def test_plan_segments_seeks_half_frame_early_without_resampling():
+    segments = framegrab.plan_segments(10.0, 20.0, [15.0], 25.0, 2)
+    assert [s.first_index for s in segments] == [0, 125]
+    assert segments[1].start == pytest.approx(15.0 - 0.02)
+
+
+def test_plan_segments_follow_source_frames_for_unaligned_start():
+    # From 1.01 s at 25 fps the first frame is source frame 26 (1.04 s)
+    segments = framegrab.plan_segments(1.01, 17.0, [6.0], 25.0, 2)
+    # The cut lands on the keyframe's own frame 150, output index 124
+    assert [s.first_index for s in segments] == [0, 124]
+    assert segments[1].start == pytest.approx(6.0 - 0.02)
+    segments = framegrab.plan_segments(1.01, 17.0, [6.01], 25.0, 2, offset=0.01)
+    assert [s.first_index for s in segments] == [0, 125]
+    assert segments[1].start == pytest.approx(6.01 - 0.02)
+
+
+def test_plan_segments_without_inner_keyframes_is_serial():
+    segments = framegrab.plan_segments(0.0, 10.0, [0.0], 30.0, 8)
+    assert segments == [framegrab.Segment(0.0, 0, None)]
+
+
+def test_build_cmd_start_number_and_frames():
+    cmd = framegrab.build_ffmpeg_cmd(
+        Path("in.mp4"), Path("frames"), start="5", end="10", start_number=11, frames=7
+    )
+    assert cmd[cmd.index("-start_number") + 1] == "11"
+    assert cmd[cmd.index("-frames:v") + 1] == "7"
+    # Range bounds are input options
+    assert cmd.index("-ss") < cmd.index("-i") and cmd.index("-to") < cmd.index("-i")
+
+
+def test_extract_frames_runs_segments_in_parallel(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+    monkeypatch.setattr(
+        framegrab, "probe_video_info", lambda _: {"fps": 10.0, "duration": 20.0}
+    )
+    monkeypatch.setattr(framegrab, "probe_keyframes", lambda _: [0.0, 5.0, 10.0, 15.0])
+    monkeypatch.setattr(framegrab, "probe_start_offset", lambda _: 0.0)
+    seen = []
+
+    def fake_run(cmd, *args, **kwargs):
+        seen.append(cmd)
+
+        class R:
+            returncode = 0
+            stdout = "frame=50\nprogress=end\n"
+
+        return R()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    rc, count, cmd = framegrab.extract_frames(inp, outdir, jobs=4)
+    assert rc == 0
+    assert count == 200
+    assert len(seen) == 4
+    starts = sorted(
+        int(c[c.index("-start_number") + 1]) if "-start_number" in c else 1 for c in seen
+    )
+    assert starts == [1, 51, 101, 151]
+    assert "-ss" not in cmd
+
+
+def _cfr_source(rate, duration, offset=0.0):
+    """Fake ``_run_ffmpeg`` for a constant-rate source; each file holds its source frame index."""
+
+    def run(cmd, on_progress=None, cancel=None):
+        def opt(name, default=None):
+            return cmd[cmd.index(name) + 1] if name in cmd else default
+
+        seek = float(opt("-ss", 0.0))
+        end = float(opt("-to", duration))
+        limit = int(opt("-frames:v", 10**9))
+        number = int(opt("-start_number", 1))
+        target = Path(cmd[-1])
+        target.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        k = 0
+        while offset + k / rate < end and written < limit:
+            if offset + k / rate >= seek - 1e-9:
+                (target.parent / (target.name % (number + written))).write_text(str(k))
+                written += 1
+            k += 1
+        return 0, written
+
+    return run
+
+
+@pytest.mark.parametrize("offset", [0.0, 0.013])
+def test_parallel_output_matches_serial_with_unaligned_start(tmp_path, monkeypatch, offset):
+    inp = tmp_path / "v25.mp4"
+    inp.write_bytes(b"fake")
+    monkeypatch.setattr(framegrab, "_run_ffmpeg", _cfr_source(25.0, 20.0, offset))
+    monkeypatch.setattr(framegrab, "probe_video_info", lambda *a, **k: {"fps": 25.0, "duration": 20.0})
+    monkeypatch.setattr(framegrab, "probe_keyframes", lambda _: [2.0 * i + offset for i in range(10)])
+    monkeypatch.setattr(framegrab, "probe_start_offset", lambda _: offset)
+
+    def files(outdir):
+        return {p.name: p.read_text() for p in outdir.iterdir()}
+
+    serial, parallel = tmp_path / "serial", tmp_path / "parallel"
+    framegrab.extract_frames(inp, serial, start="1.01", end="17")
+    rc, count, _cmd = framegrab.extract_frames(inp, parallel, start="1.01", end="17", jobs=4)
+    assert rc == 0 and count == len(files(serial))
+    assert files(parallel) == files(serial)
@@ -6,6 +6,13 @@ import pytest
 import framegrab
 
 
+@pytest.fixture(autouse=True)
+def isolated_probe_caches(monkeypatch, tmp_path):
+    monkeypatch.setattr(framegrab, "INDEX_PATH", tmp_path / "index.sqlite3")
+    framegrab._PROBE_CACHE.clear()
+    framegrab._KEYFRAME_CACHE.clear()
+
+
 def test_time_to_seconds_parses_numeric_and_hms():
     assert framegrab.time_to_seconds("12.5") == 12.5
     assert framegrab.time_to_seconds("00:01:05.25") == pytest.approx(65.25, rel=1e-6)
@@ -43,3 +50,68 @@ def test_probe_video_info_parses_json(monkeypatch, tmp_path):
     assert info["duration"] == 10.5
     assert info["fps"] == pytest.approx(29.97, rel=1e-3)
 
+
+def _counting_probe(monkeypatch, payload, returncode=0):
+    calls = []
+
+    class R:
+        stdout = json.dumps(payload)
+
+    R.returncode = returncode
+
+    def fake_run(cmd, *a, **kw):
+        calls.append(cmd)
+        return R()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    return calls
+
+
+PAYLOAD = {
+    "streams": [{"codec_type": "video", "width": 320, "height": 240, "r_frame_rate": "25/1"}],
+    "format": {"duration": "3.0"},
+}
+
+
+def test_probe_video_info_is_memoized_in_memory_and_on_disk(monkeypatch, tmp_path):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    calls = _counting_probe(monkeypatch, PAYLOAD)
+
+    first = framegrab.probe_video_info(inp)
+    first["fps"] = 0  # callers get a copy, not the cached dict
+    assert framegrab.probe_video_info(inp)["fps"] == 25.0
+    assert len(calls) == 1
+    # Only the needed fields are requested
+    assert "-show_entries" in calls[0] and "-show_streams" not in calls[0]
+
+    # A fresh process (empty LRU) is served from the on-disk index
+    framegrab._PROBE_CACHE.clear()
+    framegrab._KEYFRAME_CACHE.clear()
+    assert framegrab.probe_video_info(inp)["duration"] == 3.0
+    assert len(calls) == 1
+
+
+def test_failed_probe_is_not_cached(monkeypatch, tmp_path):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    calls = _counting_probe(monkeypatch, {}, returncode=1)
+    assert framegrab.probe_video_info(inp)["duration"] is None
+    framegrab.probe_video_info(inp)
+    assert len(calls) == 2
+
+
+def test_probe_many_preserves_order(monkeypatch, tmp_path):
+    paths = []
+    for i in range(5):
+        p = tmp_path / f"v{i}.mp4"
+        p.write_bytes(b"x" * (i + 1))
+        paths.append(p)
+
+    def fake_probe(path):
+        return {"fps": None, "duration": float(path.stat().st_size), "width": None, "height": None}
+
+    monkeypatch.setattr(framegrab, "probe_video_info", fake_probe)
+    infos = framegrab.probe_many(paths, max_workers=3)
+    assert [i["duration"] for i in infos] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert framegrab.probe_many([]) == []
@@ -0,0 +1,63 @@
+import io
+from pathlib import Path
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+PROGRESS = """frame=12
+fps=24.00
+out_time_us=500000
+out_time=00:00:00.500000
+speed=2.5x
+progress=continue
+frame=30
+fps=25.10
+out_time_us=1250000
+speed=N/A
+progress=end
+"""
+
+
+def test_parse_progress_yields_one_event_per_block():
+    events = list(framegrab.parse_progress(io.StringIO(PROGRESS)))
+    assert events[0] == {"frame": 12, "out_time": 0.5, "speed": 2.5, "fps": 24.0, "done": False}
+    assert events[1]["frame"] == 30
+    assert events[1]["out_time"] == pytest.approx(1.25)
+    assert events[1]["speed"] is None
+    assert events[1]["done"] is True
+
+
+def test_progress_flag_adds_progress_pipe():
+    cmd = framegrab.build_ffmpeg_cmd(Path("in.mp4"), Path("out"), progress=True)
+    assert cmd[cmd.index("-progress") + 1] == "pipe:1"
+    assert "-nostats" in cmd
+
+
+def test_cli_progress_streams_events(tmp_path, monkeypatch, capsys):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "out"
+
+    class FakePopen:
+        def __init__(self, cmd, stdout=None, text=None, **kwargs):
+            assert "-progress" in cmd
+            outdir.mkdir(exist_ok=True)
+            (outdir / "frame_000001.jpg").write_bytes(b"jpg")
+            self.stdout = io.StringIO(PROGRESS)
+
+        def wait(self):
+            return 0
+
+    monkeypatch.setattr("subprocess.Popen", FakePopen)
+    rc = framegrab.main([str(inp), str(outdir), "--progress"])
+    assert rc == 0
+    err = capsys.readouterr().err
+    assert "frame=12 time=00:00:00.50 speed=2.50x" in err
+    assert err.rstrip().endswith("frame=30 time=00:00:01.25")
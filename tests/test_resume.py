@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 20 + b"\xff\xd9"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 20 + b"\x00\x00\x00\x00IEND\xaeB`\x82"
+
+
+def test_find_resume_point_drops_truncated_last_frame(tmp_path):
+    for n in (1, 2, 3):
+        (tmp_path / f"frame_{n:06d}.jpg").write_bytes(JPEG)
+    (tmp_path / "frame_000004.jpg").write_bytes(JPEG[:10])
+    (tmp_path / "other_000009.jpg").write_bytes(JPEG)
+    assert framegrab.find_resume_point(tmp_path, "frame_%06d.jpg") == 3
+    assert not (tmp_path / "frame_000004.jpg").exists()
+    assert framegrab.find_resume_point(tmp_path / "missing", "frame_%06d.jpg") == 0
+
+
+def test_image_complete_checks_end_markers(tmp_path):
+    png = tmp_path / "a.png"
+    png.write_bytes(PNG)
+    assert framegrab.image_complete(png)
+    png.write_bytes(PNG[:-3])
+    assert not framegrab.image_complete(png)
+
+
+def test_resume_restarts_at_matching_timestamp(tmp_path, monkeypatch, capsys):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+    outdir.mkdir()
+    for n in range(1, 11):
+        (outdir / f"frame_{n:06d}.jpg").write_bytes(JPEG)
+    seen = []
+
+    def fake_run(cmd, *args, **kwargs):
+        seen.append(cmd)
+
+        class R:
+            returncode = 0
+            stdout = "frame=5\nprogress=end\n"
+
+        return R()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    rc = framegrab.main(
+        [str(inp), str(outdir), "--start", "4", "--fps", "2", "--resume"]
+    )
+    assert rc == 0
+    cmd = seen[0]
+    # 10 frames at 2 fps from 4 s: the 11th frame starts at 9 s
+    assert cmd[cmd.index("-ss") + 1] == "9.000000"
+    assert cmd[cmd.index("-start_number") + 1] == "11"
+    assert "Wrote 15 frames" in capsys.readouterr().out
+
+
+def test_resume_rejects_overwrite(tmp_path):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    with pytest.raises(SystemExit):
+        framegrab.extract_frames(inp, tmp_path / "out", resume=True, overwrite=True)
+
+
+@pytest.mark.parametrize("offset", [0.0, 0.013])
+def test_resume_with_unaligned_start_matches_a_full_run(tmp_path, monkeypatch, offset):
+    inp = tmp_path / "v25.mp4"
+    inp.write_bytes(b"fake")
+
+    def run(cmd, on_progress=None, cancel=None):
+        # 25 fps source: write every frame from -ss on, each tagged with its index
+        seek = float(cmd[cmd.index("-ss") + 1])
+        end = float(cmd[cmd.index("-to") + 1])
+        number = int(cmd[cmd.index("-start_number") + 1]) if "-start_number" in cmd else 1
+        target = Path(cmd[-1])
+        target.parent.mkdir(parents=True, exist_ok=True)
+        frames = [k for k in range(int(end * 25) + 1) if seek - 1e-9 <= offset + k / 25 < end]
+        for n, k in enumerate(frames, number):
+            (target.parent / (target.name % n)).write_bytes(b"\xff\xd8" + str(k).encode() + b"\xff\xd9")
+        return 0, len(frames)
+
+    monkeypatch.setattr(framegrab, "_run_ffmpeg", run)
+    monkeypatch.setattr(framegrab, "probe_video_info", lambda *a, **k: {"fps": 25.0, "duration": 20.0})
+    monkeypatch.setattr(framegrab, "probe_start_offset", lambda _: offset)
+    full, resumed = tmp_path / "full", tmp_path / "resumed"
+    framegrab.extract_frames(inp, full, start="1.01", end="17")
+    framegrab.extract_frames(inp, resumed, start="1.01", end="17")
+    for p in resumed.iterdir():
+        if int(p.stem.split("_")[1]) > 200:
+            p.unlink()
+    rc, count, _cmd = framegrab.extract_frames(inp, resumed, start="1.01", end="17", resume=True)
+    assert rc == 0 and count == len(list(full.iterdir()))
+    assert {p.name: p.read_bytes() for p in resumed.iterdir()} == {
+        p.name: p.read_bytes() for p in full.iterdir()
+    }
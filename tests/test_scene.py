@@ -0,0 +1,94 @@
+import argparse
+import csv
+from pathlib import Path
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+SCENE_LOG = """frame:0    pts:30720   pts_time:2.4
+lavfi.scene_score=0.512000
+frame:1    pts:98304   pts_time:7.68
+lavfi.scene_score=0.873100
+"""
+
+
+def test_scene_threshold_validation():
+    assert framegrab.scene_threshold("0.3") == 0.3
+    for bad in ("0", "1", "1.5", "x"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            framegrab.scene_threshold(bad)
+
+
+def test_build_cmd_scene_filter_chain():
+    cmd = framegrab.build_ffmpeg_cmd(
+        Path("in.mp4"), Path("out"), fps=5.0, scene=0.4, scene_log=Path("/data/run:1/.scenes.log")
+    )
+    vf = cmd[cmd.index("-vf") + 1]
+    assert vf.startswith("fps=5.0,select='gt(scene,0.4)',metadata=print:key=lavfi.scene_score")
+    assert "file=/data/run\\\\:1/.scenes.log" in vf
+    assert cmd[cmd.index("-fps_mode") + 1] == "vfr"
+
+
+def test_extract_scene_writes_sidecar(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+
+    def fake_run(cmd, *args, **kwargs):
+        outdir.mkdir(exist_ok=True)
+        (outdir / ".scenes.log").write_text(SCENE_LOG, encoding="utf-8")
+        for n in (1, 2):
+            (outdir / f"frame_{n:06d}.jpg").write_bytes(b"jpg")
+
+        class R:
+            returncode = 0
+            stdout = "frame=2\nprogress=end\n"
+
+        return R()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    rc, count, _ = framegrab.extract_frames(inp, outdir, scene=0.3)
+    assert rc == 0 and count == 2
+    assert not (outdir / ".scenes.log").exists()
+    with open(outdir / "scenes.csv", newline="", encoding="utf-8") as fh:
+        rows = list(csv.reader(fh))
+    assert rows == [
+        ["filename", "pts_time", "score"],
+        ["frame_000001.jpg", "2.4", "0.512000"],
+        ["frame_000002.jpg", "7.68", "0.873100"],
+    ]
+
+
+def test_extract_scene_sidecar_times_include_start(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+    seen = []
+
+    def fake_run(cmd, *args, **kwargs):
+        seen.append(cmd)
+        outdir.mkdir(exist_ok=True)
+        (outdir / ".scenes.log").write_text(SCENE_LOG, encoding="utf-8")
+        for n in (1, 2):
+            (outdir / f"frame_{n:06d}.jpg").write_bytes(b"jpg")
+
+        class R:
+            returncode = 0
+            stdout = "frame=2\nprogress=end\n"
+
+        return R()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    rc, _count, _ = framegrab.extract_frames(inp, outdir, start="00:01:00", scene=0.3)
+    assert rc == 0
+    assert seen[0][seen[0].index("-ss") + 1] == "00:01:00"
+    with open(outdir / "scenes.csv", newline="", encoding="utf-8") as fh:
+        rows = list(csv.reader(fh))
+    assert [row[1] for row in rows[1:]] == ["62.4", "67.68"]
@@ -0,0 +1,121 @@
+import math
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+def test_sparse_sampling_prefers_seeks():
+    # One frame per minute over 10 hours of 25 fps video with 2 s GOPs
+    plan = framegrab.plan_seek_strategy(36000, 1 / 60, 25.0, 2.0)
+    assert plan.strategy == "seek"
+    assert plan.samples == 600
+    assert plan.continuous_cost == 900000
+    assert plan.seek_cost == pytest.approx(600 * (30 + 25 + 1))
+
+
+def test_dense_sampling_stays_continuous():
+    plan = framegrab.plan_seek_strategy(60, 2.0, 25.0, 2.0)
+    assert plan.strategy == "continuous"
+    # Unknown GOP falls back to the assumed interval
+    assert framegrab.plan_seek_strategy(60, 0.1, 25.0).seek_cost == 6 * (30 + 62.5 + 1)
+
+
+def _fake_probe(monkeypatch, duration):
+    def probe(_path, keyframes=False):
+        return {"fps": 25.0, "duration": duration, "keyframe_interval": 2.0}
+
+    monkeypatch.setattr(framegrab, "probe_video_info", probe)
+    monkeypatch.setattr(framegrab, "probe_start_offset", lambda _path: 0.0)
+
+
+def test_extract_runs_one_seek_per_sample(tmp_path, monkeypatch, capsys):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    _fake_probe(monkeypatch, 36000.0)
+    rc, frames, cmd = framegrab.extract_frames(
+        inp,
+        tmp_path,
+        start="60",
+        end="360",
+        fps=1 / 60,
+        verbose=True,
+        dry_run=True,
+    )
+    assert rc == 0
+    # The fps filter shows the last frame before 90 s in its first period
+    assert cmd[cmd.index("-ss") + 1] == "89.940000"
+    assert cmd[cmd.index("-frames:v") + 1] == "1"
+    assert "-vf" not in cmd and "-to" not in cmd
+    err = capsys.readouterr().err
+    assert "Seek plan: per-sample seeks (5 samples" in err
+    assert "Segment 5/5" in err and "-ss 329.940000" in err and "-start_number 5" in err
+
+
+def _fps_filter_frames(duration, rate, offset, start_s, end_s, fps):
+    """Source frames the fps filter (round=near) emits for a continuous decode."""
+    frames = [k for k in range(int(duration * rate)) if start_s <= offset + k / rate < end_s]
+    ticks = [math.floor((offset + k / rate - start_s) * fps + 0.5) for k in frames]
+    last_tick = math.floor((min(end_s, duration) - start_s) * fps + 0.5)
+    return [
+        max(k for k, tick in zip(frames, ticks) if tick <= n) for n in range(ticks[0], last_tick)
+    ]
+
+
+@pytest.mark.parametrize(
+    "fps, start, offset",
+    [(0.037, None, 0.0), (0.1, None, 0.0), (0.1, "1.01", 0.013), (1 / 60, "60", 0.013)],
+)
+def test_seek_plan_picks_the_frames_of_a_continuous_decode(tmp_path, monkeypatch, fps, start, offset):
+    duration, rate = 300.0, 25.0
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    _fake_probe(monkeypatch, duration)
+    monkeypatch.setattr(framegrab, "probe_start_offset", lambda _path: offset)
+    cmds = framegrab._sample_seek_cmds(inp, tmp_path, start=start, end=None, fps=fps)
+    assert cmds is not None
+    # Each seek outputs the first source frame at or after -ss
+    seeks = [float(cmd[cmd.index("-ss") + 1]) for cmd in cmds]
+    picked = [math.ceil((ss - offset) * rate - 1e-6) for ss in seeks]
+
+    start_s = float(start or 0)
+    expected = _fps_filter_frames(duration, rate, offset, start_s, duration, fps)
+    assert picked == expected
+    assert [cmd[cmd.index("-start_number") + 1] for cmd in cmds] == [str(i + 1) for i in range(len(cmds))]
+
+
+def test_extract_keeps_continuous_decode_for_dense_fps(tmp_path, monkeypatch, capsys):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    _fake_probe(monkeypatch, 60.0)
+    _rc, _frames, cmd = framegrab.extract_frames(inp, tmp_path, fps=2.0, verbose=True, dry_run=True)
+    assert cmd[cmd.index("-vf") + 1] == "fps=2.0"
+    assert "one continuous decode" in capsys.readouterr().err
+
+
+def test_planner_uses_known_keyframes_without_scanning(tmp_path, monkeypatch, capsys):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    monkeypatch.setattr(framegrab, "probe_video_info", lambda _path: {"fps": 25.0, "duration": 36000.0})
+    monkeypatch.setattr(framegrab, "index_lookup", lambda *a, **k: None)
+
+    def no_scan(_path):
+        raise AssertionError("the planner must not scan packets")
+
+    monkeypatch.setattr(framegrab, "_probe_keyframe_packets", no_scan)
+    framegrab._KEYFRAME_CACHE.clear()
+    kwargs = dict(start="60", end="360", fps=1 / 60, verbose=True, dry_run=True)
+    framegrab.extract_frames(inp, tmp_path, **kwargs)
+    assert "per-sample seeks" in capsys.readouterr().err
+    # A memoized 10-minute GOP makes every seek decode the whole range
+    framegrab._remember_keyframes(inp, [0.0, 600.0, 1200.0])
+    try:
+        framegrab.extract_frames(inp, tmp_path, **kwargs)
+    finally:
+        framegrab._KEYFRAME_CACHE.clear()
+    assert "one continuous decode" in capsys.readouterr().err
@@ -0,0 +1,202 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+from pathlib import Path
+
+import pytest
+
+import framegrab
+
+IN = str(Path("in.mp4").resolve())
+OUT = str(Path("out").resolve())
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+def test_parse_job_spec_maps_and_validates_options():
+    inp, out, kwargs = framegrab.parse_job_spec(
+        {"input_video": IN, "output_dir": OUT, "fps": 2, "start": "00:00:05", "size": "64x32"}
+    )
+    assert (str(inp), str(out)) == (IN, OUT)
+    assert kwargs == {"fps": 2.0, "start": "00:00:05", "size": (64, 32)}
+    with pytest.raises(ValueError, match="unknown option"):
+        framegrab.parse_job_spec({"input_video": IN, "output_dir": OUT, "on_progress": 1})
+    with pytest.raises(ValueError, match="fps"):
+        framegrab.parse_job_spec({"input_video": IN, "output_dir": OUT, "fps": 0})
+    with pytest.raises(ValueError, match="overwrite"):
+        framegrab.parse_job_spec({"input_video": IN, "output_dir": OUT, "overwrite": "yes"})
+    with pytest.raises(ValueError, match="output_dir"):
+        framegrab.parse_job_spec({"input_video": IN})
+    with pytest.raises(ValueError, match="input_video must be absolute"):
+        framegrab.parse_job_spec({"input_video": "in.mp4", "output_dir": OUT})
+
+
+def test_job_queue_limits_concurrency_and_reports_progress(monkeypatch):
+    release = threading.Event()
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def fake_extract(input_video, output_dir, *, on_progress, cancel, **kwargs):
+        with lock:
+            running.append(input_video)
+            peak.append(len(running))
+        on_progress({"frame": 4, "out_time": 1.0, "speed": 2.0, "fps": None, "done": False})
+        release.wait(5)
+        with lock:
+            running.remove(input_video)
+        return 0, 4, ["ffmpeg", str(input_video)]
+
+    monkeypatch.setattr(framegrab, "extract_frames", fake_extract)
+    jobs = framegrab.JobQueue(2)
+    ids = [jobs.submit({"input_video": str(Path(f"{i}.mp4").resolve()), "output_dir": OUT})["id"] for i in range(4)]
+    stream = jobs.watch(ids[0])
+    assert next(stream)["status"] in ("queued", "running")
+    release.set()
+    states = list(stream)
+    finals = [list(jobs.watch(i))[-1] for i in ids]
+    jobs.shutdown()
+    assert states[-1]["status"] == "done" and states[-1]["frames"] == 4
+    assert max(peak) <= 2
+    assert [job["status"] for job in finals] == ["done"] * 4
+    assert jobs.get(ids[1])["progress"]["frame"] == 4
+
+
+def test_job_queue_cancel_stops_running_and_queued_jobs(monkeypatch):
+    started = threading.Event()
+
+    def fake_extract(input_video, output_dir, *, on_progress, cancel, **kwargs):
+        started.set()
+        cancel.wait(5)
+        return -9, 0, ["ffmpeg"]
+
+    monkeypatch.setattr(framegrab, "extract_frames", fake_extract)
+    jobs = framegrab.JobQueue(1)
+    first = jobs.submit({"input_video": IN, "output_dir": OUT})["id"]
+    second = jobs.submit({"input_video": IN, "output_dir": OUT})["id"]
+    assert started.wait(5)
+    assert jobs.cancel(second)["status"] == "cancelled"
+    jobs.cancel(first)
+    assert list(jobs.watch(first))[-1]["status"] == "cancelled"
+    jobs.shutdown()
+    assert jobs.cancel("99") is None
+
+
+def test_job_queue_reports_validation_message(monkeypatch, capsys):
+    def fake_extract(input_video, output_dir, **kwargs):
+        print("Count cannot be combined with fps", file=framegrab.sys.stderr)
+        framegrab.sys.exit(1)
+
+    monkeypatch.setattr(framegrab, "extract_frames", fake_extract)
+    jobs = framegrab.JobQueue(1)
+    job_id = jobs.submit({"input_video": IN, "output_dir": OUT})["id"]
+    final = list(jobs.watch(job_id))[-1]
+    jobs.shutdown()
+    assert final["status"] == "failed" and final["rc"] == 1
+    assert final["error"] == "Count cannot be combined with fps"
+    assert "Count cannot be combined" in capsys.readouterr().err
+    assert not isinstance(framegrab.sys.stderr, framegrab._StderrTee)
+
+
+def test_http_api_submits_polls_and_streams(monkeypatch):
+    def fake_extract(input_video, output_dir, *, on_progress, cancel, **kwargs):
+        on_progress({"frame": 1, "out_time": None, "speed": None, "fps": None, "done": True})
+        return 0, 1, ["ffmpeg"]
+
+    monkeypatch.setattr(framegrab, "extract_frames", fake_extract)
+    jobs = framegrab.JobQueue(1)
+    server = framegrab.serve(jobs, port=0, token="secret")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    auth = {"Authorization": "Bearer secret"}
+    post = {**auth, "Content-Type": "application/json"}
+    try:
+        req = urllib.request.Request(
+            base + "/jobs",
+            data=json.dumps({"input_video": IN, "output_dir": OUT, "fps": 1}).encode(),
+            headers=post,
+            method="POST",
+        )
+        with urllib.request.urlopen(req) as resp:
+            assert resp.status == 202
+            job_id = json.load(resp)["id"]
+        with urllib.request.urlopen(urllib.request.Request(f"{base}/jobs/{job_id}/events", headers=auth)) as resp:
+            lines = [json.loads(line) for line in resp]
+        assert lines[-1]["status"] == "done" and lines[-1]["frames"] == 1
+        with urllib.request.urlopen(urllib.request.Request(f"{base}/jobs/{job_id}", headers=auth)) as resp:
+            assert json.load(resp)["status"] == "done"
+        with urllib.request.urlopen(urllib.request.Request(base + "/jobs", headers=auth)) as resp:
+            assert [j["id"] for j in json.load(resp)] == [job_id]
+        bad = urllib.request.Request(base + "/jobs", data=b'{"input_video": "x"}', headers=post, method="POST")
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(bad)
+        assert err.value.code == 400
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(urllib.request.Request(base + "/jobs/42", headers=auth))
+        assert err.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        jobs.shutdown()
+
+
+def test_http_api_rejects_foreign_requests(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(framegrab.JobQueue, "submit", lambda self, spec: submitted.append(spec))
+    jobs = framegrab.JobQueue(1)
+    server = framegrab.serve(jobs, port=0, token="secret")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    base = f"http://127.0.0.1:{port}"
+    body = json.dumps({"input_video": IN, "output_dir": OUT}).encode()
+    good = {"Authorization": "Bearer secret", "Content-Type": "application/json"}
+    cases = [
+        ({**good, "Content-Type": "text/plain"}, 415),
+        ({**good, "Content-Type": "application/x-www-form-urlencoded"}, 415),
+        ({**good, "Origin": "http://evil.example"}, 403),
+        ({**good, "Host": f"evil.example:{port}"}, 403),
+        ({**good, "Host": "localhost:1"}, 403),
+        ({"Content-Type": "application/json"}, 401),
+        ({**good, "Authorization": "Bearer wrong"}, 401),
+    ]
+    try:
+        for headers, code in cases:
+            req = urllib.request.Request(base + "/jobs", data=body, headers=headers, method="POST")
+            with pytest.raises(urllib.error.HTTPError) as err:
+                urllib.request.urlopen(req)
+            assert err.value.code == code, headers
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(urllib.request.Request(base + "/jobs", headers={"Origin": "null"}))
+        assert err.value.code == 403
+        assert submitted == []
+        ok = urllib.request.Request(
+            base + "/jobs", data=body, headers={**good, "Host": f"localhost:{port}"}, method="POST"
+        )
+        urllib.request.urlopen(ok).close()
+        assert len(submitted) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        jobs.shutdown()
+
+
+def test_probe_keyframes_memoized_in_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(framegrab, "INDEX_PATH", tmp_path / "index.sqlite3")
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    calls = []
+
+    def fake_packets(path):
+        calls.append(path)
+        return [(0.0, None), (2.0, None)]
+
+    monkeypatch.setattr(framegrab, "_probe_keyframe_packets", fake_packets)
+    monkeypatch.setattr(framegrab, "index_lookup", lambda *a, **k: None)
+    assert framegrab.probe_keyframes(inp) == [0.0, 2.0]
+    assert framegrab.probe_keyframes(inp) == [0.0, 2.0]
+    assert len(calls) == 1
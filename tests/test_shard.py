@@ -0,0 +1,105 @@
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+    # Commands below are checked for the current -fps_mode option
+    monkeypatch.setattr(framegrab, "ffmpeg_version", lambda: (7, 0))
+
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 20 + b"\xff\xd9"
+
+
+def test_shard_name_groups_frames_from_one():
+    assert framegrab.shard_name(1, 100) == "000000"
+    assert framegrab.shard_name(100, 100) == "000000"
+    assert framegrab.shard_name(101, 100) == "000001"
+    assert framegrab.frame_relpath("f_%03d.jpg", 101, 100) == "000001/f_101.jpg"
+    assert framegrab.frame_relpath("f_%03d.jpg", 101) == "f_101.jpg"
+
+
+def test_shard_frames_moves_and_skips_missing(tmp_path):
+    for n in (1, 2, 3, 5):
+        (tmp_path / f"f_{n:03d}.jpg").write_bytes(JPEG)
+    moved = framegrab.shard_frames(tmp_path, "f_%03d.jpg", range(1, 6), 2)
+    assert moved == 4
+    assert sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*.jpg")) == [
+        "000000/f_001.jpg",
+        "000000/f_002.jpg",
+        "000001/f_003.jpg",
+        "000002/f_005.jpg",
+    ]
+
+
+def test_extract_shards_while_ffmpeg_runs(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+    seen_flat = []
+
+    def fake_run_ffmpeg(cmd, on_progress=None, cancel=None):
+        for n in range(1, 6):
+            (outdir / f"frame_{n:06d}.jpg").write_bytes(JPEG)
+            on_progress({"frame": n, "out_time": None, "speed": None, "fps": None, "done": n == 5})
+            seen_flat.append(len(list(outdir.glob("*.jpg"))))
+        return 0, 5
+
+    monkeypatch.setattr(framegrab, "_run_ffmpeg", fake_run_ffmpeg)
+    rc, frames, _ = framegrab.extract_frames(
+        inp, outdir, start=None, end=None, fps=None, pattern="frame_%06d.jpg",
+        overwrite=False, verbose=False, dry_run=False, shard_size=2,
+    )
+    assert (rc, frames) == (0, 5)
+    assert seen_flat == [0] * 5
+    assert sorted(d.name for d in outdir.iterdir()) == ["000000", "000001", "000002"]
+    assert (outdir / "000002" / "frame_000005.jpg").exists()
+
+
+def test_resume_scans_last_shard(tmp_path):
+    for n in range(1, 6):
+        shard = tmp_path / framegrab.shard_name(n, 2)
+        shard.mkdir(exist_ok=True)
+        (shard / f"f_{n:03d}.jpg").write_bytes(JPEG)
+    (tmp_path / "000002" / "f_006.jpg").write_bytes(JPEG[:5])
+    assert framegrab.find_resume_point(tmp_path, "f_%03d.jpg", 2) == 5
+    assert framegrab.find_resume_point(tmp_path / "000000", "f_%03d.jpg", 2) == 0
+
+
+def test_shard_size_must_be_positive(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        framegrab.main([str(tmp_path / "v.mp4"), str(tmp_path), "--shard-size", "0"])
+    assert "integer > 0" in capsys.readouterr().err
+
+
+def test_extract_shards_after_multi_command_run(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+    monkeypatch.setattr(framegrab, "probe_video_info", lambda *a, **k: {"fps": 10.0})
+    monkeypatch.setattr(framegrab, "probe_start_offset", lambda _: 0.0)
+
+    def fake_run(cmd, *args, **kwargs):
+        first = int(cmd[cmd.index("-start_number") + 1])
+        count = int(cmd[cmd.index("-frames:v") + 1])
+        outdir.mkdir(exist_ok=True)
+        for n in range(first, first + count):
+            (outdir / f"frame_{n:06d}.jpg").write_bytes(JPEG)
+
+        class R:
+            returncode = 0
+            stdout = f"frame={count}\nprogress=end\n"
+
+        return R()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    # Far apart targets: one ffmpeg command per group
+    rc, frames, _ = framegrab.extract_frames(inp, outdir, timestamps=[1, 40, 80], shard_size=2)
+    assert (rc, frames) == (0, 3)
+    assert sorted(p.relative_to(outdir).as_posix() for p in outdir.rglob("*.jpg")) == [
+        "000000/frame_000001.jpg",
+        "000000/frame_000002.jpg",
+        "000001/frame_000003.jpg",
+    ]
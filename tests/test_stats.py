@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+
+
+def _fake_run_ffmpeg(outdir, frames=3, size=100):
+    def fake(cmd, on_progress=None, cancel=None):
+        outdir.mkdir(exist_ok=True)
+        for n in range(1, frames + 1):
+            (outdir / f"frame_{n:06d}.jpg").write_bytes(b"x" * size)
+        if on_progress is not None:
+            on_progress({"frame": frames, "out_time": 1.0, "speed": 4.5, "fps": None, "done": True})
+        return 0, frames
+
+    return fake
+
+
+def test_stats_cover_stages_throughput_and_bytes(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+    (tmp_path / "old").mkdir()
+    monkeypatch.setattr(framegrab, "_run_ffmpeg", _fake_run_ffmpeg(outdir))
+    events = []
+    stats = {}
+    rc, count, _cmd = framegrab.extract_frames(
+        inp, outdir, on_progress=events.append, stats=stats, stats_json=tmp_path / "stats.json"
+    )
+    assert rc == 0 and count == 3
+    assert [e["speed"] for e in events] == [4.5]
+    assert set(stats["stages"]) == {"validate", "plan", "extract", "finalize"}
+    assert stats["speed"] == 4.5 and stats["frames"] == 3
+    assert stats["bytes_written"] == 300 and stats["files_written"] == 3
+    assert stats["bytes_per_frame"] == 100.0
+    assert stats["first_frame_s"] is not None and stats["frames_per_s"] > 0
+    assert "child_cpu_s" in stats and "child_max_rss_kb" in stats
+    assert json.loads((tmp_path / "stats.json").read_text()) == stats
+
+
+def test_stats_charge_ffprobe_to_probe_stage(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+    monkeypatch.setattr(framegrab, "_run_ffmpeg", _fake_run_ffmpeg(outdir, frames=1))
+    monkeypatch.setattr(framegrab, "INDEX_PATH", tmp_path / "index.sqlite3")
+    probe = framegrab._timed_probe(lambda _path: {"fps": 25.0, "duration": 2.0, "width": 4, "height": 2})
+    monkeypatch.setattr(framegrab, "_probe_video_info_uncached", probe)
+    framegrab._PROBE_CACHE.clear()
+    stats = {}
+    framegrab.extract_frames(inp, outdir, count=1, stats=stats)
+    framegrab._PROBE_CACHE.clear()
+    assert "probe" in stats["stages"]
+
+
+def test_cli_stats_json(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+    monkeypatch.setattr(framegrab, "_run_ffmpeg", _fake_run_ffmpeg(outdir, frames=2))
+    out = tmp_path / "stats.json"
+    assert framegrab.main([str(inp), str(outdir), "--stats-json", str(out)]) == 0
+    assert json.loads(out.read_text())["frames"] == 2
+
+
+def test_stats_shorten_progress_period_and_skip_unrelated_subtrees(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+    (outdir / "nested").mkdir(parents=True)
+    fake = _fake_run_ffmpeg(outdir, frames=2)
+    cmds = []
+
+    def run(cmd, on_progress=None, cancel=None):
+        cmds.append(cmd)
+        (outdir / "nested" / "unrelated.bin").write_bytes(b"y" * 1000)
+        return fake(cmd, on_progress, cancel)
+
+    monkeypatch.setattr(framegrab, "_run_ffmpeg", run)
+    stats = {}
+    framegrab.extract_frames(inp, outdir, stats=stats)
+    assert cmds[0][cmds[0].index("-stats_period") + 1] == "0.05"
+    assert stats["bytes_written"] == 200 and stats["files_written"] == 2
+    _rc, _n, cmd = framegrab.extract_frames(inp, outdir, overwrite=True, dry_run=True)
+    assert "-stats_period" not in cmd
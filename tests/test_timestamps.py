@@ -0,0 +1,123 @@
+import argparse
+
+import pytest
+
+import framegrab
+
+
+@pytest.fixture(autouse=True)
+def ensure_ffmpeg_on_path(monkeypatch):
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/ffmpeg")
+    # Commands below are checked for the current -fps_mode option
+    monkeypatch.setattr(framegrab, "ffmpeg_version", lambda: (7, 0))
+
+
+def test_load_timestamps_parses_seconds_and_hms(tmp_path):
+    f = tmp_path / "ts.txt"
+    f.write_text("# annotations\n1.5,cat\n00:00:03.25 dog\n\n12\n", encoding="utf-8")
+    assert framegrab.load_timestamps(f) == [1.5, 3.25, 12.0]
+    f.write_text("1\nsoon\n", encoding="utf-8")
+    with pytest.raises(argparse.ArgumentTypeError, match=":2:"):
+        framegrab.timestamps_file(str(f))
+
+
+def test_plan_groups_merges_same_frame_and_splits_far_targets():
+    groups = framegrab.plan_timestamp_groups([30.0, 1.01, 1.02, 2.0, 100.0], rate=25.0, gap=10.0)
+    # 1.01 s and 1.02 s both land on frame 26 (1.04 s)
+    assert [[t for t, _ in g] for g in groups] == [[1.01, 2.0], [30.0], [100.0]]
+    assert groups[0][0][1] == pytest.approx(1.04)
+    assert framegrab.plan_timestamp_groups([1.0], rate=25.0)[0][0][1] == pytest.approx(1.0)
+
+
+def test_timestamps_run_one_pass_per_group_and_name_by_pts(tmp_path, monkeypatch):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    outdir = tmp_path / "frames"
+    monkeypatch.setattr(framegrab, "probe_video_info", lambda _: {"fps": 10.0})
+    monkeypatch.setattr(framegrab, "probe_start_offset", lambda _: 0.0)
+    seen = []
+
+    def fake_run(cmd, *args, **kwargs):
+        seen.append(cmd)
+        first = int(cmd[cmd.index("-start_number") + 1])
+        count = int(cmd[cmd.index("-frames:v") + 1])
+        outdir.mkdir(exist_ok=True)
+        for n in range(first, first + count):
+            (outdir / f"f_{n:06d}.png").write_bytes(b"png")
+
+        class R:
+            returncode = 0
+            stdout = f"frame={count}\nprogress=end\n"
+
+        return R()
+
+    monkeypatch.setattr("subprocess.run", fake_run)
+    rc, count, _cmd = framegrab.extract_frames(
+        inp,
+        outdir,
+        pattern="f_%06d.png",
+        timestamps=["00:00:02", 0.51, 0.55, 60],
+        name_by="pts",
+    )
+    assert rc == 0 and count == 3
+    assert len(seen) == 2
+    first = seen[0]
+    assert first[first.index("-ss") + 1] == "0.510000"
+    vf = first[first.index("-vf") + 1]
+    assert vf.startswith("select='") and "gte(t,1.490000)" in vf
+    assert first[first.index("-fps_mode") + 1] == "vfr"
+    assert sorted(p.name for p in outdir.iterdir()) == [
+        "f_000600.png",
+        "f_002000.png",
+        "f_060000.png",
+    ]
+
+
+def test_plan_groups_follow_the_video_start_offset():
+    # The video stream starts 0.02 s after the container, so frames sit at 0.02 + k/10
+    groups = framegrab.plan_timestamp_groups([0.0, 1.0, 1.03], rate=10.0, offset=0.02)
+    assert [pts for g in groups for _t, pts in g] == pytest.approx([0.02, 1.02, 1.12])
+
+
+def test_timestamps_need_a_known_frame_rate(tmp_path, monkeypatch, capsys):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    monkeypatch.setattr(framegrab, "probe_video_info", lambda _: {"fps": None})
+    with pytest.raises(SystemExit):
+        framegrab.extract_frames(inp, tmp_path / "out", timestamps=[1.01, 1.02], dry_run=True)
+    assert "frame rate is unknown" in capsys.readouterr().err
+
+
+def test_probe_start_offset_subtracts_container_start(monkeypatch):
+    class R:
+        returncode = 0
+        stdout = '{"streams": [{"start_time": "1.400000"}], "format": {"start_time": "1.000000"}}'
+
+    monkeypatch.setattr("subprocess.run", lambda *a, **k: R())
+    assert framegrab.probe_start_offset("in.mp4") == pytest.approx(0.4)
+
+
+def test_timestamps_reject_range_options(tmp_path):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    with pytest.raises(SystemExit):
+        framegrab.extract_frames(inp, tmp_path / "out", timestamps=[1], fps=2.0)
+
+
+def test_timestamps_past_the_end_are_rejected(tmp_path, monkeypatch, capsys):
+    inp = tmp_path / "video.mp4"
+    inp.write_bytes(b"fake")
+    monkeypatch.setattr(framegrab, "probe_video_info", lambda _: {"fps": 10.0, "duration": 30.0})
+    monkeypatch.setattr(framegrab, "probe_start_offset", lambda _: 0.0)
+    with pytest.raises(SystemExit):
+        # 29.95 s rounds up to the frame at 30 s, which does not exist
+        framegrab.extract_frames(inp, tmp_path, timestamps=[1, 29.95, 31], dry_run=True)
+    assert "2 timestamp(s) past the end of the video (30.000s), first at 29.950s" in capsys.readouterr().err
+    rc, _count, _cmd = framegrab.extract_frames(inp, tmp_path, timestamps=[1, 29.9], dry_run=True)
+    assert rc == 0
+
+
+def test_older_ffmpeg_gets_vsync(tmp_path, monkeypatch):
+    monkeypatch.setattr(framegrab, "ffmpeg_version", lambda: (4, 4))
+    cmd = framegrab.build_ffmpeg_cmd(tmp_path / "in.mp4", tmp_path, select="gte(t,1)")
+    assert cmd[cmd.index("-vsync") + 1] == "vfr" and "-fps_mode" not in cmd